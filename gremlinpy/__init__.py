@@ -3,3 +3,4 @@ from .gremlin import *
 from .config import *
 from .exception import *
 from .statement import *
+from .request import *
@@ -0,0 +1,331 @@
+"""
+benchmarks for building, binding, rendering, copying and nesting traversals
+
+    python -m gremlinpy.benchmark --sizes 10,1000,100000
+    python -m gremlinpy.benchmark --save baseline.json
+    python -m gremlinpy.benchmark --compare baseline.json --tolerance 0.25
+    python -m gremlinpy.benchmark --compare
+
+every case is run at every size (the number of tokens, params, clauses or
+statements it creates). the median time of the repeats and the bytes
+allocated while the case runs are reported for the whole run and per
+operation (divided by the size). --save writes the results to a json file
+and --compare reports every case that got slower or allocates more than the
+baseline by more than the tolerance, the exit status is 1 when there are
+regressions. without a path --compare uses the baseline that is shipped with
+gremlinpy (benchmark_baseline.json, recorded with the default options)
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from gremlinpy.gremlin import Gremlin, Param, __, gt, within
+from gremlinpy.statement import Conditional, GetEdge, Statement
+from gremlinpy.version import __version__
+
+
+SIZES = (10, 100, 1000, 10000, 100000)
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'benchmark_baseline.json')
+timer = getattr(time, 'perf_counter', time.time)
+
+
+class Case(object):
+    """
+    setup(size) builds what the case needs and is not measured, run(state)
+    is the operation that is measured
+    """
+
+    def __init__(self, name, run, setup=None, description=''):
+        self.name = name
+        self.run = run
+        self.setup = setup or (lambda size: size)
+        self.description = description
+
+
+def chain(size):
+    g = Gremlin().V()
+
+    for i in range(size):
+        g.out(i)
+
+    return g
+
+
+def rendered(size):
+    g = chain(size)
+    str(g)
+
+    return g
+
+
+def changed(size):
+    return rendered(size).out('changed')
+
+
+def build(size):
+    g = Gremlin()
+
+    for i in range(size):
+        g.out('knows')
+
+    return g
+
+
+def bind(size):
+    g = Gremlin()
+
+    for i in range(size):
+        g.bind_param(i)
+
+    return g
+
+
+def bind_named(size):
+    g = Gremlin()
+
+    for i in range(size):
+        g.bind_param(Param('p{}'.format(i), i))
+
+    return g
+
+
+def copy(g):
+    copied = g.copy().out('branch')
+
+    return str(copied)
+
+
+class _HasName(Statement):
+
+    def __init__(self, name):
+        self.name = name
+
+    def build(self):
+        self.gremlin.has('name', self.name)
+
+
+def nest(size):
+    g = Gremlin().V()
+
+    for i in range(size):
+        step = i % 3
+
+        if step == 0:
+            g.where(__.out('knows').has('age', gt(i)))
+        elif step == 1:
+            g.has('name', within('a', 'b', i))
+        else:
+            g.local(_HasName(i))
+
+    return str(g)
+
+
+def anon(size):
+    return [__.out('knows') for i in range(size)]
+
+
+def conditional(size):
+    c = Conditional().set_if('x == -1', 'nope')
+
+    for i in range(size):
+        c.set_elif('x == {}'.format(i), 'g.V({})'.format(i))
+
+    c.set_else('g.V()')
+
+    return str(Gremlin().apply_statement(c))
+
+
+def get_edge(size):
+    return [str(Gremlin().apply_statement(GetEdge(i, i + 1, 'knows')))
+            for i in range(size)]
+
+
+CASES = [
+    Case('build', build,
+         description='chain construction via __getattr__ and __call__'),
+    Case('bind', bind, description='bind_param with generated names'),
+    Case('bind_named', bind_named, description='bind_param with Params'),
+    Case('render', str, chain, description='first str() of a chain'),
+    Case('rerender', str, changed,
+         description='str() of a rendered chain after adding a token'),
+    Case('copy', copy, rendered,
+         description='copy() of a rendered chain and render of the copy'),
+    Case('nest', nest,
+         description='nested Gremlin, Predicate and Statement arguments'),
+    Case('anon', anon, description='size __.out() anonymous traversals'),
+    Case('conditional', conditional,
+         description='Conditional with size elseif clauses'),
+    Case('get_edge', get_edge, description='size GetEdge statements'),
+]
+
+
+def measure(case, size, repeat=5):
+    """
+    returns the median seconds of a run of the case at the size and the
+    bytes allocated by one run (the peak of the memory that it traced, so
+    memory freed and allocated again during the run is only counted once)
+    """
+    times = []
+
+    for _ in range(repeat):
+        state = case.setup(size)
+
+        gc.collect()
+        start = timer()
+        case.run(state)
+        times.append(timer() - start)
+
+    times.sort()
+    allocated = None
+
+    if tracemalloc is not None:
+        state = case.setup(size)
+
+        gc.collect()
+        tracemalloc.start()
+        case.run(state)
+        allocated = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {'time': times[len(times) // 2], 'allocated': allocated}
+
+
+def run(cases=None, sizes=SIZES, repeat=5, budget=None, out=None):
+    """
+    runs every case at every size. budget (in seconds) limits the repeats
+    of a case once a single run takes longer than it. returns a dict keyed
+    by 'case:size'
+    """
+    results = {}
+
+    for case in cases or CASES:
+        for size in sizes:
+            times = repeat
+
+            if budget is not None:
+                first = measure(case, size, 1)['time']
+                times = max(1, min(repeat, int(budget / max(first, 1e-9))))
+
+            result = measure(case, size, times)
+            result['per_unit'] = result['time'] / size
+            result['allocated_per_unit'] = None
+
+            if result['allocated'] is not None:
+                result['allocated_per_unit'] = result['allocated'] / size
+            results['{}:{}'.format(case.name, size)] = result
+
+            if out is not None:
+                out.write(format_result(case.name, size, result) + '\n')
+                out.flush()
+
+    return results
+
+
+def format_result(name, size, result):
+    allocated = ''
+
+    if result['allocated'] is not None:
+        allocated = '{:>12.1f} KiB {:>10.1f} B/unit'.format(
+            result['allocated'] / 1024.0, result['allocated_per_unit'])
+
+    return '{:<12} {:>8} {:>12.3f} ms {:>10.3f} us/unit{}'.format(
+        name, size, result['time'] * 1000, result['per_unit'] * 1e6,
+        allocated)
+
+
+def save(results, path):
+    data = {
+        'gremlinpy': __version__,
+        'python': platform.python_version(),
+        'results': results}
+
+    with open(path, 'w') as baseline:
+        json.dump(data, baseline, indent=2, sort_keys=True)
+
+    return path
+
+
+def load(path):
+    with open(path) as baseline:
+        return json.load(baseline)['results']
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    returns a (key, metric, baseline, result) tuple for every result that is
+    more than tolerance (a fraction) worse than the baseline
+    """
+    regressions = []
+
+    for key in sorted(results):
+        if key not in baseline:
+            continue
+
+        for metric in ('time', 'allocated'):
+            new = results[key].get(metric)
+            old = baseline[key].get(metric)
+
+            if new is None or not old:
+                continue
+
+            if new > old * (1 + tolerance):
+                regressions.append((key, metric, old, new))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m gremlinpy.benchmark',
+                                     description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)),
+                        help='comma separated sizes')
+    parser.add_argument('--cases', default=None,
+                        help='comma separated case names, all by default')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=2.0,
+                        help='seconds to spend on the repeats of a case')
+    parser.add_argument('--save', default=None, help='write a baseline')
+    parser.add_argument('--compare', default=None, nargs='?',
+                        const=BASELINE,
+                        help='compare against a baseline, the shipped one '
+                             'when no path is given')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    cases = CASES
+
+    if args.cases:
+        names = args.cases.split(',')
+        cases = [case for case in CASES if case.name in names]
+
+    results = run(cases, sizes, args.repeat, args.budget, sys.stdout)
+
+    if args.save:
+        save(results, args.save)
+
+    if args.compare:
+        regressions = compare(results, load(args.compare), args.tolerance)
+
+        for key, metric, old, new in regressions:
+            print('REGRESSION {} {}: {:.6g} -> {:.6g} ({:+.0%})'.format(
+                key, metric, old, new, new / float(old) - 1))
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+a write-behind buffer that coalesces many small mutations into Batch scripts
+
+    async with Client(url) as client:
+        async with WriteBuffer(client.submit, max_rows=200) as buffer:
+            future = buffer.add(Gremlin().addV('person').property(...))
+            ...
+            vertex = await future
+
+traversals and statements are grouped by their fingerprint, so every script
+that is sent holds traversals of the same shape. a group is sent as one
+Batch when it holds max_rows traversals, when its scripts and bindings reach
+max_bytes or max_delay seconds after its first traversal was added,
+whichever comes first. submit is any coroutine function that takes a
+Statement and returns the list of results, like Client.submit
+"""
+import asyncio
+import json
+
+from gremlinpy.exception import ClientError
+from gremlinpy.gremlin import Gremlin
+from gremlinpy.statement import Batch, Statement
+
+
+class _Group(object):
+    """the traversals of one fingerprint that are waiting to be sent"""
+
+    def __init__(self):
+        self.traversals = []
+        self.futures = []
+        self.size = 0
+        self.handle = None
+
+
+class WriteBuffer(object):
+
+    def __init__(self, submit, max_rows=100, max_bytes=None, max_delay=0.05,
+                 **kwargs):
+        self.submit = submit
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.kwargs = kwargs
+        self.groups = {}
+        self.sending = set()
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def __len__(self):
+        return sum([len(group.traversals) for group in self.groups.values()])
+
+    def render(self, traversal):
+        """returns the fingerprint and the size of the traversal"""
+        if isinstance(traversal, Statement):
+            script = traversal.render()[0]
+            gremlin = traversal.gremlin
+        elif isinstance(traversal, Gremlin):
+            script = str(traversal)
+            gremlin = traversal
+        else:
+            error = 'Only Gremlin and Statement instances can be buffered'
+            raise ClientError(error)
+
+        size = len(script)
+
+        if self.max_bytes:
+            size += len(json.dumps(gremlin.bound_params, default=str))
+
+        return traversal.fingerprint(), size
+
+    def add(self, traversal):
+        """
+        buffers the traversal and returns a future for its result. the
+        traversal is rendered right away to find its group and rendered into
+        the Batch when the group is sent, so it should not be changed until
+        then
+        """
+        if self.closed:
+            raise ClientError('The buffer is closed')
+
+        fingerprint, size = self.render(traversal)
+        future = asyncio.get_event_loop().create_future()
+        group = self.groups.get(fingerprint)
+
+        if group is None:
+            group = self.groups[fingerprint] = _Group()
+
+            if self.max_delay is not None:
+                group.handle = asyncio.get_event_loop().call_later(
+                    self.max_delay, self.send, fingerprint, group)
+
+        group.traversals.append(traversal)
+        group.futures.append(future)
+        group.size += size
+
+        if self.max_rows and len(group.traversals) >= self.max_rows:
+            self.send(fingerprint, group)
+        elif self.max_bytes and group.size >= self.max_bytes:
+            self.send(fingerprint, group)
+
+        return future
+
+    def send(self, fingerprint, group=None):
+        """starts sending the group of the fingerprint"""
+        if group is None:
+            group = self.groups.get(fingerprint)
+
+        if group is None or self.groups.get(fingerprint) is not group:
+            return None
+
+        del self.groups[fingerprint]
+
+        if group.handle is not None:
+            group.handle.cancel()
+
+        task = asyncio.ensure_future(self.submit_group(group))
+        self.sending.add(task)
+        task.add_done_callback(self.sending.discard)
+
+        return task
+
+    async def submit_group(self, group):
+        batch = Batch(group.traversals, as_list=True)
+
+        try:
+            results = await self.submit(batch, **self.kwargs)
+        except Exception as e:
+            for future in group.futures:
+                if not future.done():
+                    future.set_exception(e)
+
+            return
+
+        results = results or []
+
+        if len(results) != len(group.futures):
+            error = ClientError(('The response had {} results for {} '
+                                 'traversals').format(len(results),
+                                                      len(group.futures)))
+
+            for future in group.futures:
+                if not future.done():
+                    future.set_exception(error)
+
+            return
+
+        for future, result in zip(group.futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def flush(self):
+        """sends every group and waits until they are answered"""
+        for fingerprint in list(self.groups):
+            self.send(fingerprint)
+
+        if self.sending:
+            await asyncio.gather(*self.sending, return_exceptions=True)
+
+    async def close(self):
+        self.closed = True
+
+        await self.flush()
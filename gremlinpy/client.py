@@ -0,0 +1,428 @@
+"""
+an asyncio Gremlin Server client. it needs the optional websockets package:
+
+    pip install gremlinpy[client]
+
+    async with Client('ws://localhost:8182/gremlin') as client:
+        results = await client.submit(Gremlin().V().limit(10))
+"""
+import asyncio
+import json
+import uuid
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+from gremlinpy.exception import ClientError, ResponseError
+from gremlinpy.gremlin import Gremlin
+from gremlinpy.request import GraphSONSerializer, to_request
+from gremlinpy.statement import Statement
+
+
+SUCCESS = 200
+NO_CONTENT = 204
+PARTIAL_CONTENT = 206
+
+
+class _Done(object):
+    """marks the end of a response in a request's queue"""
+    pass
+
+
+_DONE = _Done()
+
+
+class _Pending(object):
+    """
+    the frames of one response as they arrive on the connection. when
+    max_frames is set and that many frames are waiting to be read, the
+    connection stops reading until the consumer catches up, which is why
+    bounded responses get a connection of their own
+    """
+
+    def __init__(self, request_id, max_frames=0):
+        self.request_id = request_id
+        self.queue = asyncio.Queue(maxsize=max_frames)
+        self.error = None
+
+    async def put(self, item):
+        await self.queue.put(item)
+
+    async def get(self):
+        if self.error is not None and self.queue.empty():
+            raise self.error
+
+        item = await self.queue.get()
+
+        if isinstance(item, Exception):
+            raise item
+
+        return item
+
+    def fail(self, error):
+        self.error = error
+
+        if not self.queue.full():
+            self.queue.put_nowait(error)
+
+    def drain(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+
+class Connection(object):
+    """
+    a single websocket to the server. many requests can be in flight at the
+    same time, responses are routed to them by their requestId. exclusive
+    connections carry one bounded stream at a time
+    """
+
+    def __init__(self, websocket, serializer, exclusive=False):
+        self.websocket = websocket
+        self.serializer = serializer
+        self.exclusive = exclusive
+        self.pending = {}
+        self.in_flight = 0
+        self.closed = False
+        self.reader = asyncio.ensure_future(self.read())
+
+    @classmethod
+    async def open(cls, url, serializer, exclusive=False, **kwargs):
+        websocket = await websockets.connect(url, **kwargs)
+
+        return cls(websocket, serializer, exclusive)
+
+    async def send(self, gremlin, request_id, max_frames=0, **kwargs):
+        if self.closed:
+            raise ClientError('The connection is closed')
+
+        pending = _Pending(str(request_id), max_frames)
+        message = to_request(gremlin, request_id=request_id,
+                             serializer=self.serializer, mime_type=True,
+                             **kwargs)
+        self.pending[pending.request_id] = pending
+
+        try:
+            await self.websocket.send(message)
+        except Exception:
+            self.pending.pop(pending.request_id, None)
+            raise
+
+        return pending
+
+    def forget(self, request_id):
+        self.pending.pop(str(request_id), None)
+
+    async def read(self):
+        error = ClientError('The connection was closed')
+
+        try:
+            async for message in self.websocket:
+                await self.dispatch(message)
+        except Exception as e:
+            error = ClientError('The connection failed: {}'.format(e))
+        finally:
+            self.closed = True
+            pending, self.pending = self.pending, {}
+
+            for request in pending.values():
+                request.fail(error)
+
+    async def dispatch(self, message):
+        if isinstance(message, bytes):
+            message = message.decode('utf-8')
+
+        response = json.loads(message)
+        request_id = str(response.get('requestId'))
+        pending = self.pending.get(request_id)
+
+        if pending is None:
+            return
+
+        status = response.get('status', {})
+        code = status.get('code')
+
+        if code in (SUCCESS, PARTIAL_CONTENT):
+            data = (response.get('result') or {}).get('data')
+            data = self.serializer.deserialize(data)
+
+            if data is not None:
+                await pending.put(data if isinstance(data, list) else [data])
+        elif code != NO_CONTENT:
+            self.pending.pop(request_id, None)
+            error = ResponseError(status.get('message') or str(code), code,
+                                  status.get('attributes'))
+
+            return await pending.put(error)
+
+        if code != PARTIAL_CONTENT:
+            self.pending.pop(request_id, None)
+            await pending.put(_DONE)
+
+    async def close(self):
+        self.closed = True
+
+        await self.websocket.close()
+
+        try:
+            await self.reader
+        except Exception:
+            pass
+
+
+class ResultStream(object):
+    """
+    iterates over the results of a request one frame (a list of results)
+    at a time as the frames arrive:
+
+        async with client.stream(g, max_frames=2) as frames:
+            async for results in frames:
+                ...
+
+    at most max_frames frames are buffered. while the buffer is full the
+    connection is not read from, so the server is slowed down to the pace of
+    the consumer. a bounded stream has a connection to itself so no other
+    request waits on it, the client opens at most max_exclusive of them and
+    further streams wait for one to be given back. timeout applies to the
+    wait for every frame. the connection is given back to the client once
+    the last frame was read or the stream is closed
+    """
+
+    def __init__(self, client, gremlin, request_id, max_frames=0,
+                 timeout=None, **kwargs):
+        self.client = client
+        self.gremlin = gremlin
+        self.request_id = request_id
+        self.max_frames = max_frames
+        self.timeout = timeout
+        self.kwargs = kwargs
+        self.connection = None
+        self.pending = None
+        self.done = False
+
+    async def __aenter__(self):
+        await self.start()
+
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.done:
+            raise StopAsyncIteration
+
+        try:
+            await self.start()
+            frame = await asyncio.wait_for(self.pending.get(), self.timeout)
+        except BaseException:
+            await self.aclose()
+            raise
+
+        if frame is _DONE:
+            await self.aclose()
+            raise StopAsyncIteration
+
+        return frame
+
+    async def start(self):
+        if self.connection is None and not self.done:
+            self.connection = await self.client.acquire(
+                exclusive=self.max_frames > 0)
+
+            try:
+                self.pending = await self.connection.send(
+                    self.gremlin, self.request_id, self.max_frames,
+                    **self.kwargs)
+            except BaseException:
+                await self.aclose()
+                raise
+
+        return self
+
+    async def aclose(self):
+        self.done = True
+
+        if self.connection is not None:
+            self.connection.forget(self.request_id)
+
+            if self.pending is not None:
+                self.pending.drain()
+
+            self.client.release(self.connection)
+            self.connection = None
+
+
+class Client(object):
+    """
+    a bounded pool of connections to a Gremlin Server. each connection
+    carries up to max_in_flight requests at a time and a new connection is
+    only opened when all of the open ones are busy, up to pool_size. once
+    every connection is full, requests wait for a free slot
+
+    submit takes Gremlin instances and Statements and returns the data of
+    every frame in the response. timeout (in seconds) applies to the whole
+    request and raises asyncio.TimeoutError. stream returns a ResultStream
+    that yields the frames as they arrive. bounded streams are not sent on
+    the pooled connections, they each get an exclusive connection (reused
+    by later streams once it is free) so that a paused consumer does not
+    stop the reads of other requests. at most max_exclusive (pool_size by
+    default) of those are open, once every one is in use bounded streams
+    wait for a free one
+    """
+
+    def __init__(self, url, pool_size=4, max_in_flight=16, timeout=None,
+                 serializer=None, max_exclusive=None, **kwargs):
+        if websockets is None:
+            raise ClientError('The websockets package is needed to use the '
+                              'client: pip install gremlinpy[client]')
+
+        self.url = url
+        self.pool_size = pool_size
+        self.max_in_flight = max_in_flight
+        self.max_exclusive = max_exclusive or pool_size
+        self.timeout = timeout
+        self.serializer = serializer or GraphSONSerializer()
+        self.connect_kwargs = kwargs
+        self.connections = []
+        self.exclusive = []
+        self._slots = None
+        self._exclusive_slots = None
+        self._lock = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def _gremlin(self, traversal):
+        if isinstance(traversal, Statement):
+            if getattr(traversal, 'gremlin', None) is None:
+                traversal.set_gremlin(Gremlin())
+
+            str(traversal)
+
+            return traversal.gremlin
+        elif isinstance(traversal, Gremlin):
+            return traversal
+
+        error = 'Only Gremlin and Statement instances can be submitted'
+        raise ClientError(error)
+
+    async def acquire(self, exclusive=False):
+        if exclusive:
+            return await self._acquire_exclusive()
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size *
+                                            self.max_in_flight)
+            self._lock = asyncio.Lock()
+
+        await self._slots.acquire()
+
+        try:
+            async with self._lock:
+                self.connections = [c for c in self.connections
+                                    if not c.closed]
+                connection = None
+                available = [c for c in self.connections
+                             if c.in_flight < self.max_in_flight]
+
+                if available:
+                    connection = min(available, key=lambda c: c.in_flight)
+
+                if connection is None or (connection.in_flight and
+                                          len(self.connections) <
+                                          self.pool_size):
+                    connection = await Connection.open(self.url,
+                                                       self.serializer,
+                                                       **self.connect_kwargs)
+                    self.connections.append(connection)
+
+                connection.in_flight += 1
+        except Exception:
+            self._slots.release()
+            raise
+
+        return connection
+
+    async def _acquire_exclusive(self):
+        if self._exclusive_slots is None:
+            self._exclusive_slots = asyncio.Semaphore(self.max_exclusive)
+
+        await self._exclusive_slots.acquire()
+
+        try:
+            self.exclusive = [c for c in self.exclusive if not c.closed]
+            free = [c for c in self.exclusive if not c.in_flight]
+
+            if free:
+                connection = free[0]
+            else:
+                connection = await Connection.open(self.url, self.serializer,
+                                                   True, **self.connect_kwargs)
+                self.exclusive.append(connection)
+        except BaseException:
+            self._exclusive_slots.release()
+            raise
+
+        connection.in_flight += 1
+
+        return connection
+
+    def release(self, connection):
+        connection.in_flight -= 1
+
+        if connection.exclusive:
+            self._exclusive_slots.release()
+        else:
+            self._slots.release()
+
+    def stream(self, traversal, max_frames=1, timeout=None, request_id=None,
+               **kwargs):
+        """
+        sends the Gremlin instance or Statement and returns a ResultStream
+        over the frames of the response, at most max_frames are buffered.
+        kwargs (op, processor, aliases, etc.) are passed to to_request
+        """
+        gremlin = self._gremlin(traversal)
+        request_id = request_id or uuid.uuid4()
+        timeout = self.timeout if timeout is None else timeout
+
+        return ResultStream(self, gremlin, request_id, max_frames, timeout,
+                            **kwargs)
+
+    async def submit(self, traversal, timeout=None, request_id=None,
+                     **kwargs):
+        """
+        sends the Gremlin instance or Statement and returns a list of every
+        result in the response. kwargs (op, processor, aliases, etc.) are
+        passed to to_request
+        """
+        stream = self.stream(traversal, max_frames=0, request_id=request_id,
+                             **kwargs)
+        timeout = self.timeout if timeout is None else timeout
+
+        async def collect():
+            results = []
+
+            async with stream:
+                async for frame in stream:
+                    results.extend(frame)
+
+            return results
+
+        return await asyncio.wait_for(collect(), timeout)
+
+    async def close(self):
+        connections = self.connections + self.exclusive
+        self.connections, self.exclusive = [], []
+
+        for connection in connections:
+            await connection.close()
@@ -15,3 +15,25 @@ class TokenError(GremlinError):
 
 class PredicateError(GremlinError):
     pass
+
+
+class TemplateError(GremlinError):
+    pass
+
+
+class RequestError(GremlinError):
+    pass
+
+
+class ClientError(GremlinError):
+    pass
+
+
+class ResponseError(ClientError):
+    """an error status returned by the server for a request"""
+
+    def __init__(self, message, code=None, attributes=None):
+        super(ResponseError, self).__init__(message)
+
+        self.code = code
+        self.attributes = attributes or {}
@@ -2,63 +2,244 @@ import sys
 import uuid
 import copy
 import re
+import hashlib
+import io
+import weakref
 
-from six import with_metaclass
+from six import integer_types, string_types, with_metaclass
 
 from .exception import *
 from .statement import Statement
 from .config import GRAPH_VARIABLE
+from .observer import OBSERVERS, notify, timer
+from .steps import STEPS
 
 
 _PREDICATES = {}
+_DYNAMIC_PREDICATES = {}
+_EMPTY_ARGS = ()
+_PLAIN_TYPES = frozenset(string_types + integer_types + (float, type(None)))
 MODULE = sys.modules[__name__]
 
 
+def _walk(link, last=None, expand=None):
+    """
+    iterates over the link and every link after it, up to and including
+    last, expanding shared Segments in place (only the ones that expand
+    returns True for when it is given). a Segment only holds the tokens from
+    its first to its last one, the tokens after them belong to the instance
+    that it was copied from. this is done with a stack instead of recursion
+    so that long chains and chains of copies do not hit the recursion limit
+    """
+    stack = [] if last is None else [(last, None)]
+
+    while link is not None:
+        if isinstance(link, Segment) and (expand is None or expand(link)):
+            stack.append((link.last, link.next))
+            link = link.first
+            continue
+
+        yield link
+
+        end = link.last if isinstance(link, Segment) else link
+        link = link.next
+
+        while stack and end is stack[-1][0]:
+            link = stack.pop()[1]
+
+        while link is None and stack:
+            link = stack.pop()[1]
+
+
+def _unrendered(segment):
+    """Segments without the script of their tokens are walked"""
+    return segment.source is None
+
+
+def _ignore(fragment):
+    pass
+
+
+def _shape(value, holder):
+    """
+    the part of a token's shape that a value contributes. nested instances
+    remember the holder (the token, or light predicate, that hashed them) so
+    that its digest is cleared when they change
+    """
+    if isinstance(value, Gremlin):
+        shape = value.fingerprint()
+        value._hold(holder)
+
+        return shape
+    elif issubclass(type(value), Statement):
+        shape = value.fingerprint()
+        value.gremlin._hold(holder)
+
+        return shape
+    elif isinstance(value, Param):
+        return 'Param:{}'.format(value.name)
+    elif isinstance(value, (list, tuple)):
+        return '[{}]'.format(','.join([_shape(v, holder) for v in value]))
+
+    return str(value)
+
+
+def _digest(link):
+    """
+    returns the digest of the chain up to and including the link. every
+    token caches its digest so only the tokens after the last cached one are
+    hashed. a Segment has the digest of its last token, it is not cached on
+    the Segment so that clearing the tokens' digests is enough. the instance
+    that a Segment's tokens belong to remembers the copy whose token was
+    hashed after them
+    """
+    if isinstance(link, Segment):
+        link = link.last
+
+    stack = [link]
+
+    while stack:
+        link = stack[-1]
+
+        if isinstance(link, GraphVariable) or link.digest is not None:
+            stack.pop()
+            continue
+
+        dependency = link.prev
+
+        if isinstance(dependency, Segment):
+            dependency = dependency.last
+
+        if dependency is None or isinstance(dependency, GraphVariable):
+            digest = b''
+        else:
+            digest = dependency.digest
+
+        if digest is None:
+            stack.append(dependency)
+            continue
+
+        stack.pop()
+
+        if link.prev is not dependency:
+            dependency.gremlin._hash_copy(link.gremlin)
+
+        shape = link.shape().encode('utf-8')
+        link.digest = hashlib.sha1(digest + shape).digest()
+
+    return b'' if isinstance(link, GraphVariable) else link.digest
+
+
+class _Writer(object):
+    """
+    collects the fragments of a streamed script and sends them to a file-like
+    object (anything with a write method) or a socket-like object (anything
+    with a sendall method) once buffer_size characters have been collected.
+    text streams get str fragments, everything else gets encoded bytes.
+    fragments are joined every `join` writes to keep the per-string overhead
+    of the many small fragments out of the buffer
+    """
+    join = 256
+
+    def __init__(self, writer, encoding='utf-8', buffer_size=65536):
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.parts = []
+        self.chunks = []
+        self.size = 0
+        self.written = 0
+        self.send = getattr(writer, 'sendall', None)
+        self.binary = True
+
+        if self.send is None:
+            self.send = writer.write
+            self.binary = not isinstance(writer, io.TextIOBase) and \
+                (isinstance(writer, (io.BufferedIOBase, io.RawIOBase)) or
+                 'b' in getattr(writer, 'mode', ''))
+
+    def __call__(self, fragment):
+        self.parts.append(fragment)
+        self.size += len(fragment)
+
+        if self.size >= self.buffer_size:
+            self.flush()
+        elif len(self.parts) >= self.join:
+            self.chunks.append(''.join(self.parts))
+            self.parts = []
+
+    def flush(self):
+        if self.size:
+            self.chunks.append(''.join(self.parts))
+            data = ''.join(self.chunks)
+
+            if self.binary:
+                data = data.encode(self.encoding)
+
+            self.parts = []
+            self.chunks = []
+            self.size = 0
+            self.written += len(data)
+            self.send(data)
+
+        return self.written
+
+
 class LinkList(object):
     top = None
     bottom = None
 
     def add(self, link):
+        link.prev = self.bottom
         self.bottom.next = link
         self.bottom = link
 
         return self
 
     def remove(self, link, drop_after=False):
-        next = None
-        token = self.top
-
-        while token:
-            if link == token:
-                if drop_after:
-                    token.bottom = None
-                    break
-                else:
-                    token.bottom = token.next.next if token.next else None
+        prev = link.prev
 
-            token = token.next
+        if prev is None or prev.next is not link:
+            return self
+
+        if drop_after:
+            prev.next = None
+            self.bottom = prev
+        else:
+            prev.next = link.next
+
+            if link.next is not None:
+                link.next.prev = prev
+
+            if link is self.bottom:
+                self.bottom = prev
 
         return self
 
     def can_use(self, prev, link):
         return True
 
+    def __iter__(self):
+        return _walk(self.top)
+
     def __str__(self):
         return self.__unicode__()
 
     def __unicode__(self):
-        token = self.top
-        prev = token
-        tokens = []
         variable = ''
 
+        return '{}{}'.format(variable, ''.join(self.render_links(self.top)))
+
+    def render_links(self, token, last=None):
         """
         prepare the gremlin string
             use the token's concat value only if the preceding token is
             not Raw or an empty string (this happens when the graph variable
             is set to ''
         """
-        while token:
+        prev = token
+        tokens = []
+
+        for token in _walk(token, last, _unrendered):
             string = str(token)
 
             if len(tokens) and token.concat and self.can_use(prev, token):
@@ -72,14 +253,31 @@ class LinkList(object):
 
             tokens.append(string)
 
-            prev = token
-            token = token.next
+            prev = token.last if isinstance(token, Segment) else token
+
+        return tokens
 
-        return '{}{}'.format(variable, ''.join(tokens))
+    def write_links(self, token, write, last=None):
+        """
+        streams the same fragments as render_links into the write callable
+        without holding on to them
+        """
+        prev = token
+        first = True
+
+        for token in _walk(token, last, _unrendered):
+            if not first and token.concat and self.can_use(prev, token):
+                if type(prev) is not GraphVariable or len(str(prev)) > 0:
+                    write(token.concat)
+
+            token.stream(write)
+
+            first = False
+            prev = token.last if isinstance(token, Segment) else token
 
 
 class Link(object):
-    next = None
+    __slots__ = ('next', 'prev')
 
 
 class Param(object):
@@ -89,16 +287,437 @@ class Param(object):
         self.value = value if value is not None else name
 
 
+class ParamNaming(object):
+    """
+    the default naming policy. names are built from the Gremlin instance's
+    PARAM_PREFIX, the random id of the root of its tree and a counter so
+    they never collide between instances, but the script changes with every
+    instance. nested instances never create an id of their own
+    """
+    unique = True
+    dedupe = True
+
+    def name(self, gremlin, registry):
+        bound_param = gremlin._root().bound_param
+        count = gremlin.bound_count
+
+        while True:
+            name = '{}_{}_{}'.format(gremlin.PARAM_PREFIX, bound_param, count)
+
+            if name not in registry:
+                return name
+
+            count += 1
+
+
+class PositionalNaming(ParamNaming):
+    """
+    names params by the order that they are bound in across the nested tree,
+    which is the order that they are rendered in: _p0, _p1, ... traversals
+    with the same shape produce byte identical scripts which lets the Gremlin
+    Server reuse its compiled script. values are not deduplicated because
+    that would make the script depend on them
+    """
+    unique = False
+    dedupe = False
+
+    def __init__(self, prefix='_p'):
+        self.prefix = prefix
+
+    def name(self, gremlin, registry):
+        while True:
+            name = '{}{}'.format(self.prefix, registry.position)
+            registry.position += 1
+
+            if name not in registry:
+                return name
+
+
+class _Layer(object):
+    """
+    the params that a registry had bound when it was copied. a layer is
+    shared by the registry and its copies and is never changed, the params
+    that they bind afterwards go into their own maps
+    """
+    __slots__ = ('params', 'names', 'unhashable', 'generated', 'base')
+
+    def __init__(self, params, names, unhashable, generated, base=None):
+        self.params = params
+        self.names = names
+        self.unhashable = unhashable
+        self.generated = generated
+        self.base = base
+
+    def merge(self, newer):
+        """
+        returns a new layer with the params of both, the newer layer's
+        values win. index entries for names that the newer layer bound
+        again are dropped
+        """
+        params = self.params.copy()
+        params.update(newer.params)
+        names = {}
+
+        for value, name in self.names.items():
+            if name not in newer.params:
+                names[value] = name
+
+        for value, name in newer.names.items():
+            names.setdefault(value, name)
+
+        unhashable = [name for name in self.unhashable
+                      if name not in newer.params] + newer.unhashable
+
+        return _Layer(params, names, unhashable,
+                      self.generated | newer.generated, self.base)
+
+
+class ParamRegistry(object):
+    """
+    holds the bound params for a tree of nested Gremlin instances
+
+    a name -> value map is kept along with a value -> name reverse index so
+    that binding a value and checking if it was previously bound are both
+    constant time operations. values that cannot be hashed (lists, dicts,
+    etc.) are tracked separately and compared by equality. names that come
+    from a Param are slots (see Template) and are not indexed, so equal
+    values that are bound later get their own name
+
+    copies share the params bound before the copy as read only layers and
+    only hold the ones that they bind afterwards, so neither copying nor the
+    next bind copies the params. a layer is merged into the one below it
+    when that one is not bigger, which keeps the number of layers to look
+    through logarithmic. the layers are merged into one map the first time
+    that every param is read, through params or generated
+    """
+
+    def __init__(self, params=None, naming=None):
+        self._params = {}
+        self._names = {}
+        self._unhashable = []
+        self._generated = set()
+        self._base = None
+        self.naming = naming or ParamNaming()
+        self.position = 0
+
+        if params:
+            self.update(params)
+
+    @property
+    def params(self):
+        if self._base is not None:
+            self._collapse()
+
+        return self._params
+
+    @property
+    def generated(self):
+        if self._base is not None:
+            self._collapse()
+
+        return self._generated
+
+    def _layers(self):
+        layer = self._base
+
+        while layer is not None:
+            yield layer
+
+            layer = layer.base
+
+    def __contains__(self, name):
+        try:
+            if name in self._params:
+                return True
+
+            for layer in self._layers():
+                if name in layer.params:
+                    return True
+        except TypeError:
+            pass
+
+        return False
+
+    def __getitem__(self, name):
+        if name in self._params or self._base is None:
+            return self._params[name]
+
+        for layer in self._layers():
+            if name in layer.params:
+                return layer.params[name]
+
+        raise KeyError(name)
+
+    def __len__(self):
+        return len(self.params)
+
+    def find(self, value):
+        """returns the name that the value was first bound to or None"""
+        if self._base is None:
+            return self._find(self._params, self._names, self._unhashable,
+                              value)
+
+        maps = [(self._params, self._names, self._unhashable)]
+        maps.extend([(layer.params, layer.names, layer.unhashable)
+                     for layer in self._layers()])
+
+        # the oldest layer holds the first name, names that were bound
+        # again in a newer one do not hold the value anymore
+        for params, names, unhashable in reversed(maps):
+            name = self._find(params, names, unhashable, value)
+
+            if name is not None and self[name] == value:
+                return name
+
+        return None
+
+    def _find(self, params, names, unhashable, value):
+        try:
+            return names.get(value)
+        except TypeError:
+            for name in unhashable:
+                if params.get(name) == value:
+                    return name
+
+        return None
+
+    def set(self, name, value, slot=False):
+        if name in self._params:
+            self._unindex(name, self._params[name])
+
+        self._params[name] = value
+
+        if not slot:
+            try:
+                self._names.setdefault(value, name)
+            except TypeError:
+                self._unhashable.append(name)
+
+        return (name, value)
+
+    def _unindex(self, name, value):
+        try:
+            if self._names.get(value) == name:
+                del self._names[value]
+        except TypeError:
+            if name in self._unhashable:
+                self._unhashable.remove(name)
+
+    def generate(self, gremlin):
+        """creates a new name with the naming policy"""
+        name = self.naming.name(gremlin, self)
+        self._generated.add(name)
+
+        return name
+
+    def update(self, params, skip=None):
+        registry = None
+
+        if isinstance(params, ParamRegistry):
+            registry = params
+            params = params.params
+
+        for name, value in params.items():
+            if skip is None or name not in skip:
+                slot = registry is not None and registry.find(value) != name
+                self.set(name, value, slot)
+
+        return self
+
+    def copy(self):
+        self._freeze()
+
+        registry = ParamRegistry(naming=self.naming)
+        registry._base = self._base
+        registry.position = self.position
+
+        return registry
+
+    def _freeze(self):
+        """moves the params bound since the last copy into a shared layer"""
+        if not self._params and not self._generated:
+            return self
+
+        layer = _Layer(self._params, self._names, self._unhashable,
+                       self._generated, self._base)
+
+        while layer.base is not None and \
+                len(layer.base.params) <= len(layer.params):
+            layer = layer.base.merge(layer)
+
+        self._base = layer
+        self._params = {}
+        self._names = {}
+        self._unhashable = []
+        self._generated = set()
+
+        return self
+
+    def _collapse(self):
+        """merges the shared layers into this registry's own maps"""
+        layers = list(self._layers())
+        merged = _Layer({}, {}, [], set())
+
+        for layer in reversed(layers):
+            merged = merged.merge(layer)
+
+        merged = merged.merge(_Layer(self._params, self._names,
+                                     self._unhashable, self._generated))
+
+        self._params = merged.params
+        self._names = merged.names
+        self._unhashable = merged.unhashable
+        self._generated = merged.generated
+        self._base = None
+
+        return self
+
+
+class ParamNamespace(ParamRegistry):
+    """
+    binds the params of one traversal into another registry (a Batch's or
+    the one a frozen statement is nested into). a name that the registry
+    already holds with a different value is bound as namespace(name)
+    instead, and every later bind of the name gets the new one, so the
+    tokens render the renamed param. equal values that the registry already
+    holds are reused when the naming deduplicates
+
+    only the names that were bound through it are in it, so a string that
+    is equal to a name that another traversal bound stays a string
+    """
+
+    def __init__(self, registry, namespace, naming=None):
+        super(ParamNamespace, self).__init__(naming=naming or
+                                             registry.naming)
+        self.registry = registry
+        self.namespace = namespace
+        self.renames = {}
+        self.bound = set()
+
+    @property
+    def params(self):
+        return dict([(name, self.registry[bound])
+                     for name, bound in self.renames.items()])
+
+    def __contains__(self, name):
+        try:
+            return name in self.renames or name in self.bound
+        except TypeError:
+            return False
+
+    def __getitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+
+        return self.registry[self.renames.get(name, name)]
+
+    def __len__(self):
+        return len(self.renames)
+
+    def find(self, value):
+        return self.registry.find(value)
+
+    def set(self, name, value, slot=False):
+        registry = self.registry
+        bound = self.renames.get(name)
+
+        if bound is None and name in self.bound:
+            bound = name
+        elif bound is None:
+            if name not in registry or registry[name] != value:
+                if not slot and self.naming.dedupe:
+                    bound = registry.find(value)
+
+                if bound is None and name in registry:
+                    bound = self.namespace(name)
+
+                    while bound in registry:
+                        bound = '_' + bound
+
+            if bound is None:
+                bound = name
+
+        self.renames[name] = bound
+        self.bound.add(bound)
+
+        return registry.set(bound, value, slot)
+
+
+class Template(object):
+    """
+    a compiled traversal. the script is fixed and each bound param is a slot
+    that can be given a new value without building the traversal again:
+
+        g = Gremlin().V(Param('user_id', 1)).limit(Param('limit', 10))
+        template = g.compile()
+        script, bindings = template.render(user_id=12, limit=5)
+    """
+
+    def __init__(self, script, bindings, fingerprint=None):
+        self.script = script
+        self.bindings = bindings
+        self.fingerprint = fingerprint
+
+    @property
+    def slots(self):
+        return list(self.bindings.keys())
+
+    def render(self, params=None, **kwargs):
+        bindings = self.bindings.copy()
+
+        if params:
+            kwargs.update(params)
+
+        for name, value in kwargs.items():
+            if name not in bindings:
+                error = '{} is not a slot in this template'.format(name)
+                raise TemplateError(error)
+
+            bindings[name] = value
+
+        return (self.script, bindings)
+
+    def __str__(self):
+        return self.script
+
+    def __eq__(self, other):
+        """templates are equal when the traversals have the same shape"""
+        if not isinstance(other, Template):
+            return NotImplemented
+
+        return self.fingerprint == other.fingerprint
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash(self.fingerprint)
+
+
 class Gremlin(LinkList):
     PARAM_PREFIX = 'GPY_PARAM'
+    PARAM_NAMING = ParamNaming()
+    # the tokens (or light predicates) that hashed this instance's
+    # fingerprint into their digest
+    _holders = None
+    # the copies that hashed their own tokens after this instance's tokens
+    _copies = None
 
     def __init__(self, graph_variable=GRAPH_VARIABLE, parent=None):
+        # the same state that reset() leaves behind, set directly because
+        # an instance is created for every anonymous traversal
+        self._script = None
         self.gv = graph_variable
-        self.top = GraphVariable(self, graph_variable)
+        self.top = self.bottom = GraphVariable(self, graph_variable or '')
         self._gremlins = []
+        self._params = None
+        self._bound_param = None
+        self.bound_count = 0
+        self.return_var = None
         self.parent = None
-
-        self.reset()
+        self._shared = None
 
         if parent:
             self.set_parent_gremlin(parent)
@@ -112,50 +731,315 @@ class Gremlin(LinkList):
 
         self.parent = None
         self.bottom = self.top
-        self.bound_params = {}
-        self.bound_param = str(uuid.uuid4())[-5:]
+        self._params = None
+        self._bound_param = None
         self.bound_count = 0
         self.top.next = None
         self.return_var = None
         self._gremlins = []
+        self._shared = None
 
         return self.set_graph_variable(self.gv)
 
-    def copy(self, gremlin=None):
-        if not gremlin:
-            gremlin = Gremlin(self.gv)
-            gremlin.bound_params = copy.deepcopy(self.bound_params)
+    def copy(self, gremlin=None, deep=False):
+        """
+        copies the current chain into a new Gremlin instance
+
+        by default the tokens built so far are not copied. the copy holds a
+        Segment that points to them, while this instance keeps its chain as
+        it is, and the bound params are shared until either one binds a new
+        one, so branching costs the same no matter how long the chain is.
+        nested Gremlin instances in the shared tokens are shared as well
+
+        the shared tokens (this instance's up to _shared, and the ones in
+        the copy's Segment) are bound before they are shared and are never
+        changed in place after that. removing or replacing one gives the
+        instance that does it its own clones of them first, which keep their
+        bound args. nesting the instance where its params are bound again
+        (see unbind and render_into) gives it unbound deep copies of them
+
+        pass deep=True, or the gremlin instance to copy into, to copy every
+        token and deep copy the bound params
+        """
+        if deep or gremlin is not None:
+            return self._deep_copy(gremlin)
+
+        if self._script is None:
+            # bind every param now so the shared tokens never bind again
+            self._bind()
+
+        gremlin = Gremlin(self.top.value)
+        gremlin._params = self.params.copy()
+        gremlin.return_var = self.return_var
+        tail = self.bottom if type(self.bottom) is Attribute else None
+        last = tail.prev if tail is not None else self.bottom
+
+        if last is not self.top:
+            gremlin.add_token(self._segment(gremlin, last, tail))
+            self._shared = last
+
+        if tail is not None:
+            gremlin.add_token(Attribute(gremlin, tail.value))
+
+        return gremlin
+
+    def _bind(self):
+        """
+        binds the params of every token that is not shared yet without
+        keeping the rendered script
+        """
+        token = self.top.next if self._shared is None else self._shared.next
+
+        while token is not None:
+            if not isinstance(token, Segment):
+                token.stream(_ignore)
+
+            token = token.next
+
+        return self
+
+    def _segment(self, gremlin, last, tail):
+        """
+        the Segment that shares the tokens up to last with the copy. when
+        this instance was rendered the Segment slices its tokens out of the
+        script instead of walking them
+        """
+        first = self.top.next
+        source = self._script
+
+        if source is None:
+            return Segment(gremlin, first, last)
+
+        head = self.top.value
+
+        if head and first.concat:
+            head += first.concat
+
+        if self.return_var is not None:
+            head = '{} = {}'.format(self.return_var, head)
+
+        end = len(source)
+
+        if tail is not None:
+            prev = last.last if isinstance(last, Segment) else last
+            end -= len(tail.value)
+
+            if self.can_use(prev, tail):
+                end -= len(tail.concat)
+
+        if not source.startswith(head):
+            return Segment(gremlin, first, last)
+
+        return Segment(gremlin, first, last, source, len(head), end)
+
+    def render_to(self, writer, encoding='utf-8', buffer_size=65536):
+        """
+        streams the script into a file-like or socket-like writer instead of
+        building it in memory. nested instances are streamed as well, only
+        buffer_size characters are held at a time. str fragments are written
+        to text streams, anything else gets bytes in the given encoding.
+        returns the number of characters or bytes written
+        """
+        start = timer() if OBSERVERS else None
+        write = _Writer(writer, encoding, buffer_size)
+
+        self._stream(write)
+        written = write.flush()
+
+        if start is not None:
+            notify('render', self, timer() - start, written, len(self.params))
+
+        return written
+
+    def to_request(self, request_id=None, serializer=None, **kwargs):
+        """
+        builds the Gremlin Server request message for this instance as
+        bytes. see gremlinpy.request.to_request for the options
+        """
+        from .request import to_request
+
+        return to_request(self, request_id=request_id, serializer=serializer,
+                          **kwargs)
+
+    def _stream(self, write):
+        if self._script is not None:
+            write(self._script)
+        else:
+            if self.return_var is not None:
+                write('{} = '.format(self.return_var))
+
+            self.write_links(self.top, write)
+
+    def compile(self):
+        """freezes the current chain into a Template"""
+        script = str(self)
+
+        return Template(script, self.bound_params.copy(), self.fingerprint())
+
+    def fingerprint(self):
+        """
+        a stable hash of the shape of the traversal: the token types, names
+        and nesting, ignoring the values of the bound params. it is computed
+        incrementally, only the tokens added since the last call are hashed.
+        nested instances are hashed the first time their parent is, when one
+        of them changes afterwards only the digests from the token that holds
+        it on are computed again, in this instance and the ones holding it
+        """
+        shape = '{}|{}|'.format(self.top.value, self.return_var)
+        digest = _digest(self.bottom)
+
+        return hashlib.sha1(shape.encode('utf-8') + digest).hexdigest()[:16]
+
+    def _deep_copy(self, gremlin=None):
+        if not gremlin:
+            gremlin = Gremlin(self.gv)
+            gremlin._params = copy.deepcopy(self.params)
+
+            if not gremlin._params.naming.dedupe:
+                # the copied tokens bind their values again, in order, so the
+                # names that were generated are generated again
+                params = gremlin._params
+                gremlin._params = ParamRegistry(naming=params.naming)
+                gremlin._params.update(params, params.generated)
+
+        if self.top:
+            gremlin.top = self.top.copy(gremlin)
+
+        if self.return_var:
+            gremlin.return_var = self.return_var
+
+        return gremlin._invalidate()
+
+    @property
+    def bound_param(self):
+        """
+        the random id used in generated param names. it is only created
+        when the instance binds a param with a generated name
+        """
+        if self._bound_param is None:
+            self._bound_param = str(uuid.uuid4())[-5:]
+
+        return self._bound_param
+
+    @bound_param.setter
+    def bound_param(self, bound_param):
+        self._bound_param = bound_param
+
+    @property
+    def params(self):
+        """
+        the ParamRegistry shared by this instance and its nested tree. it is
+        created the first time that the root instance needs it
+        """
+        gremlin = self._root()
+
+        if gremlin._params is None:
+            gremlin._params = ParamRegistry(naming=gremlin.PARAM_NAMING)
+
+        return gremlin._params
+
+    def _root(self):
+        gremlin = self
+
+        while gremlin.parent is not None:
+            gremlin = gremlin.parent
+
+        return gremlin
+
+    @property
+    def bound_params(self):
+        return self.params.params
+
+    @bound_params.setter
+    def bound_params(self, params):
+        self._params = ParamRegistry(params)
+
+    @property
+    def stack_bound_params(self):
+        return self.params.params.copy()
+
+    def can_use(self, prev, link):
+        return type(prev) is not Raw
+
+    def __unicode__(self):
+        if self._script is None:
+            start = timer() if OBSERVERS else None
+            string = super(Gremlin, self).__unicode__()
+            variable = ''
+
+            if self.return_var is not None:
+                variable = '{} = '.format(self.return_var)
+
+            self._script = '{}{}'.format(variable, string)
+
+            if start is not None:
+                notify('render', self, timer() - start, len(self._script),
+                       len(self.params))
+
+        return self._script
+
+    def _invalidate(self):
+        """
+        clears the cached script of this instance and every parent, and the
+        digests that were computed from their fingerprints
+        """
+        gremlin = self
+
+        while gremlin is not None:
+            gremlin._script = None
+
+            if gremlin._holders is not None:
+                gremlin._release()
+
+            gremlin = gremlin.parent
+
+        return self
+
+    def _hold(self, holder):
+        """remembers the token that hashed this instance's fingerprint"""
+        if self._holders is None:
+            self._holders = [holder]
+        elif holder not in self._holders:
+            self._holders.append(holder)
 
-        if self.top:
-            gremlin.top = self.top.copy(gremlin)
+        return self
 
-        if self.return_var:
-            gremlin.return_var = self.return_var
+    def _hash_copy(self, gremlin):
+        """remembers a copy that hashed tokens after this instance's ones"""
+        if gremlin is not self:
+            if self._copies is None:
+                self._copies = weakref.WeakSet()
 
-        return gremlin
+            self._copies.add(gremlin)
 
-    @property
-    def stack_bound_params(self):
-        parent = self.parent
-        params = copy.deepcopy(self.bound_params)
+        return self
 
-        while parent:
-            params.update(parent.stack_bound_params)
-            parent = parent.parent
+    def _release(self):
+        """
+        clears the digests of the tokens that hashed this instance, and of
+        the tokens after them, and does the same for the instances that they
+        belong to: their holders and the copies that hashed their tokens.
+        only the traversals that hold a changed one are hashed again
+        """
+        gremlins = [self]
 
-        return params
+        while gremlins:
+            gremlin = gremlins.pop()
+            holders, gremlin._holders = gremlin._holders, None
+            copies, gremlin._copies = gremlin._copies, None
 
-    def can_use(self, prev, link):
-        return type(prev) is not Raw
+            for holder in holders or _EMPTY_ARGS:
+                if isinstance(holder, Token):
+                    holder.gremlin._clear_digests(holder)
+                    holder = holder.gremlin
 
-    def __unicode__(self):
-        string = super(Gremlin, self).__unicode__()
-        variable = ''
+                gremlins.append(holder)
 
-        if self.return_var is not None:
-            variable = '{} = '.format(self.return_var)
+            for copied in copies or _EMPTY_ARGS:
+                copied._clear_digests(copied.top.next)
+                gremlins.append(copied)
 
-        return '{}{}'.format(variable, string)
+        return self
 
     def __getattr__(self, attr):
         attr = Attribute(self, attr)
@@ -163,19 +1047,33 @@ class Gremlin(LinkList):
         return self.add_token(attr)
 
     def __call__(self, *args):
-        func_name = str(self.bottom)
+        bottom = self.bottom
+
+        if type(bottom) is Attribute:
+            func_name = bottom.value
+            step = _STEPS.get(func_name)
+
+            if step is not None:
+                step.check(args)
+
+                if args and issubclass(type(args[-1]), Predicate):
+                    func = UnboudFunction(self, func_name, *args)
+                else:
+                    func = Function(self, func_name, *args)
 
-        if func_name in _PREDICATES.keys() and hasattr(MODULE, func_name):
+                return self.replace_token(bottom, func)
+        else:
+            func_name = str(bottom)
+
+        if func_name in _PREDICATES and hasattr(MODULE, func_name):
             pred = getattr(MODULE, func_name)(*args, gremlin=self)
-            func = pred.bottom
+            func = Function(self, pred._function, *args)
         elif len(args) and issubclass(type(args[-1]), Predicate):
             func = UnboudFunction(self, func_name, *args)
         else:
             func = Function(self, func_name, *args)
 
-        self.bottom.next = func
-
-        return self.remove_token(self.bottom).add_token(func)
+        return self.replace_token(self.bottom, func)
 
     def __getitem__(self, val):
         # TODO: clean this up
@@ -203,12 +1101,106 @@ class Gremlin(LinkList):
         return self.add_token(index)
 
     def set_parent_gremlin(self, gremlin):
+        if self.parent is gremlin:
+            return self.bound_params
+
+        params = self._root()._params
         self.parent = gremlin
 
         self._gremlins.append(gremlin)
-        gremlin.bind_params(self.bound_params)
 
-        return self.bind_params(gremlin.bound_params)
+        if params is None:
+            return self.bound_params
+
+        registry = gremlin.params
+
+        if registry is not params:
+            skip = None
+
+            if params.generated and not (params.naming.unique and
+                                         registry.naming.unique):
+                skip = self.unbind(params)
+
+            registry.update(params, skip)
+
+        return self.bound_params
+
+    def unbind(self, params):
+        """
+        clears the names that were generated when this instance was rendered
+        on its own so that they are generated again, in order, by the
+        registry that it is nested in, and returns them
+        """
+        self._unbind()
+
+        return params.generated
+
+    def _unbind(self):
+        """
+        clears the bound args of every token in the nested tree. the
+        instances that share tokens with copies get unbound deep copies of
+        them first, so the copies keep their names
+        """
+        gremlins = [self]
+
+        while gremlins:
+            gremlin = gremlins.pop()
+            gremlin._script = None
+
+            if isinstance(gremlin, Predicate) and not gremlin._materialized:
+                gremlin._token = None
+                gremlins.extend([arg for arg in gremlin.args
+                                 if isinstance(arg, Gremlin)])
+                continue
+
+            token = gremlin.top
+
+            while gremlin._shared is None and token is not None and \
+                    not isinstance(token, Segment):
+                token = token.next
+
+            if token is not None:
+                gremlin._privatize(deep=True)
+
+            token = gremlin.top
+
+            while token is not None:
+                token.bound_args = None
+
+                for value in (token.value,) + tuple(token.args):
+                    if isinstance(value, Gremlin):
+                        gremlins.append(value)
+
+                token = token.next
+
+        return self
+
+    def render_into(self, registry, namespace):
+        """
+        renders the instance with its params bound into another registry
+        through a ParamNamespace, names that collide there are renamed to
+        namespace(name) as they are bound. the params bound so far (by a
+        statement's build, or an earlier render) are bound into it first.
+        the instance is not attached to anything and renders on its own
+        again afterwards. when it shares tokens with a copy it gets its own
+        copies of them first, see _unbind
+        """
+        parent, own = self.parent, self._params
+        naming = own.naming if own is not None else self.PARAM_NAMING
+        params = ParamNamespace(registry, namespace, naming)
+
+        self._unbind()
+        self.parent = None
+        self._params = params
+
+        try:
+            if own is not None:
+                params.update(own, own.generated)
+
+            return str(self)
+        finally:
+            self._unbind()
+            self.parent, self._params = parent, own
 
     def bind_params(self, params=None):
         if params is None:
@@ -225,32 +1217,36 @@ class Gremlin(LinkList):
 
     def bind_param(self, value, name=None):
         self.bound_count += 1
+        params = self.params
 
-        if isinstance(value, Param):
+        slot = isinstance(value, Param)
+
+        if slot:
             name = value.name
             value = value.value
-        elif not name and value in self.stack_bound_params.values():
-            for n, v in self.bound_params.items():
-                if v == value:
-                    name = n
-                    break
-        elif not name and value in self.stack_bound_params.keys():
-            for n, v in self.bound_params.items():
-                if n == value:
-                    name = n
-                    value = v
-                    break
+        elif not name:
+            if params.naming.dedupe:
+                name = params.find(value)
+
+            if name is None and value in params:
+                name = value
+                value = params[name]
 
         if name is None:
-            name = '{}_{}_{}'.format(self.PARAM_PREFIX, self.bound_param,
-                                     self.bound_count)
+            name = params.generate(self)
 
-        self.bound_params[name] = value
+        bound = params.set(name, value, slot)
 
-        if self.parent is not None:
-            self.parent.bind_param(value, name)
+        if OBSERVERS:
+            notify('bind', self, name, value)
 
-        return (name, value)
+        return bound
+
+    def set_param_naming(self, naming=None):
+        """sets the ParamNaming policy used by the nested tree's registry"""
+        self.params.naming = naming or ParamNaming()
+
+        return self
 
     def range(self, start, end):
         if isinstance(start, (int, float, complex)):
@@ -295,19 +1291,144 @@ class Gremlin(LinkList):
         return self.add_token(raw)
 
     def add_token(self, token):
+        token.prev = self.bottom
         self.bottom.next = token
         self.bottom = token
 
-        return self
+        return self._invalidate()
 
     def remove_token(self, remove):
-        token = self.top
+        remove = self._own(remove)
+
+        if remove is None:
+            return self
+
+        prev = remove.prev
+
+        if prev is None or prev.next is not remove:
+            return self
+
+        prev.next = remove.next
+
+        if remove.next is not None:
+            remove.next.prev = prev
+
+        if remove is self.bottom:
+            self.bottom = prev
+
+        self._clear_digests(remove.next)
+        remove.next = remove.prev = None
+
+        return self._invalidate()
+
+    def replace_token(self, token, replacement):
+        """swaps the token for the replacement in constant time"""
+        token = self._own(token)
+
+        if token is None:
+            return self
+
+        prev = token.prev
+
+        if prev is None or prev.next is not token:
+            return self
+
+        replacement.prev = prev
+        replacement.next = token.next
+        prev.next = replacement
+
+        if token.next is not None:
+            token.next.prev = replacement
+
+        if token is self.bottom:
+            self.bottom = replacement
+
+        self._clear_digests(token.next)
+        token.next = token.prev = None
+
+        return self._invalidate()
+
+    def _own(self, token):
+        """
+        returns the token when it is in this chain and not shared with a
+        copy, this instance's clone of it when it is shared, or None when it
+        is not in the chain at all (nothing is cloned then)
+        """
+        if self._owns(token):
+            return token
+
+        if isinstance(token, Segment):
+            held = token.gremlin is self
+        else:
+            held = any(link is token for link in self)
+
+        return self._privatize().get(token) if held else None
+
+    def _owns(self, token):
+        """whether the token is in this chain and not shared with a copy"""
+        if isinstance(token, Segment):
+            return False
+
+        while token is not None:
+            if token is self._shared:
+                return False
+            elif token is self.bottom:
+                return True
+
+            token = token.next
+
+        return False
+
+    def _privatize(self, deep=False):
+        """
+        replaces the tokens that this instance shares with its copies, or
+        with the instance that it was copied from, with its own shallow
+        copies of them (unbound deep copies when deep is True). returns a map
+        of the shared tokens to their copies, a Segment maps to the copy of
+        its last token
+        """
+        tokens = {}
+        shared = self._shared
+        token = self.top.next
+        self.top.next = None
+        self.bottom = self.top
+        self._shared = None
+
+        while token is not None:
+            following = token.next
+
+            if isinstance(token, Segment):
+                for link in _walk(token, token.last):
+                    tokens[link] = self._relink(self._clone(link, deep))
+
+                tokens[token] = self.bottom
+            elif shared is not None:
+                tokens[token] = self._relink(self._clone(token, deep))
+
+                if token is shared:
+                    shared = None
+            else:
+                tokens[token] = self._relink(token)
+
+            token = following
+
+        return tokens
+
+    def _clone(self, token, deep):
+        return token.copy_token(self) if deep else token.clone(self)
 
-        while token:
-            if token.next == remove:
-                token.next = token.next.next
-                break
+    def _relink(self, token):
+        token.prev = self.bottom
+        token.next = None
+        self.bottom.next = token
+        self.bottom = token
+
+        return token
 
+    def _clear_digests(self, token):
+        """the digests after a removed or replaced token are out of date"""
+        while token is not None:
+            token.digest = None
             token = token.next
 
         return self
@@ -315,7 +1436,7 @@ class Gremlin(LinkList):
     def set_ret_variable(self, return_var=None):
         self.return_var = return_var
 
-        return self
+        return self._invalidate()
 
     def set_graph_variable(self, graph_variable='g'):
         if not graph_variable:
@@ -323,15 +1444,16 @@ class Gremlin(LinkList):
 
         self.top.value = graph_variable
 
-        return self
+        return self._invalidate()
 
     def apply_statement(self, statement):
-        statement.set_gremlin(self).build()
+        statement.set_gremlin(self).observed_build()
 
         return self
 
 
 class _Tokenable(object):
+    __slots__ = ()
 
     def __str__(self):
         return str(self.__unicode__())
@@ -339,82 +1461,223 @@ class _Tokenable(object):
     def __unicode__(self):
         return self.value
 
+    def stream(self, write):
+        write(str(self))
+
+    def stream_value(self, value, write):
+        if isinstance(value, Gremlin):
+            value._stream(write)
+        else:
+            write(str(value))
+
+    def stream_call(self, write):
+        write('{}('.format(self.value))
+
+        for index, arg in enumerate(self.bound_args):
+            if index:
+                write(', ')
+
+            self.stream_value(arg, write)
+
+        write(')')
+
     def apply_statement(self, statement):
-        if hasattr(statement, 'gremlin') == False:
+        if statement.gremlin is None:
             statement.set_gremlin(Gremlin())
 
         statement.gremlin.set_parent_gremlin(self.gremlin)
 
         return statement
 
+    def nest_statement(self, statement):
+        """
+        returns the statement's script once its params are in the gremlin
+        instance's registry. frozen statements are never attached, their
+        bindings are copied into the registry
+        """
+        if statement.frozen:
+            return statement.nest(self.gremlin)
+
+        self.apply_statement(statement)
+
+        return str(statement)
+
     def fix_value(self, value):
-        if isinstance(value, Param):
+        if type(value) in _PLAIN_TYPES:
+            return value
+        elif isinstance(value, Param):
             return self.gremlin.bind_param(value)[0]
         elif isinstance(value, Token):
             return value
         elif isinstance(value, Predicate):
-            value.gremlin = Gremlin(self.gremlin.gv)
+            if not value._materialized and value.parent is not None and \
+                    value.parent is not self.gremlin:
+                # a predicate shared by traversals (ADULT = gt(18)) renders
+                # into the first one, the others get their own copy
+                value = value.copy()
+
             value.set_parent_gremlin(self.gremlin)
 
-            return str(value)
+            return value
         elif isinstance(value, (list, tuple)):
             value = [self.fix_value(a) for a in value]
 
             return value if isinstance(value, list) else tuple(value)
         elif issubclass(type(value), Statement):
-            self.apply_statement(value)
-            return str(value)
+            return self.nest_statement(value)
         elif isinstance(value, Gremlin):
             value.set_parent_gremlin(self.gremlin)
 
-            return str(value)
+            return value
         else:
             return value
 
 
 class Token(Link, _Tokenable):
-    next = None
-    value = None
-    args = []
+    """
+    tokens use __slots__ and share a single empty args tuple to keep the
+    per-token memory footprint small
+    """
+    __slots__ = ('gremlin', 'value', 'args', 'bound_args', 'digest')
     concat = ''
 
     def __init__(self, gremlin, value, *args):
+        self.next = None
+        self.prev = None
+        self.bound_args = None
+        self.digest = None
         self.gremlin = gremlin
         self.value = self.fix_value(value)
-        self.args = list(args)
+        self.args = args or _EMPTY_ARGS
+
+        if OBSERVERS:
+            notify('token', self)
 
     def copy(self, gremlin):
-        value = copy.deepcopy(self.value)
+        """copies this token and every token after it onto the gremlin"""
+        head = None
+
+        for link in _walk(self):
+            token = link.copy_token(gremlin)
+
+            if head is None:
+                head = token
+            else:
+                token.prev = gremlin.bottom
+                gremlin.bottom.next = token
+
+            gremlin.bottom = token
+
+        return head
+
+    def clone(self, gremlin):
+        """
+        a shallow copy of the token for the gremlin instance, it keeps the
+        arguments that were already bound
+        """
+        token = object.__new__(type(self))
+        token.next = token.prev = None
+        token.gremlin = gremlin
+        token.value = self.value
+        token.args = self.args
+        token.bound_args = self.bound_args
+
+        return token
+
+    def copy_token(self, gremlin):
+        if isinstance(self.value, Gremlin):
+            value = self.value.copy(deep=True)
+        else:
+            value = copy.deepcopy(self.value)
+
         args = []
 
         for arg in self.args:
             if isinstance(arg, Gremlin):
-                args.append(arg.copy())
+                args.append(arg.copy(deep=True))
             else:
                 args.append(copy.deepcopy(arg))
 
-        token = getattr(MODULE, self.__class__.__name__)(gremlin, value, *args)
-        gremlin.bottom = token
+        return getattr(MODULE, self.__class__.__name__)(gremlin, value, *args)
+
+    def shape(self):
+        """describes the token without the values of the bound params"""
+        args = ','.join([_shape(arg, self) for arg in self.args])
+
+        return '{}:{}({})'.format(type(self).__name__,
+                                  _shape(self.value, self), args)
+
+
+class Segment(Token):
+    """
+    the run of tokens, from first to last, that Gremlin.copy shares between
+    an instance and its copy. only the copy holds the Segment, the tokens
+    stay in the chain of the instance that was copied. iterating over the
+    copy yields the tokens, rendering it either slices them out of the
+    source script that the original had rendered or walks them. they were
+    bound before they were shared so rendering them never binds a param
+    """
+    __slots__ = ('first', 'last', 'concat', 'source', 'start', 'end')
+
+    def __init__(self, gremlin, first, last, source=None, start=0, end=None):
+        self.next = None
+        self.prev = None
+        self.bound_args = None
+        self.digest = None
+        self.gremlin = gremlin
+        self.value = None
+        self.args = _EMPTY_ARGS
+        self.first = first
+        self.last = last.last if isinstance(last, Segment) else last
+        self.concat = first.concat
+        self.source = source
+        self.start = start
+        self.end = end
+
+    def __unicode__(self):
+        if self.source is not None:
+            return self.source[self.start:self.end]
+
+        parts = []
+        self.gremlin.write_links(self.first, parts.append, self.last)
+
+        return ''.join(parts)
+
+    def stream(self, write):
+        if self.source is not None:
+            write(self.source[self.start:self.end])
+        else:
+            self.gremlin.write_links(self.first, write, self.last)
 
-        if self.next:
-            nxt = self.next.copy(gremlin)
-            token.next = nxt
+    def clone(self, gremlin):
+        token = Segment(gremlin, self.first, self.last, self.source,
+                        self.start, self.end)
 
         return token
 
 
 class GraphVariable(Token):
+    __slots__ = ()
 
     def __unicode__(self):
-        if self.value == '':
-            self.concat = ''
-
         return self.value
 
 
 class Attribute(Token):
+    __slots__ = ()
     concat = '.'
 
+    def __init__(self, gremlin, value, *args):
+        # the value is always a step or property name, there is nothing for
+        # fix_value to do. every step is added as an Attribute first
+        self.next = self.prev = self.bound_args = self.digest = None
+        self.gremlin = gremlin
+        self.value = value
+        self.args = args or _EMPTY_ARGS
+
+        if OBSERVERS:
+            notify('token', self)
+
 
 class Function(Token):
     """
@@ -428,47 +1691,82 @@ class Function(Token):
         value2 = g.bind_param('value2')[0]
         g.functionName('not_bound', value1, value2, ...)
     """
+    __slots__ = ()
     concat = '.'
 
     def __unicode__(self):
-        params = []
+        if self.bound_args is None:
+            self.bound_args = [self.bind_arg(arg) for arg in self.args]
 
-        if len(self.args):
-            for arg in self.args:
-                if issubclass(type(arg), Statement):
-                    self.apply_statment(arg)
+        params = [str(arg) for arg in self.bound_args]
 
-                    params.append(str(arg))
-                elif issubclass(type(arg), Gremlin):
-                    arg.set_parent_gremlin(self.gremlin)
+        return '{}({})'.format(self.value, ', '.join(params))
 
-                    params.append(str(arg))
-                elif isinstance(arg, Param):
-                    params.append(self.gremlin.bind_param(arg)[0])
-                else:
-                    params.append(self.gremlin.bind_param(arg)[0])
+    def stream(self, write):
+        if self.bound_args is None:
+            self.bound_args = [self.bind_arg(arg) for arg in self.args]
 
-        return '{}({})'.format(self.value, ', '.join(params))
+        self.stream_call(write)
+
+    def shape(self):
+        args = []
+
+        for arg in self.args:
+            if isinstance(arg, (Gremlin, Statement, Param)):
+                args.append(_shape(arg, self))
+            else:
+                args.append('?')
+
+        return '{}:{}({})'.format(type(self).__name__, self.value,
+                                  ','.join(args))
+
+    def bind_arg(self, arg):
+        """
+        binds the argument the first time that the function is rendered.
+        nested Gremlin instances are returned as is because they keep their
+        own cached script
+        """
+        if issubclass(type(arg), Statement):
+            return self.nest_statement(arg)
+        elif issubclass(type(arg), Gremlin):
+            arg.set_parent_gremlin(self.gremlin)
+
+            return arg
+        else:
+            return self.gremlin.bind_param(arg)[0]
 
 
 class FunctionRaw(Function):
+    __slots__ = ()
     concat = ''
 
 
 class UnboudFunction(Token):
+    __slots__ = ()
     concat = '.'
 
     def __unicode__(self):
-        args = [self.fix_value(a) for a in self.args]
+        if self.bound_args is None:
+            self.bound_args = [self.fix_value(a) for a in self.args]
+
+        args = [str(arg) for arg in self.bound_args]
 
         return '{}({})'.format(self.value, ', '.join(args))
 
+    def stream(self, write):
+        if self.bound_args is None:
+            self.bound_args = [self.fix_value(a) for a in self.args]
+
+        self.stream_call(write)
+
 
 class UnboudFunctionRaw(UnboudFunction):
+    __slots__ = ()
     concat = ''
 
 
 class Index(Token):
+    __slots__ = ()
 
     def __unicode__(self):
         if self.value.stop is not None:
@@ -480,43 +1778,42 @@ class Index(Token):
 
 
 class Closure(Token):
+    """
+    nested Statement and Gremlin values are attached by fix_value when the
+    token is created
+    """
+    __slots__ = ()
 
     def __unicode__(self):
-        if issubclass(type(self.value), Statement):
-            self.gremlin.apply_statment(self.value)
-
-            self.value = str(self.gremlin)
-        elif issubclass(type(self.value), Gremlin):
-            self.value.set_parent_gremlin(self.gremlin)
-
         return '{%s}' % str(self.value)
 
+    def stream(self, write):
+        write('{')
+        self.stream_value(self.value, write)
+        write('}')
+
 
 class ClosureArguments(Token):
+    __slots__ = ()
 
     def __unicode__(self):
-        if issubclass(type(bound), Statement):
-            self.gremlin.apply_statment(self.value)
-
-            self.value = str(self.gremlin)
-        elif issubclass(type(self.value), Gremlin):
-            self.value.set_parent_gremlin(self.gremlin)
+        return '{{{} -> {}}}'.format(', '.join(self.args), str(self.value))
 
-        return '{{} -> {}}'.format(','.join(self.args), str(self.value))
+    def stream(self, write):
+        write('{{{} -> '.format(', '.join(self.args)))
+        self.stream_value(self.value, write)
+        write('}')
 
 
 class Raw(Token):
+    __slots__ = ()
 
     def __unicode__(self):
-        if issubclass(type(self.value), Statement):
-            self.apply_statement(self.value)
-
-            self.value = str(self.value)
-        elif issubclass(type(self.value), Gremlin):
-            self.value.set_parent_gremlin(self.gremlin)
-
         return str(self.value)
 
+    def stream(self, write):
+        self.stream_value(self.value, write)
+
 
 class _MetaPredicate(type):
 
@@ -528,13 +1825,109 @@ class _MetaPredicate(type):
 
 
 class Predicate(with_metaclass(_MetaPredicate, Gremlin)):
+    """
+    predicates only hold their arguments and the instance that they are
+    nested in. they are rendered as a single Function token that binds its
+    arguments into that instance's registry. the full Gremlin instance, with
+    its own chain and registry, is only built when something is chained on
+    to the predicate or when it is rendered on its own. a predicate that is
+    nested in more than one instance is copied for every one after the first
+    """
+    _materialized = False
+    _script = None
+    _token = None
+    parent = None
 
     def __init__(self, *args, **kwargs):
-        gremlin = kwargs.get('gremlin', None)
-        super(Predicate, self).__init__(None, gremlin)
-
         self.args = args
-        self.func(self._function, *args)
+        self.parent = kwargs.get('gremlin', None)
+
+    def __getattr__(self, attr):
+        if self._materialized:
+            return super(Predicate, self).__getattr__(attr)
+
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+
+        self._materialize()
+
+        return getattr(self, attr)
+
+    def _materialize(self):
+        parent = self.parent
+        token = self._token
+        self._materialized = True
+        self._token = None
+
+        Gremlin.__init__(self, None, parent)
+
+        if token is not None:
+            token.gremlin = self
+
+            return self.add_token(token)
+
+        return self.func(self._function, *self.args)
+
+    def _function_token(self):
+        if self._token is None:
+            self._token = Function(self.parent, self._function, *self.args)
+
+        return self._token
+
+    def __unicode__(self):
+        if not self._materialized and self.parent is not None:
+            return str(self._function_token())
+
+        if not self._materialized:
+            self._materialize()
+
+        return super(Predicate, self).__unicode__()
+
+    def _stream(self, write):
+        if not self._materialized and self.parent is not None:
+            return self._function_token().stream(write)
+
+        return super(Predicate, self)._stream(write)
+
+    def set_parent_gremlin(self, gremlin):
+        if self._materialized:
+            return super(Predicate, self).set_parent_gremlin(gremlin)
+
+        if self.parent is not gremlin:
+            self.parent = gremlin
+            self._token = None
+
+        return gremlin.bound_params
+
+    def copy(self, gremlin=None, deep=False):
+        if self._materialized or gremlin is not None:
+            return super(Predicate, self).copy(gremlin, deep)
+
+        args = []
+
+        for arg in self.args:
+            if isinstance(arg, Gremlin):
+                args.append(arg.copy(deep=True))
+            else:
+                args.append(copy.deepcopy(arg))
+
+        return type(self)(*args)
+
+    def fingerprint(self):
+        if self._materialized:
+            return super(Predicate, self).fingerprint()
+
+        args = []
+
+        for arg in self.args:
+            if isinstance(arg, (Gremlin, Statement, Param)):
+                args.append(_shape(arg, self))
+            else:
+                args.append('?')
+
+        shape = 'Predicate|{}({})'.format(self._function, ','.join(args))
+
+        return hashlib.sha1(shape.encode('utf-8')).hexdigest()[:16]
 
     @property
     def _function(self, *args):
@@ -661,24 +2054,80 @@ class FROM(Predicate):
 
 def _(method, *args):
     """method used to create predicates dynamically"""
-    kls = type(method, (Predicate,), {})
+    kls = _DYNAMIC_PREDICATES.get(method)
+
+    if kls is None:
+        kls = type(method, (Predicate,), {})
+        _DYNAMIC_PREDICATES[method] = kls
 
     return kls(*args)
 
 
+class Step(object):
+    """
+    a step from the catalog in gremlinpy.steps. it is set on the Gremlin
+    class as a descriptor, so getting it adds the Attribute token without the
+    failed attribute lookup that Gremlin.__getattr__ needs, and calling it
+    checks the number of arguments before the Function token replaces it
+    """
+    __slots__ = ('name', 'minimum', 'maximum')
+
+    def __init__(self, name, minimum=0, maximum=None):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def __get__(self, gremlin, owner=None):
+        if gremlin is None:
+            return self
+
+        if isinstance(gremlin, Predicate) and not gremlin._materialized:
+            gremlin._materialize()
+
+        return gremlin.add_token(Attribute(gremlin, self.name))
+
+    def check(self, args):
+        count = len(args)
+
+        if count >= self.minimum and (self.maximum is None or
+                                      count <= self.maximum):
+            return args
+
+        if self.maximum is None:
+            expected = 'at least {}'.format(self.minimum)
+        elif self.minimum == self.maximum:
+            expected = str(self.minimum)
+        else:
+            expected = '{} to {}'.format(self.minimum, self.maximum)
+
+        error = '{}() takes {} arguments, {} given'.format(self.name,
+                                                           expected, count)
+        raise TokenError(error)
+
+
+_STEPS = {}
+
+for _name, (_minimum, _maximum) in STEPS.items():
+    if not hasattr(Gremlin, _name):
+        _STEPS[_name] = Step(_name, _minimum, _maximum)
+        setattr(Gremlin, _name, _STEPS[_name])
+
+
 class Anon(object):
     """class used to create new Gremlin instances every time an anonymous
-    traversal is started with the __"""
+    traversal is started with the __. __getattribute__ is used so that
+    starting one does not go through a failed attribute lookup first"""
 
     def __init__(self):
         pass
 
-    def __getattr__(self, attr):
-        gremlin = Gremlin('__')
+    def __getattribute__(self, attr):
+        if attr.startswith('__'):
+            return object.__getattribute__(self, attr)
 
-        getattr(gremlin, attr)
+        gremlin = Gremlin('__')
 
-        return gremlin
+        return gremlin.add_token(Attribute(gremlin, attr))
 
 
 __ = Anon()
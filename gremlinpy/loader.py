@@ -0,0 +1,186 @@
+"""
+batches point lookups, like a DataLoader
+
+    loader = Loader(client.submit)
+
+    # in many handlers during the same event loop tick
+    results = await loader.load(Gremlin().V(12).valueMap())
+
+traversals of the form g.V(id) followed by any suffix are collected until
+the end of the tick. the ones with the same graph variable and the same
+suffix (its fingerprint and the values that it binds) are sent as one
+traversal that binds every id in a single list param:
+
+    g.V(LOADER_IDS).project('id', 'result').by(T.id)
+        .by(__.valueMap().fold())
+
+and every caller gets the folded results of its own id, an empty list when
+the vertex does not exist. any other traversal is submitted as is. submit is
+any coroutine function that takes a Gremlin instance and returns the list of
+results, like Client.submit
+"""
+import asyncio
+import json
+
+from gremlinpy.exception import ClientError
+from gremlinpy.gremlin import Function, Gremlin, Param, PositionalNaming
+from gremlinpy.statement import Statement
+
+
+class _Lookups(object):
+    """the ids that are waiting to be loaded with the same suffix"""
+
+    def __init__(self, graph_variable, suffix):
+        self.graph_variable = graph_variable
+        self.suffix = suffix
+        self.futures = {}
+
+
+class Loader(object):
+    bound_ids = 'LOADER_IDS'
+
+    def __init__(self, submit, max_batch=None, **kwargs):
+        self.submit = submit
+        self.max_batch = max_batch
+        self.kwargs = kwargs
+        self.queue = {}
+        self.sending = set()
+
+    def split(self, gremlin):
+        """
+        returns the id and the suffix, as an anonymous traversal, of a
+        g.V(id)... traversal or None when the traversal is not a point
+        lookup
+        """
+        tokens = list(gremlin)
+
+        if len(tokens) < 2 or gremlin.return_var is not None:
+            return None
+
+        start = tokens[1]
+
+        if type(start) is not Function or start.value != 'V' or \
+                len(start.args) != 1:
+            return None
+
+        vertex_id = start.args[0]
+
+        if isinstance(vertex_id, Param):
+            vertex_id = vertex_id.value
+
+        if isinstance(vertex_id, (Gremlin, Statement, list, tuple, dict)):
+            return None
+
+        try:
+            hash(vertex_id)
+        except TypeError:
+            return None
+
+        suffix = Gremlin('__')
+
+        for token in tokens[2:]:
+            suffix.add_token(token.copy_token(suffix))
+
+        return vertex_id, suffix
+
+    def key(self, graph_variable, suffix):
+        """the shape of the suffix and the values that it binds"""
+        suffix.set_param_naming(PositionalNaming())
+        str(suffix)
+
+        values = json.dumps(list(suffix.bound_params.values()),
+                            sort_keys=True, default=repr)
+
+        return graph_variable, suffix.fingerprint(), values
+
+    def load(self, traversal):
+        """returns a future for the results of the traversal"""
+        lookup = None
+
+        if isinstance(traversal, Gremlin):
+            lookup = self.split(traversal)
+        elif not isinstance(traversal, Statement):
+            error = 'Only Gremlin and Statement instances can be loaded'
+            raise ClientError(error)
+
+        if lookup is None:
+            return asyncio.ensure_future(self.submit(traversal,
+                                                     **self.kwargs))
+
+        vertex_id, suffix = lookup
+        graph_variable = traversal.top.value
+        key = self.key(graph_variable, suffix)
+        loop = asyncio.get_event_loop()
+
+        if not self.queue:
+            loop.call_soon(self.dispatch)
+
+        lookups = self.queue.get(key)
+
+        if lookups is None:
+            lookups = self.queue[key] = _Lookups(graph_variable, suffix)
+
+        future = loop.create_future()
+        lookups.futures.setdefault(vertex_id, []).append(future)
+
+        return future
+
+    def dispatch(self):
+        """sends everything that was loaded since the last dispatch"""
+        queue = self.queue
+        self.queue = {}
+
+        for lookups in queue.values():
+            ids = list(lookups.futures)
+            size = self.max_batch or len(ids)
+
+            for index in range(0, len(ids), size):
+                task = asyncio.ensure_future(
+                    self.lookup(lookups, ids[index:index + size]))
+                self.sending.add(task)
+                task.add_done_callback(self.sending.discard)
+
+    def traversal(self, graph_variable, suffix, ids):
+        """builds the traversal that looks up every id with the suffix"""
+        gremlin = Gremlin(graph_variable)
+        nested = Gremlin('__')
+
+        for token in suffix:
+            if token is not suffix.top:
+                nested.add_token(token.copy_token(nested))
+
+        nested.fold()
+        gremlin.set_param_naming(PositionalNaming())
+        gremlin.V(Param(self.bound_ids, ids))
+        gremlin.unbound('project', "'id'", "'result'")
+        gremlin.unbound('by', 'T.id').unbound('by', nested)
+
+        return gremlin
+
+    async def lookup(self, lookups, ids):
+        futures = [(i, lookups.futures[i]) for i in ids]
+        traversal = self.traversal(lookups.graph_variable, lookups.suffix,
+                                   ids)
+
+        try:
+            rows = await self.submit(traversal, **self.kwargs)
+        except Exception as e:
+            for vertex_id, waiting in futures:
+                for future in waiting:
+                    if not future.done():
+                        future.set_exception(e)
+
+            return
+
+        results = {}
+
+        for row in rows or []:
+            results[row['id']] = row['result']
+            results.setdefault(str(row['id']), row['result'])
+
+        for vertex_id, waiting in futures:
+            result = results.get(vertex_id, results.get(str(vertex_id), []))
+
+            for future in waiting:
+                if not future.done():
+                    future.set_result(result)
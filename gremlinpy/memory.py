@@ -0,0 +1,303 @@
+"""
+memory profiling for traversals
+
+    python -m gremlinpy.memory --size 10000
+    python -m gremlinpy.memory --scenarios nested,bulk --size 1000 --json
+
+measure(gremlin) can be called on any Gremlin instance, it walks the chain
+and every nested instance and returns the bytes held by each token class,
+the param registries and the rendered scripts. profile(build) also runs
+build and the render of what it returns under tracemalloc to get the peak
+and retained memory of both steps
+"""
+import argparse
+import json
+import sys
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from gremlinpy.gremlin import Gremlin, Param, Predicate, Segment, _walk, \
+    __, gt, within
+from gremlinpy.statement import Batch, BulkAddVertices
+
+
+def sizeof(value, seen=None):
+    """the size of the value and everything in it if it is a container"""
+    if seen is None:
+        seen = set()
+
+    if id(value) in seen:
+        return 0
+
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += sizeof(k, seen) + sizeof(v, seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for v in value:
+            size += sizeof(v, seen)
+
+    return size
+
+
+def measure(gremlin):
+    """
+    returns the bytes held by the traversal: 'tokens' by token class,
+    'gremlins' for the Gremlin instances, 'params' for the param
+    registries (the maps, the shared layers and the bound values),
+    'rendered' for cached scripts and the scripts that shared Segments are
+    sliced from. 'registries' is the number of registry objects held. the
+    instances that own the tokens are walked as well, so the ancestors that
+    copies still point to are included
+    """
+    report = {'tokens': {}, 'gremlins': 0, 'params': 0, 'rendered': 0,
+              'registries': 0, 'counts': {}}
+    seen = set()
+    values = set()
+    gremlins = [gremlin]
+
+    def nested(value):
+        if isinstance(value, Gremlin):
+            gremlins.append(value)
+        elif isinstance(value, (list, tuple)):
+            for v in value:
+                nested(v)
+
+    while gremlins:
+        current = gremlins.pop()
+
+        if id(current) in seen:
+            continue
+
+        seen.add(id(current))
+        report['gremlins'] += sys.getsizeof(current) + \
+            sys.getsizeof(current.__dict__)
+
+        if current._script is not None and id(current._script) not in seen:
+            seen.add(id(current._script))
+            report['rendered'] += sys.getsizeof(current._script)
+
+        registry = current.__dict__.get('_params')
+
+        if registry is not None and id(registry) not in seen:
+            seen.add(id(registry))
+            report['registries'] += 1
+            maps = [(registry._params, registry._names,
+                     registry._generated)]
+
+            for layer in registry._layers():
+                if id(layer) not in seen:
+                    seen.add(id(layer))
+                    maps.append((layer.params, layer.names, layer.generated))
+
+            for params, names, generated in maps:
+                report['params'] += sizeof(params, values) + \
+                    sizeof(names, values) + sizeof(generated, values)
+
+        if isinstance(current, Predicate) and not current._materialized:
+            # only the Function token that it is rendered as
+            links = [t for t in (current._token,) if t is not None]
+            token = None
+
+            nested(current.args)
+        else:
+            links = [current.top]
+            token = current.top.next
+
+        while token is not None:
+            if isinstance(token, Segment):
+                source = token.source
+
+                if source is not None and id(source) not in seen:
+                    seen.add(id(source))
+                    report['rendered'] += sys.getsizeof(source)
+
+                links.extend(_walk(token, token.last))
+            else:
+                links.append(token)
+
+            token = token.next
+
+        for token in links:
+            if id(token) in seen:
+                continue
+
+            seen.add(id(token))
+            name = type(token).__name__
+            size = sys.getsizeof(token)
+
+            if token.args:
+                size += sys.getsizeof(token.args)
+
+            if token.bound_args is not None:
+                size += sys.getsizeof(token.bound_args)
+
+            report['tokens'][name] = report['tokens'].get(name, 0) + size
+            report['counts'][name] = report['counts'].get(name, 0) + 1
+
+            nested(token.gremlin)
+            nested(token.value)
+            nested(token.args)
+            nested(token.bound_args)
+
+    report['total'] = sum(report['tokens'].values()) + report['gremlins'] + \
+        report['params'] + report['rendered']
+
+    return report
+
+
+def reset_peak():
+    """tracemalloc.reset_peak is only available in python 3.9+"""
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+
+
+def profile(build, render=True):
+    """
+    calls build, which returns a Gremlin instance, and then renders it
+    under tracemalloc. returns the peak and retained bytes of both steps
+    and the measure() of the traversal once it is rendered
+    """
+    if tracemalloc is None:
+        raise RuntimeError('tracemalloc is not available')
+
+    tracing = tracemalloc.is_tracing()
+
+    if not tracing:
+        tracemalloc.start()
+
+    try:
+        reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        gremlin = build()
+        current, peak = tracemalloc.get_traced_memory()
+        report = {'build': {'peak': peak - start, 'retained': current - start}}
+
+        if render:
+            reset_peak()
+
+            script = str(gremlin)
+            after, peak = tracemalloc.get_traced_memory()
+            report['render'] = {'peak': peak - current,
+                                'retained': after - current,
+                                'script': len(script)}
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    report['breakdown'] = measure(gremlin)
+
+    return report
+
+
+def chain(size):
+    g = Gremlin().V()
+
+    for i in range(size):
+        g.out(i)
+
+    return g
+
+
+def nested(size):
+    g = Gremlin().V()
+
+    for i in range(size):
+        if i % 2:
+            g.where(__.out('knows').has('age', gt(i)))
+        else:
+            g.has('name', within('a', i))
+
+    return g
+
+
+def batch(size):
+    batch = Batch()
+
+    for i in range(size):
+        batch.add(Gremlin().V(i).out('knows').has('age', gt(i)))
+
+    str(batch)
+
+    return batch.gremlin
+
+
+def bulk(size):
+    rows = [{'name': 'user{}'.format(i), 'age': i} for i in range(size)]
+
+    return Gremlin().apply_statement(BulkAddVertices('person', rows))
+
+
+def copies(size):
+    g = chain(10)
+
+    for i in range(size):
+        g = g.copy().out(Param('p{}'.format(i), i))
+
+    return g
+
+
+SCENARIOS = {
+    'chain': chain,
+    'nested': nested,
+    'batch': batch,
+    'bulk': bulk,
+    'copies': copies,
+}
+
+
+def format_report(name, report):
+    kib = lambda size: '{:.1f} KiB'.format(size / 1024.0)
+    breakdown = report['breakdown']
+    lines = ['{}:'.format(name)]
+
+    for step in ('build', 'render'):
+        if step in report:
+            lines.append('  {:<10} peak {:>14}  retained {:>14}'.format(
+                step, kib(report[step]['peak']),
+                kib(report[step]['retained'])))
+
+    for token, size in sorted(breakdown['tokens'].items()):
+        lines.append('  {:<20} {:>14}  {:>8} tokens'.format(
+            token, kib(size), breakdown['counts'][token]))
+
+    for key in ('gremlins', 'params', 'rendered', 'total'):
+        lines.append('  {:<20} {:>14}'.format(key, kib(breakdown[key])))
+
+    lines.append('  {:<20} {:>14}'.format('registries',
+                                          breakdown['registries']))
+
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m gremlinpy.memory',
+                                     description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scenarios', default=','.join(sorted(SCENARIOS)),
+                        help='comma separated scenario names')
+    parser.add_argument('--size', type=int, default=1000)
+    parser.add_argument('--json', action='store_true',
+                        help='print the reports as json')
+    args = parser.parse_args(argv)
+    reports = {}
+
+    for name in args.scenarios.split(','):
+        build = SCENARIOS[name]
+        reports[name] = profile(lambda: build(args.size))
+
+        if not args.json:
+            print(format_report(name, reports[name]))
+
+    if args.json:
+        print(json.dumps(reports, indent=2, sort_keys=True))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+hooks into token creation, param binding, statement builds and renders
+
+    from gremlinpy.observer import Aggregator, add_observer
+
+    stats = add_observer(Aggregator())
+    ...
+    stats.snapshot() # {'renders': {fingerprint: {...}}, ...}
+
+observers are called synchronously from the hot paths. when none are
+installed the hot paths only check if the OBSERVERS list is empty
+"""
+import bisect
+import threading
+import time
+
+
+OBSERVERS = []
+timer = getattr(time, 'perf_counter', time.time)
+
+
+class Observer(object):
+    """base class for observers, every event is a no-op"""
+
+    def token(self, token):
+        pass
+
+    def bind(self, gremlin, name, value):
+        pass
+
+    def build(self, statement, seconds):
+        pass
+
+    def render(self, gremlin, seconds, length, params):
+        pass
+
+
+def add_observer(observer):
+    if observer not in OBSERVERS:
+        OBSERVERS.append(observer)
+
+    return observer
+
+
+def remove_observer(observer):
+    if observer in OBSERVERS:
+        OBSERVERS.remove(observer)
+
+    return observer
+
+
+class observing(object):
+    """installs the observer for the duration of a with block"""
+
+    def __init__(self, observer):
+        self.observer = observer
+
+    def __enter__(self):
+        return add_observer(self.observer)
+
+    def __exit__(self, *args):
+        remove_observer(self.observer)
+
+
+def notify(event, *args):
+    for observer in OBSERVERS:
+        getattr(observer, event)(*args)
+
+
+class Histogram(object):
+    """
+    counts values into fixed buckets whose upper bounds grow by a factor
+    of two from `start`
+    """
+
+    def __init__(self, start=1e-6, buckets=32):
+        self.bounds = [start * 2 ** i for i in range(buckets)]
+        self.counts = [0] * (buckets + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percent):
+        """the upper bound of the bucket the percentile falls into"""
+        if not self.count:
+            return None
+
+        rank = percent / 100.0 * self.count
+        seen = 0
+
+        for index, count in enumerate(self.counts):
+            seen += count
+
+            if seen >= rank and count:
+                if index < len(self.bounds):
+                    return min(self.bounds[index], self.max)
+
+                return self.max
+
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.percentile(50),
+            'p99': self.percentile(99)}
+
+
+class Aggregator(Observer):
+    """
+    keeps histograms of render time, script length and param count for
+    every traversal fingerprint, build time histograms for every statement
+    class and counts of the tokens created and params bound. only the
+    renders of root instances are recorded, nested instances are rendered
+    as part of their parent
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.renders = {}
+            self.builds = {}
+            self.tokens = {}
+            self.binds = 0
+
+    def token(self, token):
+        name = type(token).__name__
+
+        with self.lock:
+            self.tokens[name] = self.tokens.get(name, 0) + 1
+
+    def bind(self, gremlin, name, value):
+        with self.lock:
+            self.binds += 1
+
+    def build(self, statement, seconds):
+        name = type(statement).__name__
+
+        with self.lock:
+            if name not in self.builds:
+                self.builds[name] = Histogram()
+
+            self.builds[name].add(seconds)
+
+    def render(self, gremlin, seconds, length, params):
+        if gremlin.parent is not None:
+            return
+
+        fingerprint = gremlin.fingerprint()
+
+        with self.lock:
+            histograms = self.renders.get(fingerprint)
+
+            if histograms is None:
+                histograms = self.renders[fingerprint] = {
+                    'seconds': Histogram(),
+                    'length': Histogram(start=16),
+                    'params': Histogram(start=1)}
+
+            histograms['seconds'].add(seconds)
+            histograms['length'].add(length)
+            histograms['params'].add(params)
+
+    def snapshot(self):
+        with self.lock:
+            renders = {}
+
+            for fingerprint, histograms in self.renders.items():
+                renders[fingerprint] = dict([(k, h.snapshot())
+                                             for k, h in histograms.items()])
+
+            return {
+                'renders': renders,
+                'builds': dict([(k, h.snapshot())
+                                for k, h in self.builds.items()]),
+                'tokens': dict(self.tokens),
+                'binds': self.binds}
@@ -0,0 +1,246 @@
+import datetime
+import io
+import json
+import uuid
+
+import six
+
+from gremlinpy.exception import RequestError
+
+
+EPOCH = datetime.datetime(1970, 1, 1)
+INT32_MIN = -2 ** 31
+INT32_MAX = 2 ** 31 - 1
+
+
+def typed(graphson_type, value):
+    """wraps the value in a GraphSON type"""
+    return {'@type': graphson_type, '@value': value}
+
+
+def as_is(value):
+    return value
+
+
+def as_str(value):
+    return str(value)
+
+
+def as_int(value):
+    if INT32_MIN <= value <= INT32_MAX:
+        return typed('g:Int32', value)
+
+    return typed('g:Int64', value)
+
+
+def as_long(value):
+    return typed('g:Int64', value)
+
+
+def as_double(value):
+    return typed('g:Double', value)
+
+
+def as_uuid(value):
+    return typed('g:UUID', str(value))
+
+
+def as_timestamp(value):
+    """the milliseconds since the epoch, naive datetimes are taken as utc"""
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None) - value.utcoffset()
+
+    delta = value - EPOCH
+    seconds = delta.days * 86400 + delta.seconds
+
+    return seconds * 1000 + delta.microseconds // 1000
+
+
+def as_date(value):
+    return typed('g:Date', as_timestamp(value))
+
+
+def as_isoformat(value):
+    return value.isoformat()
+
+
+def from_date(value):
+    return EPOCH + datetime.timedelta(milliseconds=value)
+
+
+def from_map(value):
+    """GraphSON 3.0 maps are flat [key, value, key, value...] lists"""
+    return dict(zip(value[::2], value[1::2]))
+
+
+GRAPHSON_SERIALIZERS = {
+    bool: as_is,
+    float: as_double,
+    uuid.UUID: as_uuid,
+    datetime.datetime: as_date,
+    type(None): as_is}
+JSON_SERIALIZERS = {
+    bool: as_is,
+    float: as_is,
+    uuid.UUID: as_str,
+    datetime.datetime: as_isoformat,
+    type(None): as_is}
+
+for integer in six.integer_types:
+    GRAPHSON_SERIALIZERS[integer] = as_int
+    JSON_SERIALIZERS[integer] = as_is
+
+for string in six.string_types + (six.text_type,):
+    GRAPHSON_SERIALIZERS[string] = as_is
+    JSON_SERIALIZERS[string] = as_is
+
+
+GRAPHSON_DESERIALIZERS = {
+    'g:Int32': int,
+    'g:Int64': int,
+    'g:Float': float,
+    'g:Double': float,
+    'g:UUID': uuid.UUID,
+    'g:Date': from_date,
+    'g:Timestamp': from_date,
+    'g:List': list,
+    'g:Set': list,
+    'g:Map': from_map}
+
+
+class GraphSONSerializer(object):
+    """
+    converts binding values into GraphSON 2.0 objects that can be passed
+    to json. serializers are looked up by the value's type and then by its
+    base classes, the ones passed in take precedence over the defaults:
+
+        GraphSONSerializer({int: as_long, datetime.datetime: as_isoformat})
+
+    dicts, lists, tuples and sets are serialized item by item. typed values
+    in responses are converted back by their GraphSON type name, types
+    without a deserializer (vertices, edges, etc.) are left as their
+    @value
+    """
+    mime_type = 'application/vnd.gremlin-v2.0+json'
+    defaults = GRAPHSON_SERIALIZERS
+    types = GRAPHSON_DESERIALIZERS
+
+    def __init__(self, serializers=None, deserializers=None):
+        self.serializers = serializers or {}
+        self.deserializers = deserializers or {}
+        self._handlers = {}
+
+    def handler(self, cls):
+        handler = self._handlers.get(cls)
+
+        if handler is None:
+            for base in cls.__mro__:
+                handler = self.serializers.get(base) or \
+                    self.defaults.get(base)
+
+                if handler is not None:
+                    break
+
+            self._handlers[cls] = handler
+
+        return handler
+
+    def serialize(self, value):
+        if isinstance(value, dict):
+            return dict([(k, self.serialize(v)) for k, v in value.items()])
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            return [self.serialize(v) for v in value]
+
+        handler = self.handler(type(value))
+
+        if handler is None:
+            error = 'There is no serializer for {}'.format(type(value))
+            raise RequestError(error)
+
+        return handler(value)
+
+    def deserialize(self, value):
+        if isinstance(value, list):
+            return [self.deserialize(v) for v in value]
+        elif not isinstance(value, dict):
+            return value
+        elif '@type' in value and '@value' in value:
+            graphson_type = value['@type']
+            value = self.deserialize(value['@value'])
+            handler = self.deserializers.get(graphson_type) or \
+                self.types.get(graphson_type)
+
+            return handler(value) if handler else value
+
+        return dict([(k, self.deserialize(v)) for k, v in value.items()])
+
+    def request_id(self, request_id):
+        return as_uuid(request_id)
+
+
+class JSONSerializer(GraphSONSerializer):
+    """plain json without GraphSON types"""
+    mime_type = 'application/json'
+    defaults = JSON_SERIALIZERS
+
+    def request_id(self, request_id):
+        return str(request_id)
+
+
+class _JSONStringWriter(object):
+    """escapes the streamed script fragments into a json string"""
+
+    def __init__(self, buffer, ensure_ascii=False):
+        self.buffer = buffer
+        self.escape = json.encoder.encode_basestring
+
+        if ensure_ascii:
+            self.escape = json.encoder.encode_basestring_ascii
+
+    def write(self, fragment):
+        self.buffer.write(self.escape(fragment)[1:-1].encode('utf-8'))
+
+
+def to_request(gremlin, request_id=None, serializer=None, op='eval',
+               processor='', language='gremlin-groovy', aliases=None,
+               mime_type=False, ensure_ascii=False):
+    """
+    builds the Gremlin Server request message for the gremlin instance as
+    bytes. the script is streamed into the message and the bindings are
+    serialized straight from the param registry. when mime_type is True the
+    message is prefixed with the serializer's mime type the way Gremlin
+    Server expects it in binary websocket frames
+    """
+    serializer = serializer or GraphSONSerializer()
+    request_id = request_id or uuid.uuid4()
+
+    def dumps(value):
+        return json.dumps(value, ensure_ascii=ensure_ascii).encode('utf-8')
+
+    buffer = io.BytesIO()
+
+    if mime_type:
+        mime = serializer.mime_type.encode('utf-8')
+        buffer.write(bytearray([len(mime)]))
+        buffer.write(mime)
+
+    buffer.write(b'{"requestId": ')
+    buffer.write(dumps(serializer.request_id(request_id)))
+    buffer.write(b', "op": ')
+    buffer.write(dumps(op))
+    buffer.write(b', "processor": ')
+    buffer.write(dumps(processor))
+    buffer.write(b', "args": {"gremlin": "')
+    gremlin.render_to(_JSONStringWriter(buffer, ensure_ascii))
+    buffer.write(b'", "bindings": ')
+    buffer.write(dumps(serializer.serialize(gremlin.params.params)))
+    buffer.write(b', "language": ')
+    buffer.write(dumps(language))
+
+    if aliases:
+        buffer.write(b', "aliases": ')
+        buffer.write(dumps(aliases))
+
+    buffer.write(b'}}')
+
+    return buffer.getvalue()
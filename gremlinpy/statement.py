@@ -1,10 +1,29 @@
+import copy
+import hashlib
+import json
+
 import gremlinpy.config
 from gremlinpy.exception import GremlinError, StatementError
+from gremlinpy.observer import OBSERVERS, notify, timer
 
 
 class Statement(object):
+    """
+    statements are built once into their Gremlin instance. rendering them
+    again returns the cached script and binds nothing new. freeze() renders
+    the statement and keeps its script and bindings so that it can be
+    created once and then rendered, submitted or nested any number of times
+    """
+    gremlin = None
+    _built = None
+    _frozen = None
 
     def set_gremlin(self, gremlin):
+        if self._frozen is not None and gremlin is not self.gremlin:
+            error = ('Frozen statements cannot be built into another Gremlin '
+                     'instance, nest or render them instead')
+            raise StatementError(error)
+
         self.gremlin = gremlin
 
         return self
@@ -12,11 +31,147 @@ class Statement(object):
     def build(self):
         raise NotImplementedError('Gremlinpy statements need a build method')
 
+    def observed_build(self):
+        """
+        calls build and reports its time to the installed observers. the
+        statement is only built once into the same Gremlin instance
+        """
+        if self._built is not None and self._built is self.gremlin:
+            return self
+
+        self._built = self.gremlin
+
+        if not OBSERVERS:
+            return self.build()
+
+        start = timer()
+        built = self.build()
+        notify('build', self, timer() - start)
+
+        return built
+
+    @property
+    def built(self):
+        return self._built is not None and self._built is self.gremlin
+
+    @property
+    def frozen(self):
+        return self._frozen is not None
+
+    def assert_changeable(self):
+        """called before the statement is changed, built ones cannot be"""
+        if self.frozen:
+            raise StatementError('Frozen statements cannot be changed')
+
+        if self.built:
+            error = ('The statement was already built, create a new one to '
+                     'change it')
+            raise StatementError(error)
+
+        return self
+
+    def render(self):
+        """
+        returns the script and a copy of the bound params. the statement is
+        built into a new Gremlin instance if it does not have one
+        """
+        if self._frozen is not None:
+            return self._frozen[0], dict(self._frozen[1])
+
+        if self.gremlin is None:
+            from gremlinpy.gremlin import Gremlin
+
+            self.set_gremlin(Gremlin())
+
+        script = str(self)
+
+        return script, dict(self.gremlin.bound_params)
+
+    def options(self):
+        """
+        the settings that change what is sent to the server without showing
+        up in the tokens that are built, they are part of the fingerprint
+        """
+        return ''
+
+    def fingerprint(self):
+        """
+        the fingerprint of the traversal that the statement builds, see
+        Gremlin.fingerprint. the statement is built into a new Gremlin
+        instance if it does not have one
+        """
+        if self.gremlin is None:
+            from gremlinpy.gremlin import Gremlin
+
+            self.set_gremlin(Gremlin())
+
+        self.observed_build()
+
+        shape = '{}|{}|{}'.format(type(self).__name__, self.options(),
+                                  self.gremlin.fingerprint())
+
+        return hashlib.sha1(shape.encode('utf-8')).hexdigest()[:16]
+
+    def freeze(self):
+        """
+        renders the statement and keeps its script and bindings. frozen
+        statements cannot be changed or built into another instance, when
+        they are nested their bindings are bound into the parent's registry
+        """
+        if self._frozen is None:
+            self._frozen = self.render()
+
+        return self
+
+    def nest(self, gremlin, namespace=None):
+        """
+        binds a frozen statement's params into the gremlin instance and
+        returns its script. when a name is bound to a different value there
+        a private copy of the statement is rendered through a ParamNamespace
+        so that the name is renamed to namespace(name) as it is bound. the
+        frozen instance itself is only read, so it can be nested from many
+        threads at once
+        """
+        registry = gremlin.params
+        script, params = self._frozen
+
+        for name, value in params.items():
+            if name in registry and registry[name] != value:
+                break
+        else:
+            for name, value in params.items():
+                gremlin.bind_param(value, name)
+
+            return script
+
+        if namespace is None:
+            namespace = (type(self).__name__ + '_{}').format
+
+        return self.gremlin.copy(deep=True).render_into(registry, namespace)
+
+    def __deepcopy__(self, memo):
+        if self._frozen is not None:
+            return self
+
+        copied = copy.copy(self)
+        memo[id(self)] = copied
+
+        for key, value in self.__dict__.items():
+            if key != 'gremlin':
+                setattr(copied, key, copy.deepcopy(value, memo))
+
+        copied.gremlin = copied._built = None
+
+        return copied
+
     def __str__(self):
         return self.__unicode__()
 
     def __unicode__(self):
-        self.build()
+        if self._frozen is not None:
+            return self._frozen[0]
+
+        self.observed_build()
 
         return str(self.gremlin)
 
@@ -31,18 +186,24 @@ class Conditional(Statement):
         self.elif_body = []
 
     def set_if(self, condition, body):
+        self.assert_changeable()
+
         self.if_condition = condition
         self.if_body = body
 
         return self
 
     def set_elif(self, condition, body):
+        self.assert_changeable()
+
         self.elif_condition.append(condition)
         self.elif_body.append(body)
 
         return self
 
     def set_else(self, body):
+        self.assert_changeable()
+
         self.else_body = body
 
         return self
@@ -54,7 +215,7 @@ class Conditional(Statement):
 
         if self.if_condition is None or self.if_body is None:
             error = 'Your statement needs at least both an if clause and body'
-            raise StatmentError(error)
+            raise StatementError(error)
 
         #build the if statement
         if_condition = UnboudFunctionRaw(gremlin, 'if', self.if_condition)
@@ -78,11 +239,7 @@ class Conditional(Statement):
         return self
 
 
-class GetEdge(Statement):
-    bound_in_id = 'V_IN_ID'
-    bound_out_id = 'V_OUT_ID'
-    bound_label = 'EDGE_LABEL_NAME'
-    bound_entity = 'EDGE_ENTITY'
+class _Directed(object):
     directions = {
         'both': 'bothE',
         'in': 'inE',
@@ -91,8 +248,9 @@ class GetEdge(Statement):
         'in': 'inV',
         'out': 'outV'}
 
-    def __init__(self, out_v_id, in_v_id, label, direction='both', \
-                 bind_ids=True):
+    def set_direction(self, direction):
+        self.assert_changeable()
+
         if direction not in self.directions:
             error = 'The direction must be: ' + \
                 ', '.join(self.directions.keys())
@@ -102,12 +260,26 @@ class GetEdge(Statement):
         if direction != 'both':
             other = 'in' if direction == 'out' else 'out'
 
+        self.direction = self.directions[direction]
+        self.vertex_direction = self.vertex_directions[other]
+
+        return self
+
+
+class GetEdge(_Directed, Statement):
+    bound_in_id = 'V_IN_ID'
+    bound_out_id = 'V_OUT_ID'
+    bound_label = 'EDGE_LABEL_NAME'
+    bound_entity = 'EDGE_ENTITY'
+
+    def __init__(self, out_v_id, in_v_id, label, direction='both', \
+                 bind_ids=True):
+        self.set_direction(direction)
+
         self.out_v_id = out_v_id
         self.in_v_id = in_v_id
         self.label = label
         self.bind_ids = bind_ids
-        self.direction = self.directions[direction]
-        self.vertex_direction = self.vertex_directions[other]
 
     def build(self):
         if self.bind_ids:
@@ -125,3 +297,385 @@ class GetEdge(Statement):
         getattr(self.gremlin, self.direction)(self.label)
         self.gremlin.AS(back[0]).func(self.vertex_direction)
         self.gremlin.hasId(in_id[0]).select(back[0])
+
+
+class Batch(Statement):
+    """
+    merges many Gremlin instances and Statements into a single script that
+    returns a map of their results keyed by name (or a list of results) so
+    that they can be sent to the server in one request:
+
+        batch = Batch()
+        batch.add(Gremlin().V(12).valueMap(), 'user')
+        batch.add(GetEdge(12, 15, 'knows'), 'knows')
+
+        str(batch) # def gpy_result = ...
+                   # ['user': gpy_result({ -> g.V(GPY_...).valueMap() }()),
+
+    every traversal is rendered with its params bound into the batch's
+    registry so values are deduplicated across the batch. params whose
+    names collide with a different value that was bound by an earlier
+    traversal are renamed into the traversal's own namespace as they are
+    bound
+    """
+    result = 'gpy_result'
+    namespace = 'B{}_{}'
+
+    def __init__(self, traversals=None, as_list=False):
+        from gremlinpy.gremlin import Gremlin
+
+        self.as_list = as_list
+        self.keys = []
+        self.traversals = []
+
+        self.set_gremlin(Gremlin(''))
+
+        for traversal in traversals or []:
+            self.add(traversal)
+
+    def __len__(self):
+        return len(self.traversals)
+
+    def add(self, traversal, key=None):
+        if key is None:
+            key = 'r{}'.format(len(self.traversals))
+
+        self.assert_changeable()
+
+        if key in self.keys:
+            raise StatementError('{} was already added to the batch'.format(
+                key))
+
+        self.keys.append(key)
+        self.traversals.append(traversal)
+
+        return self
+
+    def render_traversal(self, index, traversal):
+        """
+        renders the traversal with its params bound into the batch and
+        returns the script
+        """
+        from gremlinpy.gremlin import Gremlin
+
+        namespace = lambda name: self.namespace.format(index, name)
+
+        if isinstance(traversal, Statement):
+            if traversal.frozen:
+                return traversal.nest(self.gremlin, namespace)
+
+            if getattr(traversal, 'gremlin', None) is None:
+                traversal.set_gremlin(Gremlin())
+
+            traversal.observed_build()
+            traversal = traversal.gremlin
+
+        return traversal.render_into(self.gremlin.params, namespace)
+
+    def fingerprint(self):
+        """
+        the fingerprints of the traversals in order, and their keys unless
+        the results are returned as a list
+        """
+        shapes = []
+
+        for key, traversal in zip(self.keys, self.traversals):
+            shape = traversal.fingerprint()
+
+            if not self.as_list:
+                shape = '{}={}'.format(key, shape)
+
+            shapes.append(shape)
+
+        shape = 'Batch|{}|{}'.format(self.as_list, ','.join(shapes))
+
+        return hashlib.sha1(shape.encode('utf-8')).hexdigest()[:16]
+
+    def build(self):
+        entries = []
+
+        for index, traversal in enumerate(self.traversals):
+            script = self.render_traversal(index, traversal)
+            entry = '{}({{ -> {} }}())'.format(self.result, script)
+
+            if not self.as_list:
+                key = self.keys[index].replace('\\', '\\\\')
+                key = key.replace("'", "\\'")
+                entry = "'{}': {}".format(key, entry)
+
+            entries.append(entry)
+
+        if not entries and not self.as_list:
+            entries.append(':')
+
+        define = 'def {} = {{ it instanceof Iterator ? it.toList() : it }}; '
+        self.gremlin.set_graph_variable('')
+        self.gremlin.raw(define.format(self.result))
+        self.gremlin.raw('[{}]'.format(', '.join(entries)))
+
+        return self
+
+
+
+class BulkStatement(Statement):
+    """
+    base for statements that send many rows to the server as a single list
+    param. the script that is built does not depend on the number of rows,
+    so every batch of the same statement compiles to the same script on the
+    server
+
+    rows are split into chunks when max_rows or max_bytes (the size of the
+    rows once encoded as json) are set. each chunk is a copy of the
+    statement that holds its part of the rows. a statement whose rows do not
+    fit into one chunk cannot be built, nested, batched or submitted as is,
+    send its scripts() or chunks() instead
+    """
+    bound_rows = 'BULK_ROWS'
+
+    def __init__(self, rows=None, max_rows=None, max_bytes=None):
+        self.rows = [self.prepare(row) for row in rows or []]
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, row):
+        self.assert_changeable()
+
+        self.rows.append(self.prepare(row))
+
+        return self
+
+    def options(self):
+        return 'max_rows={},max_bytes={}'.format(self.max_rows,
+                                                 self.max_bytes)
+
+    def prepare(self, row):
+        """converts a row that was passed in into what is sent to the server"""
+        return row
+
+    def row_size(self, row):
+        return len(json.dumps(row, default=str).encode('utf-8')) + 1
+
+    def fits(self):
+        """whether the rows fit into a single chunk"""
+        if self.max_rows and len(self.rows) > self.max_rows:
+            return False
+
+        if self.max_bytes and len(self.rows) > 1:
+            size = 2 + sum([self.row_size(row) for row in self.rows])
+
+            return size <= self.max_bytes
+
+        return True
+
+    def observed_build(self):
+        if not self.built and not self.fits():
+            error = ('The rows do not fit into max_rows or max_bytes, send '
+                     'the scripts() or chunks() of the statement instead')
+            raise StatementError(error)
+
+        return super(BulkStatement, self).observed_build()
+
+    def chunk(self, rows):
+        chunk = copy.copy(self)
+        chunk.rows = rows
+        chunk.max_rows = chunk.max_bytes = None
+        chunk.gremlin = chunk._built = chunk._frozen = None
+
+        return chunk
+
+    def chunks(self):
+        """returns a list of statements that each fit into the limits"""
+        if not self.max_rows and not self.max_bytes:
+            return [self.chunk(self.rows)]
+
+        chunks = []
+        rows = []
+        size = 2
+
+        for row in self.rows:
+            row_size = self.row_size(row) if self.max_bytes else 0
+            full = self.max_rows and len(rows) >= self.max_rows
+
+            if rows and self.max_bytes and size + row_size > self.max_bytes:
+                full = True
+
+            if full:
+                chunks.append(self.chunk(rows))
+                rows = []
+                size = 2
+
+            rows.append(row)
+            size += row_size
+
+        if rows or not chunks:
+            chunks.append(self.chunk(rows))
+
+        return chunks
+
+    def scripts(self):
+        """returns a (script, bindings) tuple for every chunk"""
+        from gremlinpy.gremlin import Gremlin
+
+        scripts = []
+
+        for chunk in self.chunks():
+            gremlin = Gremlin()
+
+            gremlin.apply_statement(chunk)
+            scripts.append((str(gremlin), gremlin.bound_params))
+
+        return scripts
+
+    def bind(self, value, name):
+        """
+        binds the value with the name unless the name is already used for a
+        different value in the gremlin instance
+        """
+        params = self.gremlin.params
+
+        if name in params and params[name] != value:
+            name = None
+
+        return self.gremlin.bind_param(value, name)[0]
+
+
+class BulkAddVertices(BulkStatement):
+    """
+    adds a vertex for every row (a dict of property names and values) with
+    one constant traversal:
+
+        bulk = BulkAddVertices('person', [{'name': 'mark'}, ...])
+
+        str(bulk) # g.inject(BULK_ROWS).unfold().as('row')
+                  #     .addV(BULK_LABEL).as('v')
+                  #     .sideEffect(__.select('row').unfold().as('kv')
+                  #         .select('v').property(...))
+    """
+    bound_label = 'BULK_LABEL'
+
+    def __init__(self, label, rows=None, max_rows=None, max_bytes=None):
+        super(BulkAddVertices, self).__init__(rows=rows, max_rows=max_rows,
+                                              max_bytes=max_bytes)
+        self.label = label
+
+    def build(self):
+        from gremlinpy.gremlin import Gremlin
+
+        rows = self.bind(self.rows, self.bound_rows)
+        label = self.bind(self.label, self.bound_label)
+        key = Gremlin('__').unbound('select', "'kv'").unbound('by', 'keys')
+        value = Gremlin('__').unbound('select', "'kv'").unbound('by', 'values')
+        properties = Gremlin('__').unbound('select', "'row'").unfold()
+
+        properties.unbound('as', "'kv'")
+
+        properties.unbound('select', "'v'").unbound('property', key, value)
+
+        self.gremlin.unbound('inject', rows).unfold().unbound('as', "'row'")
+        self.gremlin.unbound('addV', label).unbound('as', "'v'")
+        self.gremlin.unbound('sideEffect', properties)
+
+        return self
+
+
+class BulkUpsertEdges(BulkStatement):
+    """
+    creates or updates an edge for every (out_id, in_id, label, properties)
+    row in one script. an existing edge with the label between the two
+    vertices gets its properties updated, otherwise a new edge is added.
+    the properties can be left out:
+
+        bulk = BulkUpsertEdges([(1, 2, 'knows', {'since': 2010}), ...])
+
+        str(bulk) # BULK_EDGES.collect { row -> def e = g.V(row['out'])...
+    """
+    bound_rows = 'BULK_EDGES'
+    upsert = ("{rows}.collect {{ row -> "
+              "def e = {g}.V(row['out']).outE(row['label'])"
+              ".where(__.inV().hasId(row['in'])).tryNext()"
+              ".orElseGet {{ {g}.V(row['out']).as('out').V(row['in'])"
+              ".addE(row['label']).from('out').next() }}; "
+              "row['properties'].each {{ k, v -> e.property(k, v) }}; e }}")
+
+    def prepare(self, row):
+        if isinstance(row, dict):
+            return row
+
+        row = tuple(row)
+
+        if len(row) not in (3, 4):
+            error = ('Edges must be (out_id, in_id, label, properties) '
+                     'tuples, got {}'.format(row))
+            raise StatementError(error)
+
+        properties = row[3] if len(row) == 4 else None
+
+        return {
+            'out': row[0],
+            'in': row[1],
+            'label': row[2],
+            'properties': properties or {}}
+
+    def build(self):
+        graph = self.gremlin.top.value or gremlinpy.config.GRAPH_VARIABLE
+        rows = self.bind(self.rows, self.bound_rows)
+
+        self.gremlin.set_graph_variable('')
+        self.gremlin.raw(self.upsert.format(rows=rows, g=graph))
+
+        return self
+
+
+class GetEdges(_Directed, BulkStatement):
+    """
+    checks many (out_id, in_id) vertex pairs for an edge with the label in
+    one script and returns the pairs that are connected. the pairs are
+    bound as a single list param and the directions work like GetEdge's:
+
+        edges = GetEdges([(1, 9), (2, 8)], 'knows', 'out')
+
+        str(edges) # EDGE_PAIRS.findAll { pair -> g.V(pair[0])
+                   #     .outE(EDGE_LABEL_NAME).inV().hasId(pair[1])
+                   #     .hasNext() }
+    """
+    bound_rows = 'EDGE_PAIRS'
+    bound_label = 'EDGE_LABEL_NAME'
+    lookup = ("{pairs}.findAll {{ pair -> {g}.V(pair[0]).{direction}({label})"
+              ".{vertex}().hasId(pair[1]).hasNext() }}")
+
+    def __init__(self, pairs=None, label=None, direction='both',
+                 max_rows=None, max_bytes=None):
+        super(GetEdges, self).__init__(rows=pairs, max_rows=max_rows,
+                                       max_bytes=max_bytes)
+        self.set_direction(direction)
+
+        self.label = label
+
+    def prepare(self, pair):
+        pair = list(pair)
+
+        if len(pair) != 2:
+            error = 'Pairs must be (out_id, in_id), got {}'.format(pair)
+            raise StatementError(error)
+
+        return pair
+
+    def build(self):
+        graph = self.gremlin.top.value or gremlinpy.config.GRAPH_VARIABLE
+        pairs = self.bind(self.rows, self.bound_rows)
+        label = ''
+
+        if self.label is not None:
+            label = self.bind(self.label, self.bound_label)
+
+        script = self.lookup.format(pairs=pairs, g=graph, label=label,
+                                    direction=self.direction,
+                                    vertex=self.vertex_direction)
+
+        self.gremlin.set_graph_variable('')
+        self.gremlin.raw(script)
+
+        return self
@@ -0,0 +1,120 @@
+"""
+the standard TinkerPop 3 steps. every name is set on gremlinpy.Gremlin as a
+gremlinpy.Step descriptor. getting it adds an Attribute token without the
+failed attribute lookup that Gremlin.__getattr__ needs, and calling it checks
+the number of arguments before the Function token replaces the Attribute,
+without the dynamic predicate lookups of Gremlin.__call__. names that are not
+in the catalog still go through the dynamic __getattr__ and __call__ path
+
+STEPS maps the step name to the (minimum, maximum) number of arguments that
+it takes, None when there is no maximum. steps named after python keywords
+(as, in, is, not, and, or, from) are left out, use AS(), IN(), IS(), etc.
+"""
+
+STEPS = {
+    # start steps
+    'V': (0, None),
+    'E': (0, None),
+    'addV': (0, 1),
+    'addE': (1, 1),
+    'inject': (0, None),
+    'mergeV': (0, 1),
+    'mergeE': (0, 1),
+
+    # vertex and edge steps
+    'out': (0, None),
+    'both': (0, None),
+    'outE': (0, None),
+    'inE': (0, None),
+    'bothE': (0, None),
+    'outV': (0, 0),
+    'inV': (0, 0),
+    'bothV': (0, 0),
+    'otherV': (0, 0),
+    'to': (1, None),
+
+    # filter steps
+    'has': (1, 3),
+    'hasLabel': (1, None),
+    'hasId': (1, None),
+    'hasKey': (1, None),
+    'hasValue': (1, None),
+    'hasNot': (1, 1),
+    'where': (1, 2),
+    'filter': (1, 1),
+    'dedup': (0, None),
+    'limit': (1, 2),
+    'tail': (0, 2),
+    'skip': (1, 2),
+    'sample': (1, 2),
+    'coin': (1, 1),
+    'timeLimit': (1, 1),
+    'simplePath': (0, 0),
+    'cyclicPath': (0, 0),
+
+    # map steps
+    'id': (0, 0),
+    'label': (0, 0),
+    'key': (0, 0),
+    'value': (0, 0),
+    'values': (0, None),
+    'valueMap': (0, None),
+    'elementMap': (0, None),
+    'properties': (0, None),
+    'propertyMap': (0, None),
+    'select': (1, None),
+    'project': (1, None),
+    'path': (0, 0),
+    'constant': (1, 1),
+    'identity': (0, 0),
+    'unfold': (0, 0),
+    'fold': (0, 2),
+    'count': (0, 1),
+    'sum': (0, 1),
+    'mean': (0, 1),
+    'max': (0, 1),
+    'min': (0, 1),
+    'math': (1, 1),
+    'order': (0, 1),
+    'group': (0, 1),
+    'groupCount': (0, 1),
+    'loops': (0, 1),
+    'map': (1, 1),
+    'flatMap': (1, 1),
+    'match': (1, None),
+
+    # side effect steps
+    'property': (1, None),
+    'sideEffect': (1, 1),
+    'aggregate': (1, 2),
+    'store': (1, 1),
+    'cap': (1, None),
+    'subgraph': (1, 1),
+    'drop': (0, 0),
+    'barrier': (0, 1),
+
+    # branch steps
+    'coalesce': (0, None),
+    'union': (0, None),
+    'choose': (1, 3),
+    'option': (1, 2),
+    'optional': (1, 1),
+    'local': (1, 1),
+    'repeat': (1, 2),
+    'times': (1, 1),
+    'until': (1, 1),
+    'emit': (0, 1),
+
+    # modulators
+    'by': (0, 2),
+
+    # terminal steps
+    'next': (0, 1),
+    'tryNext': (0, 0),
+    'hasNext': (0, 0),
+    'toList': (0, 0),
+    'toSet': (0, 0),
+    'iterate': (0, 0),
+    'explain': (0, 0),
+    'profile': (0, 1),
+}
@@ -1,2 +1,13 @@
+import sys
+
 from .gremlin import *
 from .statement import *
+from .request import *
+from .benchmark import *
+from .memory import *
+from .observer import *
+
+if sys.version_info >= (3, 5):
+    from .client import *
+    from .buffer import *
+    from .loader import *
@@ -0,0 +1,84 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from gremlinpy import benchmark
+
+
+class BenchmarkTests(unittest.TestCase):
+
+    def test_can_run_every_case(self):
+        out = io.StringIO()
+        results = benchmark.run(sizes=[3], repeat=1, out=out)
+        names = [case.name for case in benchmark.CASES]
+
+        self.assertEqual(sorted(['{}:3'.format(n) for n in names]),
+                         sorted(results.keys()))
+        self.assertEqual(len(names), len(out.getvalue().splitlines()))
+
+        for result in results.values():
+            self.assertTrue(result['time'] > 0)
+            self.assertEqual(result['time'] / 3, result['per_unit'])
+
+            if result['allocated'] is not None:
+                self.assertEqual(result['allocated'] / 3,
+                                 result['allocated_per_unit'])
+
+    def test_can_save_and_load_baseline(self):
+        results = benchmark.run(benchmark.CASES[:2], sizes=[2], repeat=1)
+        path = os.path.join(tempfile.mkdtemp(), 'baseline.json')
+
+        benchmark.save(results, path)
+
+        with open(path) as baseline:
+            self.assertIn('gremlinpy', json.load(baseline))
+
+        self.assertEqual(results, benchmark.load(path))
+
+    def test_shipped_baseline_has_every_case(self):
+        baseline = benchmark.load(benchmark.BASELINE)
+
+        for case in benchmark.CASES:
+            for size in benchmark.SIZES:
+                result = baseline['{}:{}'.format(case.name, size)]
+
+                self.assertTrue(result['time'] > 0)
+                self.assertIn('allocated_per_unit', result)
+
+    def test_compare_finds_regressions(self):
+        baseline = {'build:10': {'time': 1.0, 'allocated': 100},
+                    'bind:10': {'time': 1.0, 'allocated': None}}
+        results = {'build:10': {'time': 1.1, 'allocated': 200},
+                   'bind:10': {'time': 2.0, 'allocated': 100},
+                   'copy:10': {'time': 9.0, 'allocated': 900}}
+        regressions = benchmark.compare(results, baseline, tolerance=0.2)
+
+        self.assertEqual([('bind:10', 'time', 1.0, 2.0),
+                          ('build:10', 'allocated', 100, 200)], regressions)
+
+    def test_main_exits_with_regressions(self):
+        path = os.path.join(tempfile.mkdtemp(), 'baseline.json')
+        baseline = {'build:2': {'time': 1e-12, 'allocated': 1}}
+        args = ['--sizes', '2', '--cases', 'build', '--repeat', '1']
+
+        out = io.StringIO()
+
+        benchmark.save(baseline, path)
+
+        with contextlib.redirect_stdout(out):
+            regressed = benchmark.main(args + ['--compare', path])
+            saved = benchmark.main(args + ['--save', path])
+            compared = benchmark.main(args + ['--compare', path,
+                                              '--tolerance', '1000'])
+
+        self.assertEqual(1, regressed)
+        self.assertEqual(0, saved)
+        self.assertEqual(0, compared)
+        self.assertIn('REGRESSION build:2 time', out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
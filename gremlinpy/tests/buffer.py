@@ -0,0 +1,213 @@
+import asyncio
+import unittest
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+from gremlinpy.buffer import WriteBuffer
+from gremlinpy.exception import ClientError
+from gremlinpy.gremlin import Gremlin, Param
+from gremlinpy.statement import GetEdge
+from gremlinpy.tests.client import StandInServer, run
+
+if websockets is not None:
+    from gremlinpy.client import Client
+
+
+class _Submit(object):
+    """records the batches and answers with one result per traversal"""
+
+    def __init__(self, error=None, results=None):
+        self.batches = []
+        self.error = error
+        self.results = results
+
+    async def __call__(self, batch, **kwargs):
+        self.batches.append(batch)
+        await asyncio.sleep(0)
+
+        if self.error is not None:
+            raise self.error
+
+        if self.results is not None:
+            return self.results
+
+        return [str(traversal) for traversal in batch.traversals]
+
+
+def add_vertex(name):
+    return Gremlin().addV('person').property('name', Param('name', name))
+
+
+def add_edge(out_id, in_id):
+    return Gremlin().V(out_id).addE('knows').to(Gremlin('__').V(in_id))
+
+
+class WriteBufferTests(unittest.TestCase):
+
+    def test_sends_when_max_rows_is_reached(self):
+        submit = _Submit()
+
+        async def test():
+            buffer = WriteBuffer(submit, max_rows=2, max_delay=None)
+            futures = [buffer.add(add_vertex(i)) for i in range(5)]
+            await asyncio.sleep(0.01)
+            sent = len(submit.batches)
+            await buffer.flush()
+
+            return sent, futures
+
+        sent, futures = run(test())
+
+        self.assertEqual(2, sent)
+        self.assertEqual([2, 2, 1], [len(b) for b in submit.batches])
+        self.assertTrue(all([f.done() for f in futures]))
+        self.assertIn('addV', futures[4].result())
+
+    def test_groups_by_fingerprint(self):
+        submit = _Submit()
+
+        async def test():
+            async with WriteBuffer(submit, max_delay=None) as buffer:
+                buffer.add(add_vertex('mark'))
+                buffer.add(add_edge(1, 2))
+                buffer.add(add_vertex('sue'))
+                buffer.add(add_edge(3, 4))
+
+                self.assertEqual(4, len(buffer))
+
+        run(test())
+
+        shapes = [[t.fingerprint() for t in batch.traversals]
+                  for batch in submit.batches]
+
+        self.assertEqual(2, len(shapes))
+
+        for shape in shapes:
+            self.assertEqual(2, len(shape))
+            self.assertEqual(1, len(set(shape)))
+
+    def test_renamed_params_leave_strings_alone(self):
+        submit = _Submit()
+
+        async def test():
+            async with WriteBuffer(submit, max_delay=None) as buffer:
+                for name in ('mark', 'sue'):
+                    buffer.add(Gremlin().addV().unbound(
+                        'property', "'name'", Param('name', name)))
+
+        run(test())
+
+        script, bindings = submit.batches[0].render()
+
+        self.assertIn("property('name', name)", script)
+        self.assertIn("property('name', B1_name)", script)
+        self.assertEqual('sue', bindings['B1_name'])
+
+    def test_sends_after_max_delay(self):
+        submit = _Submit()
+
+        async def test():
+            buffer = WriteBuffer(submit, max_delay=0.01)
+            future = buffer.add(add_vertex('mark'))
+
+            return await asyncio.wait_for(future, 1)
+
+        self.assertIn('addV', run(test()))
+        self.assertEqual(1, len(submit.batches))
+
+    def test_sends_when_max_bytes_is_reached(self):
+        submit = _Submit()
+
+        async def test():
+            buffer = WriteBuffer(submit, max_bytes=350, max_delay=None)
+
+            for i in range(4):
+                buffer.add(add_vertex('user{}'.format(i)))
+
+            await asyncio.sleep(0.01)
+            sent = len(submit.batches)
+            await buffer.close()
+
+            return sent
+
+        self.assertEqual(1, run(test()))
+        self.assertEqual([3, 1], [len(b) for b in submit.batches])
+
+    def test_can_buffer_statements(self):
+        submit = _Submit()
+
+        async def test():
+            async with WriteBuffer(submit) as buffer:
+                futures = [buffer.add(GetEdge(i, i + 1, 'knows'))
+                           for i in range(3)]
+
+            return [f.result() for f in futures]
+
+        results = run(test())
+
+        self.assertEqual(1, len(submit.batches))
+        self.assertEqual(3, len(results))
+
+    def test_errors_are_set_on_every_future(self):
+        submit = _Submit(error=ValueError('down'))
+
+        async def test():
+            async with WriteBuffer(submit) as buffer:
+                futures = [buffer.add(add_vertex(i)) for i in range(2)]
+
+            return futures
+
+        for future in run(test()):
+            self.assertIsInstance(future.exception(), ValueError)
+
+    def test_missing_results_are_an_error(self):
+        submit = _Submit(results=['only one'])
+
+        async def test():
+            async with WriteBuffer(submit) as buffer:
+                futures = [buffer.add(add_vertex(i)) for i in range(2)]
+
+            return futures
+
+        for future in run(test()):
+            self.assertIsInstance(future.exception(), ClientError)
+
+    def test_cannot_add_to_closed_buffer(self):
+        async def test():
+            buffer = WriteBuffer(_Submit())
+            await buffer.close()
+            buffer.add(add_vertex('mark'))
+
+        with self.assertRaises(ClientError):
+            run(test())
+
+    def test_only_traversals_can_be_buffered(self):
+        async def test():
+            WriteBuffer(_Submit()).add('g.V()')
+
+        with self.assertRaises(ClientError):
+            run(test())
+
+    @unittest.skipIf(websockets is None, 'websockets is not installed')
+    def test_can_send_to_server(self):
+        async def answer(request):
+            entries = request['args']['gremlin'].count('gpy_result({')
+
+            return list(range(entries))
+
+        async def test():
+            async with StandInServer(answer) as server:
+                async with Client(server.url) as client:
+                    async with WriteBuffer(client.submit) as buffer:
+                        futures = [buffer.add(add_vertex(i))
+                                   for i in range(3)]
+
+                    return server.requests, [f.result() for f in futures]
+
+        requests, results = run(test())
+
+        self.assertEqual(1, len(requests))
+        self.assertEqual([0, 1, 2], results)
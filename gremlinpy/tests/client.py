@@ -0,0 +1,445 @@
+import asyncio
+import json
+import unittest
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+from gremlinpy.gremlin import Gremlin, Param
+from gremlinpy.statement import GetEdge
+from gremlinpy.exception import ClientError, ResponseError
+from gremlinpy.request import typed
+
+if websockets is not None:
+    from gremlinpy.client import Client
+
+
+class StandInError(Exception):
+
+    def __init__(self, code, message):
+        self.code = code
+        self.message = message
+
+
+class StandInServer(object):
+    """
+    a local server that speaks enough of the Gremlin Server websocket
+    protocol for the client. handler gets the request message and returns
+    the list of results, which are sent in frames of frame_size results
+    with frame_delay seconds between them
+    """
+
+    def __init__(self, handler=None, frame_size=None, frame_delay=0):
+        self.handler = handler or self.echo
+        self.frame_size = frame_size
+        self.frame_delay = frame_delay
+        self.sent = 0
+        self.connections = 0
+        self.requests = []
+        self.server = None
+
+    async def echo(self, request):
+        args = request['args']
+
+        return [args['gremlin'], args['bindings']]
+
+    async def __aenter__(self):
+        self.server = await websockets.serve(self.handle, '127.0.0.1', 0)
+        port = list(self.server.sockets)[0].getsockname()[1]
+        self.url = 'ws://127.0.0.1:{}/gremlin'.format(port)
+
+        return self
+
+    async def __aexit__(self, *args):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, websocket, *args):
+        self.connections += 1
+        tasks = []
+
+        async for message in websocket:
+            mime_length = bytearray(message)[0]
+            request = json.loads(message[mime_length + 1:].decode('utf-8'))
+            self.requests.append(request)
+            tasks.append(asyncio.ensure_future(
+                self.respond(websocket, request)))
+
+        for task in tasks:
+            task.cancel()
+
+    def frame(self, request, code, data=None, message=''):
+        return json.dumps({
+            'requestId': request['requestId']['@value'],
+            'status': {'code': code, 'message': message, 'attributes': {}},
+            'result': {'data': data, 'meta': {}}})
+
+    async def respond(self, websocket, request):
+        try:
+            results = await self.handler(request)
+        except StandInError as e:
+            frame = self.frame(request, e.code, message=e.message)
+            return await websocket.send(frame)
+
+        if not results:
+            return await websocket.send(self.frame(request, 204))
+
+        size = self.frame_size or len(results)
+        frames = [results[i:i + size] for i in range(0, len(results), size)]
+
+        for index, data in enumerate(frames):
+            code = 206 if index < len(frames) - 1 else 200
+
+            if index and self.frame_delay:
+                await asyncio.sleep(self.frame_delay)
+
+            await websocket.send(self.frame(request, code, data))
+            self.sent += 1
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@unittest.skipIf(websockets is None, 'websockets is not installed')
+class ClientTests(unittest.TestCase):
+
+    def test_can_submit_gremlin(self):
+        async def test():
+            async with StandInServer() as server:
+                async with Client(server.url) as client:
+                    g = Gremlin().V(Param('id', 12))
+                    results = await client.submit(g)
+
+            return g, results
+
+        g, results = run(test())
+
+        self.assertEqual([str(g), {'id': 12}], results)
+
+    def test_can_submit_statement(self):
+        async def test():
+            async with StandInServer() as server:
+                async with Client(server.url) as client:
+                    return await client.submit(GetEdge(1, 9, 'knows'))
+
+        script, bindings = run(test())
+
+        self.assertTrue(script.startswith('g.V(V_OUT_ID).bothE('))
+        self.assertEqual(1, bindings['V_OUT_ID'])
+
+    def test_cannot_submit_strings(self):
+        async def test():
+            async with StandInServer() as server:
+                async with Client(server.url) as client:
+                    await client.submit('g.V()')
+
+        with self.assertRaises(ClientError):
+            run(test())
+
+    def test_results_are_deserialized(self):
+        async def handler(request):
+            return [typed('g:Int64', 5), {'count': typed('g:Int32', 2)}]
+
+        async def test():
+            async with StandInServer(handler) as server:
+                async with Client(server.url) as client:
+                    return await client.submit(Gremlin().V().count())
+
+        self.assertEqual([5, {'count': 2}], run(test()))
+
+    def test_partial_frames_are_joined(self):
+        async def handler(request):
+            return list(range(10))
+
+        async def test():
+            async with StandInServer(handler, frame_size=3) as server:
+                async with Client(server.url) as client:
+                    return await client.submit(Gremlin().V())
+
+        self.assertEqual(list(range(10)), run(test()))
+
+    def test_no_content(self):
+        async def handler(request):
+            return []
+
+        async def test():
+            async with StandInServer(handler) as server:
+                async with Client(server.url) as client:
+                    return await client.submit(Gremlin().V())
+
+        self.assertEqual([], run(test()))
+
+    def test_error_status_raises_error(self):
+        async def handler(request):
+            raise StandInError(597, 'script failed')
+
+        async def test():
+            async with StandInServer(handler) as server:
+                async with Client(server.url) as client:
+                    await client.submit(Gremlin().V())
+
+        with self.assertRaises(ResponseError) as context:
+            run(test())
+
+        self.assertEqual(597, context.exception.code)
+        self.assertEqual('script failed', str(context.exception))
+
+    def test_responses_are_routed_by_request_id(self):
+        async def handler(request):
+            value = request['args']['bindings']['n']['@value']
+            await asyncio.sleep((20 - value) * 0.005)
+
+            return [value]
+
+        async def test():
+            async with StandInServer(handler) as server:
+                async with Client(server.url, pool_size=2) as client:
+                    requests = [client.submit(Gremlin().V(Param('n', n)))
+                                for n in range(20)]
+                    results = await asyncio.gather(*requests)
+
+            return server, results
+
+        server, results = run(test())
+
+        self.assertEqual([[n] for n in range(20)], results)
+        self.assertEqual(2, server.connections)
+
+    def test_pool_is_bounded(self):
+        running = []
+
+        async def handler(request):
+            running.append(1)
+            count = len(running)
+            await asyncio.sleep(0.01)
+            running.pop()
+
+            return [count]
+
+        async def test():
+            async with StandInServer(handler) as server:
+                async with Client(server.url, pool_size=2,
+                                  max_in_flight=3) as client:
+                    requests = [client.submit(Gremlin().V())
+                                for _ in range(20)]
+                    results = await asyncio.gather(*requests)
+
+            return server, results
+
+        server, results = run(test())
+
+        self.assertTrue(max([r[0] for r in results]) <= 6)
+        self.assertTrue(server.connections <= 2)
+
+    def test_connections_are_reused(self):
+        async def test():
+            async with StandInServer() as server:
+                async with Client(server.url, pool_size=4) as client:
+                    for _ in range(5):
+                        await client.submit(Gremlin().V())
+
+            return server
+
+        self.assertEqual(1, run(test()).connections)
+
+    def test_request_times_out(self):
+        async def handler(request):
+            if request['args']['gremlin'] == 'g.slow()':
+                await asyncio.sleep(1)
+
+            return [1]
+
+        async def test():
+            async with StandInServer(handler) as server:
+                async with Client(server.url, pool_size=1) as client:
+                    with self.assertRaises(asyncio.TimeoutError):
+                        await client.submit(Gremlin().slow(), timeout=0.05)
+
+                    return await client.submit(Gremlin().fast())
+
+        self.assertEqual([1], run(test()))
+
+    def test_closed_connection_fails_pending_requests(self):
+        async def handler(request):
+            raise ConnectionError
+
+        async def test():
+            async with StandInServer(handler) as server:
+                async with Client(server.url) as client:
+                    request = asyncio.ensure_future(
+                        client.submit(Gremlin().V()))
+                    await asyncio.sleep(0.05)
+                    server.server.close()
+                    await request
+
+        with self.assertRaises(ClientError):
+            run(test())
+
+
+@unittest.skipIf(websockets is None, 'websockets is not installed')
+class ResultStreamTests(unittest.TestCase):
+
+    async def numbers(self, request):
+        return list(range(request['args']['bindings']['n']['@value']))
+
+    def test_can_stream_frames(self):
+        async def test():
+            async with StandInServer(self.numbers, frame_size=3) as server:
+                async with Client(server.url) as client:
+                    g = Gremlin().V().limit(Param('n', 10))
+                    frames = []
+
+                    async for frame in client.stream(g):
+                        frames.append(frame)
+
+                    return frames
+
+        expected = [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+
+        self.assertEqual(expected, run(test()))
+
+    def test_frames_arrive_before_response_is_done(self):
+        async def test():
+            async with StandInServer(self.numbers, frame_size=1,
+                                     frame_delay=0.02) as server:
+                async with Client(server.url) as client:
+                    g = Gremlin().V().limit(Param('n', 5))
+
+                    async with client.stream(g) as frames:
+                        first = await frames.__anext__()
+                        sent = server.sent
+
+                        return first, sent, [f async for f in frames]
+
+        first, sent, rest = run(test())
+
+        self.assertEqual([0], first)
+        self.assertTrue(sent < 5)
+        self.assertEqual([[1], [2], [3], [4]], rest)
+
+    def test_buffer_is_bounded(self):
+        async def test():
+            async with StandInServer(self.numbers, frame_size=1) as server:
+                async with Client(server.url) as client:
+                    g = Gremlin().V().limit(Param('n', 50))
+                    stream = client.stream(g, max_frames=2)
+                    buffered = []
+                    results = []
+
+                    async for frame in stream:
+                        await asyncio.sleep(0.002)
+                        buffered.append(stream.pending.queue.qsize())
+                        results.extend(frame)
+
+                    return buffered, results
+
+        buffered, results = run(test())
+
+        self.assertEqual(list(range(50)), results)
+        self.assertTrue(max(buffered) <= 2)
+
+    def test_closing_stream_frees_connection(self):
+        async def test():
+            async with StandInServer(self.numbers, frame_size=1) as server:
+                async with Client(server.url, pool_size=1,
+                                  max_in_flight=1) as client:
+                    g = Gremlin().V().limit(Param('n', 100))
+
+                    async with client.stream(g, max_frames=1) as frames:
+                        async for frame in frames:
+                            break
+
+                    small = Gremlin().V().limit(Param('n', 2))
+
+                    return await asyncio.wait_for(client.submit(small), 1)
+
+        self.assertEqual([0, 1], run(test()))
+
+    def test_waiting_for_frame_times_out(self):
+        async def test():
+            async with StandInServer(self.numbers, frame_size=1,
+                                     frame_delay=1) as server:
+                async with Client(server.url, pool_size=1,
+                                  max_in_flight=1) as client:
+                    g = Gremlin().V().limit(Param('n', 2))
+                    frames = client.stream(g, timeout=0.05)
+
+                    self.assertEqual([0], await frames.__anext__())
+
+                    with self.assertRaises(asyncio.TimeoutError):
+                        await frames.__anext__()
+
+                    self.assertTrue(frames.done)
+                    self.assertEqual(0, client.exclusive[0].in_flight)
+
+        run(test())
+
+    def test_paused_stream_does_not_block_other_requests(self):
+        async def test():
+            async with StandInServer(self.numbers, frame_size=1) as server:
+                async with Client(server.url, pool_size=1) as client:
+                    g = Gremlin().V().limit(Param('n', 100))
+
+                    async with client.stream(g, max_frames=1) as frames:
+                        first = await frames.__anext__()
+                        await asyncio.sleep(0.05)
+                        small = Gremlin().V().limit(Param('n', 2))
+                        results = await client.submit(small, timeout=1)
+
+                        return first, results, [f async for f in frames]
+
+        first, results, rest = run(test())
+
+        self.assertEqual([0], first)
+        self.assertEqual([0, 1], results)
+        self.assertEqual([[n] for n in range(1, 100)], rest)
+
+    def test_exclusive_connections_are_bounded(self):
+        async def test():
+            async with StandInServer(self.numbers, frame_size=1) as server:
+                async with Client(server.url, pool_size=2) as client:
+                    async def consume(n):
+                        g = Gremlin().V().limit(Param('n', n))
+
+                        async with client.stream(g, max_frames=1) as frames:
+                            return [frame async for frame in frames]
+
+                    streams = [consume(n) for n in range(1, 6)]
+                    results = await asyncio.wait_for(
+                        asyncio.gather(*streams), 1)
+
+                    return server, len(client.exclusive), results
+
+        server, exclusive, results = run(test())
+
+        self.assertEqual(2, exclusive)
+        self.assertEqual(2, server.connections)
+        self.assertEqual([[[i] for i in range(n)] for n in range(1, 6)],
+                         results)
+
+    def test_free_exclusive_connections_are_reused(self):
+        async def test():
+            async with StandInServer(self.numbers, frame_size=1) as server:
+                async with Client(server.url) as client:
+                    for _ in range(3):
+                        g = Gremlin().V().limit(Param('n', 3))
+
+                        async with client.stream(g, max_frames=1) as frames:
+                            async for frame in frames:
+                                break
+
+                    await client.submit(Gremlin().V().limit(Param('n', 1)))
+
+                    return server, len(client.exclusive)
+
+        server, exclusive = run(test())
+
+        self.assertEqual(1, exclusive)
+        self.assertEqual(2, server.connections)
+
+
+if __name__ == '__main__':
+    unittest.main()
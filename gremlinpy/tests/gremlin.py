@@ -2,9 +2,16 @@ from random import randrange, random
 
 import unittest
 import re
+import io
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
 
 from gremlinpy.gremlin import *
 from gremlinpy.gremlin import _
+from gremlinpy.statement import Statement
 
 
 def get_dict_key(dict, value):
@@ -201,6 +208,30 @@ class GremlinTests(unittest.TestCase):
         self.assertEqual(1, len(params))
         self.assertEqual(expected, s)
 
+    def test_can_bind_same_unhashable_value_with_one_bound_param(self):
+        val = ['random', str(random())]
+        g = Gremlin()
+        g.func1(val).func2(list(val))
+        s = str(g)
+        params = g.bound_params
+        one = get_dict_key(params, val)
+        expected = 'g.func1({}).func2({})'.format(one, one)
+
+        self.assertEqual(1, len(params))
+        self.assertEqual(expected, s)
+
+    def test_can_bind_many_params_without_deduping_distinct_values(self):
+        g = Gremlin()
+
+        for i in range(5000):
+            g.bind_param(i)
+
+        for i in range(5000):
+            g.bind_param(i)
+
+        self.assertEqual(5000, len(g.bound_params))
+        self.assertEqual(5000, len(g.params))
+
     def test_can_add_unbound_functon_one_arg(self):
         g = Gremlin().unbound('function', 'arg')
         string = str(g)
@@ -509,6 +540,77 @@ class GremlinTests(unittest.TestCase):
         self.assertEqual(s, expected)
         self.assertEqual(len(params), 1)
 
+    def test_can_add_closure_with_arguments(self):
+        g = Gremlin()
+
+        g.each.close('body', 'x', 'y')
+
+        self.assertEqual('g.each{x, y -> body}', str(g))
+
+    def test_rendering_twice_produces_same_script_and_bindings(self):
+        g = Gremlin().V(12).has('name', 'mark').out(lt(5))
+        string = str(g)
+        params = g.bound_params.copy()
+        count = g.bound_count
+
+        self.assertEqual(string, str(g))
+        self.assertEqual(params, g.bound_params)
+        self.assertEqual(count, g.bound_count)
+
+    def test_adding_token_after_render_invalidates_script(self):
+        g = Gremlin().V(12)
+        string = str(g)
+
+        g.out('knows')
+
+        new_string = str(g)
+        params = g.bound_params
+        expected = '{}.out({})'.format(string, get_dict_key(params, 'knows'))
+
+        self.assertEqual(expected, new_string)
+        self.assertEqual(2, len(params))
+
+    def test_changing_graph_and_return_variable_invalidates_script(self):
+        g = Gremlin().V()
+        str(g)
+
+        g.set_graph_variable('x').set_ret_variable('y')
+
+        self.assertEqual('y = x.V()', str(g))
+
+    def test_changing_nested_gremlin_invalidates_parent_script(self):
+        g = Gremlin()
+        n = Gremlin('__').out()
+
+        g.V().where(n)
+        str(g)
+        n.count()
+
+        self.assertEqual('g.V().where(__.out().count())', str(g))
+
+    def test_can_remove_bottom_token_and_keep_chaining(self):
+        g = Gremlin().a.b
+
+        g.remove_token(g.bottom).c
+
+        self.assertEqual('g.a.c', str(g))
+
+    def test_can_remove_token_from_middle_of_chain(self):
+        g = Gremlin().a
+        b = g.b.bottom
+
+        g.c.remove_token(b).d
+
+        self.assertEqual('g.a.c.d', str(g))
+
+    def test_can_build_long_chain_of_function_calls(self):
+        g = Gremlin()
+
+        for x in range(20000):
+            g.unbound('addV').next()
+
+        self.assertEqual(40001, len(str(g).split('.')))
+
     def test_can_copy_gremlin_instance(self):
         g = Gremlin('xxxx').out().someThing('value')
         gg = g.copy()
@@ -622,6 +724,596 @@ class GremlinTests(unittest.TestCase):
         self.assertNotEqual(len(params_g), len(params_gg))
 
 
+class GremlinCopyTests(unittest.TestCase):
+
+    def test_copy_shares_tokens_with_original(self):
+        g = Gremlin().V(12).out('knows')
+        gg = g.copy()
+
+        tokens = [id(t) for t in g][1:]
+
+        self.assertEqual(2, len(tokens))
+        self.assertEqual(tokens, [id(t) for t in gg][1:])
+        self.assertEqual(str(g), str(gg))
+        self.assertEqual(g.bound_params, gg.bound_params)
+
+    def test_can_branch_copy_many_times(self):
+        g = Gremlin().V(12).out('knows')
+        expected = str(g)
+        branches = []
+
+        for x in range(50):
+            branches.append(g.copy().count())
+            g.out()
+            expected += '.out()'
+
+        self.assertEqual(expected, str(g))
+        self.assertEqual(expected + '.count()', str(g.copy().count()))
+        self.assertTrue(str(branches[-1]).endswith('.out().count()'))
+
+    def test_can_copy_trailing_attribute_and_call_both(self):
+        g = Gremlin().V().outE
+        gg = g.copy()
+
+        g('knows')
+        gg('likes')
+
+        self.assertEqual("g.V().outE('knows')", gremlin_as_string(g))
+        self.assertEqual("g.V().outE('likes')", gremlin_as_string(gg))
+
+    def test_can_copy_long_chain_without_recursion(self):
+        g = Gremlin()
+
+        for x in range(5000):
+            g.out()
+
+        self.assertEqual(str(g), str(g.copy()))
+        self.assertEqual(str(g), str(g.copy(deep=True)))
+
+    def test_deep_copy_does_not_share_tokens(self):
+        g = Gremlin().V(12).out('knows')
+        gg = g.copy(deep=True)
+        tokens = set(id(t) for t in g)
+
+        self.assertFalse(tokens & set(id(t) for t in gg))
+        self.assertEqual(gremlin_as_string(g), gremlin_as_string(gg))
+
+    def test_copy_leaves_original_chain_alone(self):
+        g = Gremlin().V(1).out('a')
+        bottom = g.bottom
+        gg = g.copy()
+
+        self.assertIs(bottom, g.bottom)
+
+        g.remove_token(g.bottom)
+
+        self.assertEqual("g.V('1')", gremlin_as_string(g))
+        self.assertEqual("g.V('1').out('a')", gremlin_as_string(gg))
+
+    def test_can_remove_shared_token_from_copy(self):
+        g = Gremlin().V(1).out('a')
+        gg = g.copy()
+
+        gg.remove_token(gg.bottom)
+
+        self.assertEqual("g.V('1')", gremlin_as_string(gg))
+        self.assertEqual("g.V('1').out('a')", gremlin_as_string(g))
+
+    def test_can_replace_shared_token(self):
+        g = Gremlin().V(1).out('a').count()
+        gg = g.copy()
+        out = list(g)[2]
+
+        g.replace_token(out, Function(g, 'in', 'a'))
+
+        self.assertEqual("g.V('1').in('a').count()", gremlin_as_string(g))
+        self.assertEqual("g.V('1').out('a').count()", gremlin_as_string(gg))
+
+    def test_removing_token_that_is_not_in_chain_keeps_sharing(self):
+        g = Gremlin().V(1).out('a')
+        gg = g.copy().count()
+        shared = g._shared
+        other = Gremlin().V().inE('b')
+
+        gg.remove_token(other.bottom)
+        gg.replace_token(other.bottom, Function(gg, 'in', 'c'))
+        g.remove_token(other.bottom)
+
+        self.assertIsInstance(gg.top.next, Segment)
+        self.assertIs(shared, g._shared)
+        self.assertEqual("g.V('1').out('a').count()", gremlin_as_string(gg))
+        self.assertEqual("g.V().inE('b')", gremlin_as_string(other))
+
+    def test_copy_of_unrendered_chain_does_not_keep_script(self):
+        g = Gremlin().V(1).out('a')
+        gg = g.copy().count()
+
+        self.assertIsNone(g._script)
+        self.assertEqual("g.V('1').out('a').count()", gremlin_as_string(gg))
+
+    def test_can_render_chain_of_copies(self):
+        g = Gremlin().V(1)
+
+        for x in range(3000):
+            g = g.copy().out(Param('p{}'.format(x), x))
+
+        self.assertTrue(str(g).endswith('.out(p2998).out(p2999)'))
+        self.assertEqual(3001, len(g.bound_params))
+        self.assertEqual(3002, len(list(g)))
+
+    def test_binding_after_copy_does_not_copy_params(self):
+        g = Gremlin()
+
+        for x in range(100):
+            g.out(x)
+
+        gg = g.copy().out('branch')
+        str(gg)
+
+        self.assertEqual(1, len(gg.params._params))
+        self.assertEqual(101, len(gg.bound_params))
+        self.assertEqual(100, len(g.bound_params))
+
+    def test_copies_find_values_bound_before_the_copy(self):
+        g = Gremlin().V('x')
+        gg = g.copy().out('x')
+        str(gg)
+
+        name = get_dict_key(gg.bound_params, 'x')
+        expected = 'g.V({0}).out({0})'.format(name)
+
+        self.assertEqual(1, len(gg.bound_params))
+        self.assertEqual(expected, str(gg))
+
+    def test_names_bound_again_in_copy_are_not_found_by_old_value(self):
+        g = Gremlin()
+        g.bind_param('old', 'name')
+        gg = g.copy()
+        gg.bind_param('new', 'name')
+        gg.bind_param('other', 'x')
+        gg.copy()
+
+        self.assertIsNone(gg.params.find('old'))
+        self.assertEqual('name', gg.params.find('new'))
+        self.assertEqual({'name': 'new', 'x': 'other'}, gg.bound_params)
+        self.assertEqual({'name': 'old'}, g.bound_params)
+
+
+class PositionalNamingTests(unittest.TestCase):
+
+    def build(self, name, age, label):
+
+        class HasLabel(Statement):
+
+            def build(self):
+                self.gremlin.hasLabel(label)
+
+        g = Gremlin().set_param_naming(PositionalNaming())
+        n = Gremlin('__').out('knows').has('age', gt(age))
+
+        g.V().has('name', name).where(n).map(HasLabel())
+
+        return g
+
+    def test_same_shape_renders_same_script(self):
+        g = self.build('mark', 33, 'person')
+        gg = self.build('john', 44, 'user')
+        expected = ('g.V().has(_p0, _p1).where(__.out(_p2).has(age, gt(_p3)))'
+                    '.map(g.hasLabel(_p4))')
+
+        self.assertEqual(expected, str(g))
+        self.assertEqual(expected, str(gg))
+        self.assertEqual(33, g.bound_params['_p3'])
+        self.assertEqual(44, gg.bound_params['_p3'])
+        self.assertEqual('user', gg.bound_params['_p4'])
+
+    def test_does_not_dedupe_values(self):
+        g = Gremlin().set_param_naming(PositionalNaming())
+        g.V(1).out(1)
+
+        self.assertEqual('g.V(_p0).out(_p1)', str(g))
+        self.assertEqual({'_p0': 1, '_p1': 1}, g.bound_params)
+
+    def test_can_use_naming_for_all_instances(self):
+
+        class ShapeGremlin(Gremlin):
+            PARAM_NAMING = PositionalNaming('x')
+
+        g = ShapeGremlin().V(12).out(Param('label', 'knows'))
+
+        self.assertEqual('g.V(x0).out(label)', str(g))
+
+    def test_child_rendered_before_nesting_is_renamed(self):
+        g = Gremlin().set_param_naming(PositionalNaming())
+        n = Gremlin('__').set_param_naming(PositionalNaming()).out('knows')
+
+        self.assertEqual('__.out(_p0)', str(n))
+
+        g.V(12).where(n)
+
+        self.assertEqual('g.V(_p0).where(__.out(_p1))', str(g))
+        self.assertEqual({'_p0': 12, '_p1': 'knows'}, g.bound_params)
+
+
+    def test_deep_copy_keeps_naming(self):
+        g = Gremlin().set_param_naming(PositionalNaming())
+        g.V(1).out(Param('label', 'knows'))
+        str(g)
+        gg = g.copy(deep=True).has('x', 2)
+
+        self.assertEqual('g.V(_p0).out(label).has(_p1, _p2)', str(gg))
+        self.assertEqual({'_p0': 1, 'label': 'knows', '_p1': 'x', '_p2': 2},
+                         gg.bound_params)
+        self.assertEqual({'_p0': 1, 'label': 'knows'}, g.bound_params)
+
+
+    def test_copy_is_bound_again_by_the_registry_it_is_nested_in(self):
+        base = Gremlin('__').out('a')
+        branch = base.copy().out('b')
+        g = Gremlin().set_param_naming(PositionalNaming()).V(1).where(branch)
+
+        self.assertEqual('g.V(_p0).where(__.out(_p1).out(_p2))', str(g))
+        self.assertEqual({'_p0': 1, '_p1': 'a', '_p2': 'b'}, g.bound_params)
+        self.assertEqual("__.out('a')", gremlin_as_string(base))
+
+    def test_rendered_positional_copy_can_be_nested(self):
+        base = Gremlin('__').set_param_naming(PositionalNaming()).out('a')
+        branch = base.copy().out('b')
+        str(branch)
+        g = Gremlin().set_param_naming(PositionalNaming()).V(1).where(branch)
+
+        self.assertEqual('g.V(_p0).where(__.out(_p1).out(_p2))', str(g))
+        self.assertEqual({'_p0': 1, '_p1': 'a', '_p2': 'b'}, g.bound_params)
+        self.assertEqual('__.out(_p0)', str(base))
+        self.assertEqual({'_p0': 'a'}, base.bound_params)
+
+
+class TemplateTests(unittest.TestCase):
+
+    def test_can_compile_gremlin_into_template(self):
+        g = Gremlin().V(Param('user_id', 1)).limit(Param('limit', 10))
+        template = g.compile()
+
+        self.assertEqual('g.V(user_id).limit(limit)', template.script)
+        self.assertEqual({'user_id': 1, 'limit': 10}, template.bindings)
+        self.assertEqual(sorted(['user_id', 'limit']), sorted(template.slots))
+
+    def test_can_render_template_with_new_values(self):
+        g = Gremlin().V(Param('user_id', 1)).limit(Param('limit', 10))
+        template = g.compile()
+        script, bindings = template.render(user_id=12, limit=5)
+        script2, bindings2 = template.render({'limit': 1})
+
+        self.assertEqual(str(g), script)
+        self.assertEqual({'user_id': 12, 'limit': 5}, bindings)
+        self.assertEqual({'user_id': 1, 'limit': 1}, bindings2)
+        self.assertEqual({'user_id': 1, 'limit': 10}, template.bindings)
+
+    def test_cannot_render_template_with_unknown_slot(self):
+        template = Gremlin().V(Param('user_id', 1)).compile()
+
+        with self.assertRaises(TemplateError):
+            template.render(name='mark')
+
+    def test_slots_are_only_used_where_the_param_was(self):
+        g = Gremlin().V(Param('user_id', 10)).out('knows').limit(10)
+        template = g.compile()
+        script, bindings = template.render(user_id=99)
+        limit = get_dict_key(bindings, 10)
+
+        self.assertEqual('g.V(user_id).out({}).limit({})'.format(
+            get_dict_key(bindings, 'knows'), limit), script)
+        self.assertNotEqual('user_id', limit)
+        self.assertEqual(99, bindings['user_id'])
+
+    def test_equal_values_still_share_generated_names(self):
+        g = Gremlin().V(Param('user_id', 5)).limit(5).has('x', 5)
+        template = g.compile()
+
+        self.assertEqual(3, len(template.bindings))
+        self.assertEqual([5, 5, 'x'], sorted(template.bindings.values(),
+                                             key=str))
+
+    def test_template_is_not_changed_by_gremlin(self):
+        g = Gremlin().V(Param('user_id', 1))
+        template = g.compile()
+
+        g.out('knows')
+
+        self.assertEqual('g.V(user_id)', template.script)
+        self.assertEqual(1, len(template.bindings))
+
+
+class FingerprintTests(unittest.TestCase):
+
+    def test_same_shape_has_same_fingerprint(self):
+        g = Gremlin().V(12).has('name', 'mark').out(lt(5))
+        gg = Gremlin().V(99).has('age', 44).out(lt(100))
+
+        self.assertEqual(g.fingerprint(), gg.fingerprint())
+        self.assertNotEqual(str(g), str(gg))
+
+    def test_different_steps_have_different_fingerprints(self):
+        g = Gremlin().V(12).out('knows')
+        gg = Gremlin().V(12).in_('knows')
+        ggg = Gremlin().V(12).out
+
+        self.assertNotEqual(g.fingerprint(), gg.fingerprint())
+        self.assertNotEqual(g.fingerprint(), ggg.fingerprint())
+
+    def test_different_nesting_has_different_fingerprint(self):
+        g = Gremlin().V().where(Gremlin('__').out())
+        gg = Gremlin().V().where(Gremlin('__').in_())
+
+        self.assertNotEqual(g.fingerprint(), gg.fingerprint())
+
+    def test_graph_variable_and_unbound_values_are_part_of_fingerprint(self):
+        g = Gremlin().V().unbound('has', 'name')
+
+        self.assertNotEqual(g.fingerprint(),
+                            Gremlin().V().unbound('has', 'age').fingerprint())
+        self.assertNotEqual(g.fingerprint(),
+            Gremlin('x').V().unbound('has', 'name').fingerprint())
+
+    def test_fingerprint_changes_as_tokens_are_added(self):
+        g = Gremlin().V(12)
+        before = g.fingerprint()
+
+        g.out('knows')
+
+        self.assertNotEqual(before, g.fingerprint())
+        self.assertEqual(Gremlin().V(1).out('x').fingerprint(),
+                         g.fingerprint())
+
+    def test_fingerprint_is_updated_when_token_is_removed(self):
+        g = Gremlin().V()
+        out = g.out().bottom
+        g.count()
+        g.fingerprint()
+        g.remove_token(out)
+
+        self.assertEqual(Gremlin().V().count().fingerprint(), g.fingerprint())
+
+    def test_fingerprint_is_updated_when_nested_instance_changes(self):
+        child = Gremlin('__').out('a')
+        g = Gremlin().V().where(child)
+        before = g.fingerprint()
+        child.has('x', 1)
+        expected = Gremlin().V().where(Gremlin('__').out('a').has('x', 1))
+
+        self.assertNotEqual(before, g.fingerprint())
+        self.assertEqual(expected.fingerprint(), g.fingerprint())
+
+    def test_fingerprint_of_copy_is_updated_when_nested_instance_changes(self):
+        child = Gremlin('__').out('a')
+        g = Gremlin().V().where(Gremlin('__').in_('b').where(child))
+        gg = g.copy().count()
+        before = gg.fingerprint()
+        child.has('x', 1)
+        expected = Gremlin().V().where(Gremlin('__').in_('b').where(
+            Gremlin('__').out('a').has('x', 1))).count()
+
+        self.assertNotEqual(before, gg.fingerprint())
+        self.assertEqual(expected.fingerprint(), gg.fingerprint())
+
+    def test_change_only_rehashes_traversals_that_hold_it(self):
+        child = Gremlin('__').out('a')
+        g = Gremlin().V().where(child).count()
+        other = Gremlin().V().out('b')
+        g.fingerprint()
+        other.fingerprint()
+        child.has('x', 1)
+
+        self.assertIsNotNone(g.top.next.digest)
+        self.assertIsNone(g.bottom.digest)
+        self.assertIsNotNone(other.bottom.digest)
+
+    def test_fingerprint_is_updated_through_predicates_and_copies(self):
+        child = Gremlin('__').out('a')
+        g = Gremlin().V().where(NOT(child))
+        ggg = g.copy().copy().count()
+        before = ggg.fingerprint()
+        child.has('x', 1)
+        expected = Gremlin().V().where(NOT(Gremlin('__').out('a').has(
+            'x', 1))).count()
+
+        self.assertNotEqual(before, ggg.fingerprint())
+        self.assertEqual(expected.fingerprint(), ggg.fingerprint())
+
+    def test_copy_has_same_fingerprint(self):
+        g = Gremlin().V(12).out('knows')
+        gg = g.copy()
+
+        self.assertEqual(g.fingerprint(), gg.fingerprint())
+        self.assertEqual(g.count().fingerprint(), gg.count().fingerprint())
+
+    def test_templates_of_same_shape_are_equal(self):
+        one = Gremlin().V(12).out('knows').compile()
+        two = Gremlin().V(14).out('likes').compile()
+        three = Gremlin().V(14).in_('likes').compile()
+        shapes = {one: 1}
+
+        self.assertEqual(one, two)
+        self.assertNotEqual(one, three)
+        self.assertIn(two, shapes)
+        self.assertNotIn(three, shapes)
+
+
+class _DictToken(object):
+    """the pre __slots__ token layout, used to measure the savings"""
+
+    def __init__(self, gremlin, value, *args):
+        self.next = None
+        self.prev = None
+        self.bound_args = None
+        self.gremlin = gremlin
+        self.value = value
+        self.args = list(args)
+
+
+class TokenMemoryTests(unittest.TestCase):
+
+    def measure(self, token_class, count=2000):
+        g = Gremlin()
+        tracemalloc.start()
+        tokens = [token_class(g, 'name') for _ in range(count)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        return size / float(len(tokens))
+
+    def test_tokens_do_not_have_instance_dict(self):
+        g = Gremlin()
+        tokens = [GraphVariable(g, 'g'), Attribute(g, 'a'),
+                  Function(g, 'f', 1), FunctionRaw(g, 'f'),
+                  UnboudFunction(g, 'f'), UnboudFunctionRaw(g, 'f'),
+                  Index(g, slice(1, 2)), Closure(g, 'c'),
+                  ClosureArguments(g, 'c', 'x'), Raw(g, 'r')]
+
+        for token in tokens:
+            self.assertFalse(hasattr(token, '__dict__'), type(token))
+
+    def test_tokens_without_args_share_empty_args(self):
+        g = Gremlin()
+
+        self.assertIs(Attribute(g, 'a').args, Attribute(g, 'b').args)
+
+    @unittest.skipIf(tracemalloc is None, 'tracemalloc is not available')
+    def test_slotted_token_uses_less_memory_than_dict_token(self):
+        before = self.measure(_DictToken)
+        after = self.measure(Attribute)
+
+        self.assertLess(after, before * 0.6)
+
+
+class _Sink(object):
+    """a writer that only counts what it was sent"""
+
+    def __init__(self):
+        self.size = 0
+        self.writes = 0
+
+    def write(self, data):
+        self.size += len(data)
+        self.writes += 1
+
+
+class _Socket(object):
+
+    def __init__(self):
+        self.sent = []
+
+    def sendall(self, data):
+        self.sent.append(data)
+
+
+class RenderToTests(unittest.TestCase):
+
+    def gremlin(self):
+        g = Gremlin().V(1).has('name', within('mark', 'jan'))
+        g.where(_('out', 'knows').count().IS(gt(3)))
+        g.close(Gremlin().inner(5)).raw('.x()').unbound('y', Gremlin().z(6))
+
+        return g.set_ret_variable('r')
+
+    def large(self, branches=100, steps=100):
+        g = Gremlin().V()
+
+        for _ in range(branches):
+            inner = Gremlin('__')
+
+            for _ in range(steps):
+                inner.out(Param('label', 'knows'))
+
+            g.union(inner)
+
+        return g
+
+    def test_can_render_to_text_stream(self):
+        g = self.gremlin()
+        buf = io.StringIO()
+        size = g.render_to(buf)
+        string = str(g)
+
+        self.assertEqual(string, buf.getvalue())
+        self.assertEqual(len(string), size)
+
+    def test_can_render_to_bytes_stream(self):
+        g = Gremlin().V(1).raw(u'.has("\u00e9")')
+        buf = io.BytesIO()
+        size = g.render_to(buf)
+        string = str(g).encode('utf-8')
+
+        self.assertEqual(string, buf.getvalue())
+        self.assertEqual(len(string), size)
+
+    def test_can_render_to_socket(self):
+        g = self.gremlin()
+        sock = _Socket()
+
+        g.render_to(sock, buffer_size=8)
+
+        self.assertTrue(len(sock.sent) > 1)
+        self.assertEqual(str(g).encode('utf-8'), b''.join(sock.sent))
+
+    def test_render_to_binds_like_str(self):
+        g = self.gremlin()
+
+        g.render_to(io.StringIO())
+
+        params = g.bound_params.copy()
+        buf = io.StringIO()
+
+        g.render_to(buf)
+
+        self.assertEqual(params, g.bound_params)
+        self.assertEqual(str(g), buf.getvalue())
+
+    def test_render_to_empty_graph_variable(self):
+        g = Gremlin('').raw('x').func('y', 2).close('z')
+        buf = io.StringIO()
+
+        g.render_to(buf)
+
+        self.assertEqual(str(g), buf.getvalue())
+
+    def test_render_to_copied_gremlin(self):
+        g = self.large(3, 3)
+        copy = g.copy().out('after')
+        buf = io.StringIO()
+
+        copy.render_to(buf)
+
+        self.assertEqual(str(copy), buf.getvalue())
+
+    def test_writes_are_buffered(self):
+        g = self.large()
+        sink = _Sink()
+
+        g.render_to(sink, buffer_size=4096)
+
+        self.assertEqual(len(str(g)), sink.size)
+        self.assertTrue(sink.writes <= sink.size // 4096 + 1)
+
+    @unittest.skipIf(tracemalloc is None, 'tracemalloc is not available')
+    def test_render_to_holds_less_than_one_copy(self):
+        g = self.large(200, 200)
+
+        g.render_to(_Sink())
+        tracemalloc.start()
+        g.render_to(_Sink(), buffer_size=4096)
+        streamed = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        size = len(str(g))
+        rendered = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        self.assertLess(streamed, size)
+        self.assertLess(streamed * 2, rendered)
+
+
 class GremlinInjectionTests(unittest.TestCase):
 
     def test_can_nest_gremlin(self):
@@ -711,6 +1403,19 @@ class GremlinInjectionTests(unittest.TestCase):
         self.assertEqual(expected, string)
         self.assertEqual(len(params), 4)
 
+    def test_nested_gremlin_shares_parent_param_registry(self):
+        g = Gremlin()
+        n = Gremlin()
+        d = Gremlin()
+
+        g.nest(n.nested(d.deep('value')))
+        str(g)
+
+        self.assertIs(g.params, n.params)
+        self.assertIs(g.params, d.params)
+        self.assertEqual(g.bound_params, d.bound_params)
+        self.assertEqual(1, len(g.bound_params))
+
     def test_can_nest_with_unbound_params_of_same_value(self):
         g = Gremlin()
         n = Gremlin()
@@ -760,6 +1465,52 @@ class GremlinInjectionTests(unittest.TestCase):
         self.assertEqual(expected, string)
 
 
+class StepCatalogTests(unittest.TestCase):
+
+    def test_catalog_steps_are_functions(self):
+        g = Gremlin().V().out('knows').count()
+        string = str(g)
+
+        self.assertEqual('g.V().out({}).count()'.format(
+            get_dict_key(g.bound_params, 'knows')), string)
+        self.assertEqual(['GraphVariable', 'Function', 'Function', 'Function'],
+                         [type(token).__name__ for token in g])
+
+    def test_catalog_step_with_predicate_is_unbound(self):
+        g = Gremlin().V().has('age', gt(3))
+        string = str(g)
+
+        self.assertEqual('g.V().has(age, gt({}))'.format(
+            get_dict_key(g.bound_params, 3)), string)
+
+    def test_catalog_step_checks_arity(self):
+        with self.assertRaises(TokenError):
+            Gremlin().V().has()
+
+        with self.assertRaises(TokenError):
+            Gremlin().V().unfold(1)
+
+        with self.assertRaises(TokenError):
+            Anon().limit(1, 2, 3)
+
+    def test_catalog_step_can_be_an_attribute(self):
+        g = Gremlin().V.out
+
+        self.assertEqual('g.V.out', str(g))
+
+    def test_unknown_steps_are_dynamic(self):
+        g = Gremlin().someStep().otherStep
+
+        self.assertEqual('g.someStep().otherStep', str(g))
+
+    def test_gremlin_methods_are_not_replaced(self):
+        self.assertNotIsInstance(Gremlin.__dict__['range'], Step)
+        self.assertIsInstance(Gremlin.__dict__['out'], Step)
+
+
+ADULT = gt(18)
+
+
 class PredicateTests(unittest.TestCase):
 
     def test_can_pass_single_predicate_to_function(self):
@@ -860,6 +1611,41 @@ class PredicateTests(unittest.TestCase):
         self.assertEqual(0, len(params))
         self.assertEqual(expected, string)
 
+    def test_anon_traversal_is_lazy(self):
+        a = Anon().out('knows')
+
+        self.assertIsNone(a._params)
+        self.assertIsNone(a._bound_param)
+
+    def test_nested_anon_traversal_binds_into_the_parent(self):
+        g = Gremlin().V().where(Anon().out('knows'))
+        string = str(g)
+        inner = g.bottom.args[0]
+        argument = get_dict_key(g.bound_params, 'knows')
+
+        self.assertEqual('g.V().where(__.out({}))'.format(argument), string)
+        self.assertIsNone(inner._params)
+        self.assertIsNone(inner._bound_param)
+        self.assertIs(g.params, inner.params)
+
+    def test_nested_anon_traversals_use_the_root_id(self):
+        inner = Anon().out('b').has('c')
+        g = Gremlin().V('a').where(inner)
+        str(g)
+        prefix = 'GPY_PARAM_{}_'.format(g.bound_param)
+
+        self.assertIsNone(inner._bound_param)
+        self.assertEqual(3, len(g.bound_params))
+        self.assertTrue(all([name.startswith(prefix)
+                             for name in g.bound_params]))
+
+    def test_anon_traversal_rendered_on_its_own_has_params(self):
+        a = Anon().out('knows')
+        string = str(a)
+        argument = get_dict_key(a.bound_params, 'knows')
+
+        self.assertEqual('__.out({})'.format(argument), string)
+
     def test_can_handle_problematic_predicates_in_diff_contexes(self):
         g = Gremlin().IN().AND(AS().IS().NOT())
         string = str(g)
@@ -884,6 +1670,85 @@ class PredicateTests(unittest.TestCase):
         self.assertEqual(len(params_g), len(params_gg))
         self.assertEqual(g_string, gg_string)
 
+    def test_predicate_binds_into_the_traversal_it_is_nested_in(self):
+        pred = gt(5)
+        g = Gremlin().V().has('age', pred)
+        string = str(g)
+        argument = get_dict_key(g.bound_params, 5)
+        expected = 'g.V().has(age, gt({}))'.format(argument)
+
+        self.assertEqual(expected, string)
+        self.assertNotIn('top', pred.__dict__)
+        self.assertNotIn('_params', pred.__dict__)
+
+    def test_predicate_is_built_when_chained(self):
+        pred = gt(5)
+        chained = pred.out()
+
+        self.assertIs(pred, chained)
+        self.assertIn('top', pred.__dict__)
+
+    def test_predicate_can_be_used_in_two_traversals(self):
+        pred = gt(5)
+        g = Gremlin().has('age', pred)
+        gg = Gremlin().has('age', pred)
+
+        str(g)
+        str(gg)
+
+        self.assertEqual([5], list(g.bound_params.values()))
+        self.assertEqual([5], list(gg.bound_params.values()))
+
+    def test_can_copy_predicates_with_positional_names(self):
+        g = Gremlin()
+        g.set_param_naming(PositionalNaming())
+        g.V().where(Gremlin('__').has('age', gt(1)))
+        g.has('name', within('a', 'b'))
+        expected = ('g.V().where(__.has(age, gt(_p0)))'
+                    '.has(name, within(_p1, _p2))')
+
+        self.assertEqual(expected, str(g))
+
+        gg = g.copy(deep=True)
+
+        self.assertEqual(expected, str(gg))
+        self.assertEqual(g.bound_params, gg.bound_params)
+
+    def test_dynamic_predicate_classes_are_reused(self):
+        self.assertIs(type(_('someFunc')), type(_('someFunc', 1)))
+
+    def test_shared_predicate_keeps_names_of_each_traversal(self):
+        pred = gt(5)
+        g = Gremlin().V().has('a', pred)
+        str(g)
+        gg = Gremlin().V().has('b', pred)
+        str(gg)
+        g.count()
+        name = get_dict_key(g.bound_params, 5)
+
+        self.assertEqual('g.V().has(a, gt({})).count()'.format(name), str(g))
+        self.assertEqual([5], list(g.bound_params.values()))
+        self.assertEqual([5], list(gg.bound_params.values()))
+
+    def test_module_level_predicate_can_be_used_by_many_traversals(self):
+        traversals = [Gremlin().V().has('age', ADULT).out(i)
+                      for i in ('a', 'b', 'c')]
+
+        for g in traversals:
+            str(g)
+
+        for i, g in zip(('a', 'b', 'c'), traversals):
+            g.count()
+            age = get_dict_key(g.bound_params, 18)
+            out = get_dict_key(g.bound_params, i)
+            expected = 'g.V().has(age, gt({})).out({}).count()'.format(age,
+                                                                     out)
+
+            self.assertEqual(expected, str(g))
+            self.assertEqual(2, len(g.bound_params))
+
+        self.assertFalse(ADULT._materialized)
+
 
 if __name__ == '__main__':
     unittest.main()
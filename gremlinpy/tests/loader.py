@@ -0,0 +1,152 @@
+import asyncio
+import unittest
+
+from gremlinpy.exception import ClientError
+from gremlinpy.gremlin import Gremlin, Param
+from gremlinpy.loader import Loader
+from gremlinpy.statement import GetEdge
+from gremlinpy.tests.client import run
+
+
+class _Executor(object):
+    """a fake server that answers the loader's lookups from a dict"""
+
+    def __init__(self, vertices=None, error=None):
+        self.vertices = vertices or {}
+        self.error = error
+        self.traversals = []
+
+    async def __call__(self, traversal, **kwargs):
+        self.traversals.append(traversal)
+        await asyncio.sleep(0)
+
+        if self.error is not None:
+            raise self.error
+
+        if not isinstance(traversal, Gremlin):
+            return [traversal.render()[0]]
+
+        script = str(traversal)
+        ids = traversal.bound_params.get(Loader.bound_ids)
+
+        if ids is None:
+            return [script]
+
+        return [{'id': i, 'result': [self.vertices[i]]} for i in ids
+                if i in self.vertices]
+
+
+def names(ids):
+    return dict([(i, {'name': 'user{}'.format(i)}) for i in ids])
+
+
+class LoaderTests(unittest.TestCase):
+
+    def test_concurrent_lookups_are_sent_together(self):
+        executor = _Executor(names([1, 2]))
+        loader = Loader(executor)
+
+        async def test():
+            return await asyncio.gather(
+                *[loader.load(Gremlin().V(i).valueMap()) for i in (1, 2, 3)])
+
+        results = run(test())
+        traversal = executor.traversals[0]
+
+        self.assertEqual(1, len(executor.traversals))
+        self.assertEqual("g.V(LOADER_IDS).project('id', 'result').by(T.id)"
+                         ".by(__.valueMap().fold())", str(traversal))
+        self.assertEqual({'LOADER_IDS': [1, 2, 3]}, traversal.bound_params)
+        self.assertEqual([[{'name': 'user1'}], [{'name': 'user2'}], []],
+                         results)
+
+    def test_suffixes_with_different_values_are_sent_apart(self):
+        executor = _Executor(names([1, 2]))
+        loader = Loader(executor)
+
+        async def test():
+            return await asyncio.gather(
+                loader.load(Gremlin().V(1).out('knows')),
+                loader.load(Gremlin().V(2).out('likes')),
+                loader.load(Gremlin().V(Param('id', 2)).out('knows')))
+
+        run(test())
+
+        bound = sorted([(t.bound_params['_p0'], t.bound_params['LOADER_IDS'])
+                        for t in executor.traversals])
+
+        self.assertEqual([('knows', [1, 2]), ('likes', [2])], bound)
+
+    def test_same_id_is_looked_up_once(self):
+        executor = _Executor(names([7]))
+        loader = Loader(executor)
+
+        async def test():
+            return await asyncio.gather(loader.load(Gremlin().V(7)),
+                                        loader.load(Gremlin().V(7)))
+
+        results = run(test())
+
+        bound = executor.traversals[0].bound_params
+
+        self.assertEqual([7], bound['LOADER_IDS'])
+        self.assertEqual(results[0], results[1])
+
+    def test_lookups_in_later_ticks_are_sent_apart(self):
+        executor = _Executor(names([1, 2]))
+        loader = Loader(executor)
+
+        async def test():
+            await loader.load(Gremlin().V(1).valueMap())
+            await loader.load(Gremlin().V(2).valueMap())
+
+        run(test())
+
+        self.assertEqual(2, len(executor.traversals))
+
+    def test_can_limit_batch_size(self):
+        executor = _Executor(names(range(5)))
+        loader = Loader(executor, max_batch=2)
+
+        async def test():
+            return await asyncio.gather(
+                *[loader.load(Gremlin().V(i)) for i in range(5)])
+
+        results = run(test())
+
+        self.assertEqual([[0, 1], [2, 3], [4]],
+                         [t.bound_params['LOADER_IDS']
+                          for t in executor.traversals])
+        self.assertEqual(5, len([r for r in results if r]))
+
+    def test_other_traversals_are_submitted_as_is(self):
+        executor = _Executor()
+        loader = Loader(executor)
+        g = Gremlin().V().count()
+        edge = GetEdge(1, 2, 'knows').set_gremlin(Gremlin())
+
+        async def test():
+            return await asyncio.gather(loader.load(g), loader.load(edge))
+
+        results = run(test())
+
+        self.assertEqual([g, edge], executor.traversals)
+        self.assertEqual(['g.V().count()'], results[0])
+
+    def test_errors_are_set_on_every_caller(self):
+        loader = Loader(_Executor(error=ValueError('down')))
+
+        async def test():
+            return await asyncio.gather(
+                *[loader.load(Gremlin().V(i)) for i in range(2)],
+                return_exceptions=True)
+
+        for result in run(test()):
+            self.assertIsInstance(result, ValueError)
+
+    def test_only_traversals_can_be_loaded(self):
+        async def test():
+            Loader(_Executor()).load('g.V(1)')
+
+        with self.assertRaises(ClientError):
+            run(test())
@@ -0,0 +1,101 @@
+import io
+import json
+import contextlib
+import unittest
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from gremlinpy import memory
+from gremlinpy.gremlin import Gremlin, __, gt
+
+
+class MeasureTests(unittest.TestCase):
+
+    def test_can_measure_tokens_by_class(self):
+        g = Gremlin().V(1).out('knows').name
+        report = memory.measure(g)
+
+        self.assertEqual({'GraphVariable': 1, 'Function': 2, 'Attribute': 1},
+                         report['counts'])
+        self.assertEqual(0, report['registries'])
+        self.assertEqual(0, report['rendered'])
+
+        str(g)
+
+        self.assertEqual(1, memory.measure(g)['registries'])
+
+    def test_nested_instances_are_measured(self):
+        g = Gremlin().V().where(__.out('knows').has('age', gt(2)))
+        str(g)
+        report = memory.measure(g)
+
+        # the anonymous traversal has its own chain, the predicate does not
+        self.assertEqual(2, report['counts']['GraphVariable'])
+        self.assertEqual(4, report['counts']['Function'])
+        self.assertTrue(report['params'] > 0)
+        self.assertTrue(report['rendered'] > len(str(g)))
+
+    def test_total_adds_up(self):
+        g = memory.chain(20)
+        str(g)
+        report = memory.measure(g)
+        total = sum(report['tokens'].values()) + report['gremlins'] + \
+            report['params'] + report['rendered']
+
+        self.assertEqual(total, report['total'])
+
+    def test_shared_tokens_are_counted_once(self):
+        g = memory.chain(20)
+        copy = g.copy().out('x')
+        one = memory.measure(g)
+        two = memory.measure(copy)
+
+        self.assertEqual(21, one['counts']['Function'])
+        self.assertEqual(22, two['counts']['Function'])
+
+    def test_params_grow_with_values(self):
+        small = Gremlin().V('x' * 10)
+        large = Gremlin().V('x' * 10000)
+
+        str(small)
+        str(large)
+
+        self.assertTrue(memory.measure(large)['params'] >
+                        memory.measure(small)['params'] + 9000)
+
+
+@unittest.skipIf(tracemalloc is None, 'tracemalloc is not available')
+class ProfileTests(unittest.TestCase):
+
+    def test_can_profile_build_and_render(self):
+        report = memory.profile(lambda: memory.chain(200))
+
+        self.assertTrue(report['build']['retained'] > 0)
+        self.assertTrue(report['build']['peak'] >=
+                        report['build']['retained'])
+        self.assertTrue(report['render']['peak'] > 0)
+        self.assertEqual(200, report['breakdown']['counts']['Function'] - 1)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_every_scenario_runs(self):
+        for name, build in memory.SCENARIOS.items():
+            report = memory.profile(lambda: build(5))
+
+            self.assertIn(name, memory.format_report(name, report))
+
+    def test_main_prints_json(self):
+        out = io.StringIO()
+
+        with contextlib.redirect_stdout(out):
+            memory.main(['--scenarios', 'chain', '--size', '5', '--json'])
+
+        report = json.loads(out.getvalue())
+
+        self.assertIn('build', report['chain'])
+
+
+if __name__ == '__main__':
+    unittest.main()
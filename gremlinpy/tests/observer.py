@@ -0,0 +1,147 @@
+import io
+import unittest
+
+from gremlinpy.gremlin import Gremlin, Param
+from gremlinpy.statement import GetEdge
+from gremlinpy.observer import Observer, Aggregator, Histogram, OBSERVERS, \
+    add_observer, remove_observer, observing
+
+
+class _Recorder(Observer):
+
+    def __init__(self):
+        self.events = []
+
+    def token(self, token):
+        self.events.append(('token', type(token).__name__))
+
+    def bind(self, gremlin, name, value):
+        self.events.append(('bind', name, value))
+
+    def build(self, statement, seconds):
+        self.events.append(('build', type(statement).__name__))
+
+    def render(self, gremlin, seconds, length, params):
+        self.events.append(('render', length, params))
+
+
+class ObserverTests(unittest.TestCase):
+
+    def tearDown(self):
+        del OBSERVERS[:]
+
+    def test_no_observers_by_default(self):
+        self.assertEqual([], OBSERVERS)
+
+    def test_can_observe_tokens_binds_and_renders(self):
+        recorder = add_observer(_Recorder())
+        g = Gremlin().V(Param('id', 1))
+        string = str(g)
+        str(g)
+
+        expected = [('token', 'GraphVariable'), ('token', 'Attribute'),
+                    ('token', 'Function'), ('bind', 'id', 1),
+                    ('render', len(string), 1)]
+
+        self.assertEqual(expected, recorder.events)
+
+    def test_can_observe_statement_builds(self):
+        recorder = add_observer(_Recorder())
+
+        Gremlin().apply_statement(GetEdge(1, 2, 'knows'))
+
+        self.assertIn(('build', 'GetEdge'), recorder.events)
+
+    def test_can_observe_render_to(self):
+        recorder = add_observer(_Recorder())
+        g = Gremlin().V()
+        size = g.render_to(io.StringIO())
+
+        self.assertEqual(('render', size, 0), recorder.events[-1])
+
+    def test_can_remove_observer(self):
+        recorder = _Recorder()
+
+        with observing(recorder):
+            Gremlin().V()
+
+        count = len(recorder.events)
+        Gremlin().V()
+
+        self.assertEqual(3, count)
+        self.assertEqual(count, len(recorder.events))
+        self.assertEqual([], OBSERVERS)
+
+        add_observer(recorder)
+        remove_observer(recorder)
+        remove_observer(recorder)
+        self.assertEqual([], OBSERVERS)
+
+
+class HistogramTests(unittest.TestCase):
+
+    def test_can_count_values(self):
+        h = Histogram(start=1)
+
+        for value in [1, 2, 3, 4, 100]:
+            h.add(value)
+
+        snapshot = h.snapshot()
+
+        self.assertEqual(5, snapshot['count'])
+        self.assertEqual(110, snapshot['total'])
+        self.assertEqual(1, snapshot['min'])
+        self.assertEqual(100, snapshot['max'])
+        self.assertEqual(4, snapshot['p50'])
+        self.assertEqual(100, snapshot['p99'])
+
+    def test_empty_histogram(self):
+        self.assertIsNone(Histogram().snapshot()['p50'])
+
+
+class AggregatorTests(unittest.TestCase):
+
+    def tearDown(self):
+        del OBSERVERS[:]
+
+    def test_renders_are_grouped_by_fingerprint(self):
+        stats = add_observer(Aggregator())
+
+        for i in range(3):
+            str(Gremlin().V(i).out('knows'))
+
+        str(Gremlin().E())
+
+        snapshot = stats.snapshot()
+        fingerprint = Gremlin().V(9).out('x').fingerprint()
+
+        self.assertEqual(2, len(snapshot['renders']))
+        self.assertEqual(3,
+                         snapshot['renders'][fingerprint]['seconds']['count'])
+        self.assertEqual(2, snapshot['renders'][fingerprint]['params']['max'])
+
+    def test_nested_renders_are_not_recorded(self):
+        stats = add_observer(Aggregator())
+
+        str(Gremlin().V().where(Gremlin('__').out('knows')))
+
+        self.assertEqual(1, len(stats.snapshot()['renders']))
+
+    def test_counts_tokens_binds_and_builds(self):
+        stats = add_observer(Aggregator())
+
+        Gremlin().apply_statement(GetEdge(1, 2, 'knows'))
+
+        snapshot = stats.snapshot()
+
+        self.assertEqual(4, snapshot['binds'])
+        self.assertEqual(1, snapshot['builds']['GetEdge']['count'])
+        self.assertTrue(snapshot['tokens']['Function'] >= 5)
+
+        stats.reset()
+
+        self.assertEqual(0, stats.snapshot()['binds'])
+
+
+if __name__ == '__main__':
+    unittest.main()
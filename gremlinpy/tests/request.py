@@ -0,0 +1,134 @@
+import datetime
+import json
+import unittest
+import uuid
+
+from gremlinpy.gremlin import Gremlin, Param
+from gremlinpy.exception import RequestError
+from gremlinpy.request import GraphSONSerializer, JSONSerializer, \
+    to_request, typed, as_long, as_isoformat
+
+
+class _UTC(datetime.tzinfo):
+
+    def utcoffset(self, dt):
+        return datetime.timedelta(hours=2)
+
+    def dst(self, dt):
+        return datetime.timedelta(0)
+
+
+class GraphSONSerializerTests(unittest.TestCase):
+
+    def test_can_serialize_numbers(self):
+        s = GraphSONSerializer()
+
+        self.assertEqual(typed('g:Int32', 12), s.serialize(12))
+        self.assertEqual(typed('g:Int64', 2 ** 31), s.serialize(2 ** 31))
+        self.assertEqual(typed('g:Int64', -2 ** 40), s.serialize(-2 ** 40))
+        self.assertEqual(typed('g:Double', 1.5), s.serialize(1.5))
+        self.assertIs(True, s.serialize(True))
+
+    def test_can_serialize_uuid_and_date(self):
+        s = GraphSONSerializer()
+        id = uuid.UUID(int=5)
+        date = datetime.datetime(2020, 1, 1, 0, 0, 0, 1500)
+        aware = datetime.datetime(2020, 1, 1, 2, tzinfo=_UTC())
+
+        self.assertEqual(typed('g:UUID', str(id)), s.serialize(id))
+        self.assertEqual(typed('g:Date', 1577836800001), s.serialize(date))
+        self.assertEqual(typed('g:Date', 1577836800000), s.serialize(aware))
+
+    def test_can_serialize_collections(self):
+        s = GraphSONSerializer()
+        value = {'a': [1, 'b', None], 'c': (1.5,)}
+        expected = {'a': [typed('g:Int32', 1), 'b', None],
+                    'c': [typed('g:Double', 1.5)]}
+
+        self.assertEqual(expected, s.serialize(value))
+
+    def test_can_configure_serializers(self):
+        s = GraphSONSerializer({int: as_long,
+                                datetime.datetime: as_isoformat})
+        date = datetime.datetime(2020, 1, 1)
+
+        self.assertEqual(typed('g:Int64', 1), s.serialize(1))
+        self.assertEqual('2020-01-01T00:00:00', s.serialize(date))
+        self.assertIs(False, s.serialize(False))
+
+    def test_unknown_type_raises_error(self):
+        with self.assertRaises(RequestError):
+            GraphSONSerializer().serialize(object())
+
+    def test_json_serializer_does_not_add_types(self):
+        s = JSONSerializer()
+        id = uuid.UUID(int=5)
+
+        self.assertEqual(12, s.serialize(12))
+        self.assertEqual(str(id), s.serialize(id))
+        self.assertEqual(str(id), s.request_id(id))
+
+
+class ToRequestTests(unittest.TestCase):
+
+    def test_can_build_request(self):
+        id = uuid.UUID(int=1)
+        g = Gremlin().V(Param('id', 12)).out(Param('label', 'knows'))
+
+        request = json.loads(g.to_request(request_id=id).decode('utf-8'))
+        expected = {
+            'requestId': typed('g:UUID', str(id)),
+            'op': 'eval',
+            'processor': '',
+            'args': {
+                'gremlin': str(g),
+                'bindings': {
+                    'id': typed('g:Int32', 12),
+                    'label': 'knows'},
+                'language': 'gremlin-groovy'}}
+
+        self.assertEqual(expected, request)
+
+    def test_script_is_escaped(self):
+        g = Gremlin().V().raw(u'.has("né\\\\\n")')
+
+        request = json.loads(g.to_request().decode('utf-8'))
+
+        self.assertEqual(str(g), request['args']['gremlin'])
+
+    def test_ensure_ascii(self):
+        g = Gremlin().V().raw(u'.has("né")')
+        request = g.to_request(ensure_ascii=True)
+
+        self.assertIn(b'\\u00e9', request)
+        self.assertEqual(str(g),
+                         json.loads(request.decode('ascii'))['args']['gremlin'])
+
+    def test_can_add_aliases_and_op(self):
+        g = Gremlin().V()
+        request = to_request(g, op='eval', processor='session',
+                             aliases={'g': 'graph_g'})
+        request = json.loads(request.decode('utf-8'))
+
+        self.assertEqual({'g': 'graph_g'}, request['args']['aliases'])
+        self.assertEqual('session', request['processor'])
+
+    def test_can_prefix_mime_type(self):
+        request = Gremlin().V().to_request(mime_type=True)
+        mime = b'application/vnd.gremlin-v2.0+json'
+
+        self.assertEqual(len(mime), bytearray(request)[0])
+        self.assertTrue(request[1:].startswith(mime))
+        self.assertTrue(request[len(mime) + 1:].startswith(b'{'))
+
+    def test_params_are_bound_once(self):
+        g = Gremlin().V(1).out('knows')
+        first = json.loads(g.to_request().decode('utf-8'))
+        second = json.loads(g.to_request().decode('utf-8'))
+
+        self.assertEqual(first['args'], second['args'])
+        self.assertEqual(2, len(first['args']['bindings']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
+import threading
 import unittest
-from gremlinpy.statement import Statement, Conditional, GetEdge
-from gremlinpy.gremlin import Gremlin
+from gremlinpy.statement import Statement, Conditional, GetEdge, Batch, \
+    BulkAddVertices, BulkUpsertEdges, GetEdges
+from gremlinpy.gremlin import Gremlin, Function, Param, PositionalNaming
+from gremlinpy.exception import StatementError
 
 
 def get_dict_key(dict, value):
@@ -144,6 +147,15 @@ class NestedStatementTests(unittest.TestCase):
         self.assertTrue(string == expected)
         self.assertTrue(len(params) == 0)
 
+    def test_nested_statements_are_part_of_fingerprint(self):
+        def nested(out_id, direction):
+            edge = GetEdge(out_id, 2, 'knows', direction)
+
+            return Gremlin().V().where(edge).compile()
+
+        self.assertEqual(nested(1, 'in'), nested(3, 'in'))
+        self.assertNotEqual(nested(1, 'in'), nested(1, 'out'))
+
 
 class PackagedStatementTests(unittest.TestCase):
 
@@ -278,5 +290,514 @@ class PackagedStatementTests(unittest.TestCase):
         self.assertEqual(expected, string)
 
 
+class StatementLifecycleTests(unittest.TestCase):
+
+    def test_statement_is_built_once(self):
+        e = GetEdge(1, 9, 'knows')
+        e.set_gremlin(Gremlin())
+        first = str(e)
+        params = dict(e.gremlin.bound_params)
+
+        self.assertEqual(first, str(e))
+        self.assertEqual(params, e.gremlin.bound_params)
+        self.assertTrue(e.built)
+
+    def test_conditional_is_built_once(self):
+        c = Conditional().set_if('x == 1', 'g.V()').set_else('g.E()')
+        g = Gremlin()
+
+        g.apply_statement(c)
+        g.apply_statement(c)
+
+        self.assertEqual('if(x == 1){g.V()}else{g.E()}', str(g))
+        self.assertEqual(str(g), str(c))
+
+    def test_conditional_needs_if_clause(self):
+        with self.assertRaises(StatementError):
+            Gremlin().apply_statement(Conditional().set_else('g.V()'))
+
+    def test_cannot_change_built_statement(self):
+        c = Conditional().set_if('x == 1', 'g.V()')
+        c.render()
+
+        with self.assertRaises(StatementError):
+            c.set_else('g.E()')
+
+    def test_render_returns_script_and_bindings(self):
+        script, bindings = GetEdge(1, 9, 'knows').render()
+
+        self.assertEqual('g.V(V_OUT_ID).bothE(EDGE_LABEL_NAME)'
+                         '.as(EDGE_ENTITY).inV().hasId(V_IN_ID)'
+                         '.select(EDGE_ENTITY)', script)
+        self.assertEqual({'V_OUT_ID': 1, 'V_IN_ID': 9,
+                          'EDGE_LABEL_NAME': 'knows',
+                          'EDGE_ENTITY': 'edge_entity'}, bindings)
+
+    def test_render_returns_copy_of_bindings(self):
+        e = GetEdge(1, 9, 'knows')
+        bindings = e.render()[1]
+        bindings['V_OUT_ID'] = 2
+
+        self.assertEqual(1, e.render()[1]['V_OUT_ID'])
+        self.assertEqual(1, e.gremlin.bound_params['V_OUT_ID'])
+
+    def test_frozen_statement_keeps_script_and_bindings(self):
+        e = GetEdge(1, 9, 'knows').freeze()
+        script, bindings = e.render()
+        bindings['V_OUT_ID'] = 2
+
+        self.assertTrue(e.frozen)
+        self.assertEqual((script, e.gremlin.bound_params), e.render())
+        self.assertEqual(script, str(e))
+
+    def test_frozen_statement_cannot_be_changed_or_rebuilt(self):
+        e = GetEdge(1, 9, 'knows').freeze()
+
+        with self.assertRaises(StatementError):
+            e.set_direction('out')
+
+        with self.assertRaises(StatementError):
+            Gremlin().apply_statement(e)
+
+    def test_frozen_statement_can_be_nested_many_times(self):
+        e = GetEdge(1, 9, 'knows').freeze()
+        script = str(e)
+        frozen = e.gremlin
+
+        for i in range(3):
+            g = Gremlin()
+            g.V(Param('id', 'v{}'.format(i))).local(e)
+
+            self.assertEqual('g.V(id).local({})'.format(script), str(g))
+            self.assertEqual(1, g.bound_params['V_OUT_ID'])
+            self.assertIsNone(frozen.parent)
+
+    def test_frozen_statement_names_are_renamed_on_collision(self):
+        e = GetEdge(1, 9, 'knows').freeze()
+        g = Gremlin()
+        g.V(Param('V_OUT_ID', 5)).local(e)
+        string = str(g)
+
+        self.assertIn('g.V(GetEdge_V_OUT_ID).bothE(EDGE_LABEL_NAME)', string)
+        self.assertEqual(5, g.bound_params['V_OUT_ID'])
+        self.assertEqual(1, g.bound_params['GetEdge_V_OUT_ID'])
+
+    def test_renaming_frozen_statement_names_leaves_it_unchanged(self):
+        e = GetEdge(1, 9, 'knows').freeze()
+        script, params = e.render()
+        frozen = e.gremlin
+        registry = frozen._params
+        g = Gremlin().V().local(GetEdge(2, 8, 'knows').freeze()).local(e)
+
+        self.assertIn('local(g.V(GetEdge_V_OUT_ID)', str(g))
+        self.assertTrue(all([t.bound_args is not None for t in frozen
+                             if isinstance(t, Function)]))
+        self.assertIs(registry, frozen._params)
+        self.assertEqual(params, frozen.bound_params)
+        self.assertEqual(script, frozen._script)
+
+    def test_frozen_statements_can_be_nested_from_many_threads(self):
+        one = GetEdge(1, 9, 'knows').freeze()
+        two = GetEdge(2, 8, 'likes').freeze()
+        expected = Gremlin().V().local(one).local(two)
+        expected = (str(expected), dict(expected.bound_params))
+        rendered = []
+
+        def nest():
+            for i in range(50):
+                g = Gremlin().V().local(one).local(two)
+                rendered.append((str(g), dict(g.bound_params)))
+
+        threads = [threading.Thread(target=nest) for i in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([expected] * 400, rendered)
+
+    def test_renaming_frozen_statement_names_leaves_strings_alone(self):
+        e = GetEdge(1, 9, 'knows').freeze()
+        g = Gremlin()
+        g.V(Param('V_OUT_ID', 5)).unbound('has', "'V_OUT_ID'").local(e)
+        string = str(g)
+
+        self.assertIn("g.V(V_OUT_ID).has('V_OUT_ID')", string)
+        self.assertIn('local(g.V(GetEdge_V_OUT_ID)', string)
+        self.assertEqual(str(e), e.render()[0])
+
+    def test_copies_share_frozen_statements(self):
+        e = GetEdge(1, 9, 'knows').freeze()
+        g = Gremlin().V().local(e)
+        copied = g.copy(deep=True)
+
+        self.assertEqual(str(g), str(copied))
+        self.assertIs(e, copied.bottom.args[0])
+
+    def test_can_batch_frozen_statements(self):
+        e = GetEdge(1, 9, 'knows').freeze()
+        one = Batch([e])
+        two = Batch([e])
+
+        self.assertEqual(str(one), str(two))
+        self.assertEqual(one.gremlin.bound_params, two.gremlin.bound_params)
+
+
+class BatchTests(unittest.TestCase):
+
+    def test_can_batch_traversals_into_map(self):
+        batch = Batch()
+        batch.add(Gremlin().V(Param('user', 12)).valueMap(), 'user')
+        batch.add(Gremlin().V().count(), 'total')
+
+        string = str(batch)
+        expected = ("def gpy_result = { it instanceof Iterator ? it.toList() "
+                    ": it }; ['user': gpy_result({ -> "
+                    "g.V(user).valueMap() }()), "
+                    "'total': gpy_result({ -> g.V().count() }())]")
+
+        self.assertEqual(expected, string)
+        self.assertEqual({'user': 12}, batch.gremlin.bound_params)
+
+    def test_can_batch_traversals_into_list(self):
+        batch = Batch([Gremlin().V(), Gremlin().E()], as_list=True)
+
+        self.assertTrue(str(batch).endswith(
+            '[gpy_result({ -> g.V() }()), gpy_result({ -> g.E() }())]'))
+
+    def test_fingerprint_depends_on_traversals(self):
+        def batch(*traversals, **kwargs):
+            return Batch(list(traversals), **kwargs).fingerprint()
+
+        edge = lambda direction: GetEdge(1, 2, 'knows', direction)
+
+        self.assertEqual(batch(Gremlin().V(1), edge('in')),
+                         batch(Gremlin().V(2), edge('in')))
+        self.assertNotEqual(batch(Gremlin().V(1), edge('in')),
+                            batch(Gremlin().V(1), edge('out')))
+        self.assertNotEqual(batch(Gremlin().V()),
+                            batch(Gremlin().V(), Gremlin().V()))
+        self.assertNotEqual(batch(Gremlin().V()),
+                            batch(Gremlin().V(), as_list=True))
+
+    def test_can_batch_nothing(self):
+        self.assertTrue(str(Batch()).endswith('[:]'))
+
+    def test_cannot_add_same_key_twice(self):
+        batch = Batch().add(Gremlin().V(), 'v')
+
+        with self.assertRaises(StatementError):
+            batch.add(Gremlin().E(), 'v')
+
+    def test_colliding_param_names_are_namespaced(self):
+        batch = Batch()
+        batch.add(GetEdge(1, 9, 'knows'))
+        batch.add(GetEdge(2, 8, 'knows'))
+
+        string = str(batch)
+        params = batch.gremlin.bound_params
+        second = string.split("'r1': ")[1]
+
+        self.assertEqual(1, params['V_OUT_ID'])
+        self.assertEqual(9, params['V_IN_ID'])
+        self.assertEqual(2, params['B1_V_OUT_ID'])
+        self.assertEqual(8, params['B1_V_IN_ID'])
+        self.assertIn('g.V(B1_V_OUT_ID)', second)
+        self.assertIn('hasId(B1_V_IN_ID)', second)
+        self.assertIn('bothE(EDGE_LABEL_NAME)', second)
+        self.assertEqual(6, len(params))
+
+    def test_values_are_deduplicated_across_batch(self):
+        batch = Batch()
+        batch.add(Gremlin().V().out('knows'))
+        batch.add(Gremlin().V().in_('knows'))
+
+        string = str(batch)
+        params = batch.gremlin.bound_params
+        name = get_dict_key(params, 'knows')
+
+        self.assertEqual(1, len(params))
+        self.assertIn('g.V().out({})'.format(name), string)
+        self.assertIn('g.V().in_({})'.format(name), string)
+
+    def test_can_batch_statements(self):
+        c = Conditional().set_if('1 == 2', 'nope').set_else('yes')
+        batch = Batch([c])
+
+        self.assertIn('gpy_result({ -> if(1 == 2){nope}else{yes} }())',
+                      str(batch))
+
+    def test_positional_names_are_namespaced(self):
+        one = Gremlin().set_param_naming(PositionalNaming()).V(1)
+        two = Gremlin().set_param_naming(PositionalNaming()).V(2)
+        three = Gremlin().set_param_naming(PositionalNaming()).V(1)
+        batch = Batch([one, two, three])
+
+        string = str(batch)
+        expected = {'_p0': 1, 'B1__p0': 2}
+
+        self.assertIn('g.V(_p0)', string)
+        self.assertIn('g.V(B1__p0)', string)
+        self.assertEqual(2, string.count('g.V(_p0)'))
+        self.assertEqual(expected, batch.gremlin.bound_params)
+
+    def test_renaming_leaves_strings_alone(self):
+        one = Gremlin().V(Param('name', 1))
+        two = Gremlin().V().unbound('has', "'name'", Param('name', 2))
+        batch = Batch([one, two])
+
+        string = str(batch)
+
+        self.assertIn("g.V().has('name', B1_name)", string)
+        self.assertEqual({'name': 1, 'B1_name': 2},
+                         batch.gremlin.bound_params)
+
+    def test_batched_traversal_renders_on_its_own_afterwards(self):
+        g = Gremlin().V(Param('name', 2)).out('knows')
+        script = str(g)
+        batch = Batch([Gremlin().V(Param('name', 1)), g])
+
+        self.assertIn('g.V(B1_name)', str(batch))
+        self.assertEqual(script, str(g))
+        self.assertEqual(2, g.bound_params['name'])
+        self.assertIsNone(g.parent)
+
+    def test_can_batch_copies(self):
+        base = Gremlin().V(Param('name', 3)).out('a')
+        script = str(base)
+        copied = base.copy().out('b')
+        batch = Batch([Gremlin().V(Param('name', 1)), copied, base])
+
+        string = str(batch)
+        params = batch.gremlin.bound_params
+        a = get_dict_key(params, 'a')
+        b = get_dict_key(params, 'b')
+
+        self.assertIn('g.V(B1_name).out({}).out({})'.format(a, b), string)
+        self.assertIn('g.V(B2_name).out({})'.format(a), string)
+        self.assertEqual(script, str(base))
+        self.assertEqual(3, params['B1_name'])
+
+
+class BulkAddVerticesTests(unittest.TestCase):
+
+    def rows(self, count):
+        return [{'name': 'user{}'.format(i), 'age': i} for i in range(count)]
+
+    def test_can_add_vertices_with_one_param(self):
+        rows = self.rows(3)
+        g = Gremlin()
+        bulk = BulkAddVertices('person', rows)
+
+        g.apply_statement(bulk)
+
+        string = str(g)
+        expected = ("g.inject(BULK_ROWS).unfold().as('row')"
+                    ".addV(BULK_LABEL).as('v')"
+                    ".sideEffect(__.select('row').unfold().as('kv')"
+                    ".select('v').property(__.select('kv').by(keys), "
+                    "__.select('kv').by(values)))")
+
+        self.assertEqual(expected, string)
+        self.assertEqual({'BULK_ROWS': rows, 'BULK_LABEL': 'person'},
+                         g.bound_params)
+
+    def test_script_does_not_depend_on_row_count(self):
+        small = BulkAddVertices('person', self.rows(1)).scripts()
+        large = BulkAddVertices('person', self.rows(5000)).scripts()
+
+        self.assertEqual(small[0][0], large[0][0])
+        self.assertEqual(2, len(large[0][1]))
+        self.assertEqual(5000, len(large[0][1]['BULK_ROWS']))
+
+    def test_fingerprint_depends_on_chunk_limits(self):
+        def bulk(count, **kwargs):
+            return BulkAddVertices('person', self.rows(count), **kwargs)
+
+        self.assertEqual(bulk(1).fingerprint(), bulk(5).fingerprint())
+        self.assertNotEqual(bulk(1).fingerprint(),
+                            bulk(1, max_rows=2).fingerprint())
+        self.assertNotEqual(bulk(1).fingerprint(),
+                            BulkUpsertEdges([(1, 2, 'knows')]).fingerprint())
+
+    def test_can_chunk_by_rows(self):
+        rows = self.rows(5)
+        scripts = BulkAddVertices('person', rows, max_rows=2).scripts()
+        chunks = [bindings['BULK_ROWS'] for script, bindings in scripts]
+
+        self.assertEqual([rows[0:2], rows[2:4], rows[4:]], chunks)
+        self.assertEqual(1, len(set([script for script, b in scripts])))
+
+    def test_can_chunk_by_bytes(self):
+        rows = self.rows(20)
+        bulk = BulkAddVertices('person', rows, max_bytes=100)
+        chunks = bulk.chunks()
+
+        self.assertTrue(len(chunks) > 1)
+        self.assertEqual(rows, [row for c in chunks for row in c.rows])
+
+        for chunk in chunks:
+            size = 2 + sum([bulk.row_size(row) for row in chunk.rows])
+            self.assertTrue(size <= 100)
+
+    def test_row_larger_than_limit_gets_its_own_chunk(self):
+        rows = [{'name': 'x' * 200}, {'name': 'y'}]
+        chunks = BulkAddVertices('person', rows, max_bytes=100).chunks()
+
+        self.assertEqual([[rows[0]], [rows[1]]], [c.rows for c in chunks])
+
+    def test_chunked_statement_cannot_be_built_as_is(self):
+        bulk = BulkAddVertices('person', self.rows(5), max_rows=2)
+
+        with self.assertRaises(StatementError):
+            Gremlin().apply_statement(bulk)
+
+        with self.assertRaises(StatementError):
+            str(Batch([bulk]))
+
+        with self.assertRaises(StatementError):
+            str(BulkAddVertices('person', self.rows(20), max_bytes=100))
+
+        self.assertEqual(3, len(bulk.scripts()))
+
+    def test_statement_that_fits_can_be_built(self):
+        bulk = BulkAddVertices('person', self.rows(2), max_rows=2,
+                               max_bytes=1024)
+
+        self.assertIn('inject(BULK_ROWS)', bulk.render()[0])
+
+    def test_equal_rows_reuse_bound_name(self):
+        g = Gremlin().set_param_naming(PositionalNaming())
+
+        g.apply_statement(BulkAddVertices('person', self.rows(2)))
+        g.apply_statement(BulkAddVertices('person', self.rows(2)))
+
+        self.assertEqual(2, len(g.bound_params))
+        self.assertEqual(2, str(g).count('inject(BULK_ROWS)'))
+
+    def test_does_not_overwrite_bound_names(self):
+        g = Gremlin()
+        first = self.rows(1)
+        second = self.rows(2)
+
+        g.apply_statement(BulkAddVertices('person', first))
+        g.apply_statement(BulkAddVertices('person', second))
+
+        string = str(g)
+        params = g.bound_params
+        name = get_dict_key(params, second)
+
+        self.assertEqual(first, params['BULK_ROWS'])
+        self.assertNotEqual('BULK_ROWS', name)
+        self.assertIn('inject({})'.format(name), string)
+
+
+class BulkUpsertEdgesTests(unittest.TestCase):
+
+    def test_can_upsert_edges_with_one_param(self):
+        g = Gremlin()
+        bulk = BulkUpsertEdges([(1, 2, 'knows', {'since': 2010})])
+
+        g.apply_statement(bulk)
+
+        string = str(g)
+        params = g.bound_params
+        expected = ("BULK_EDGES.collect { row -> "
+                    "def e = g.V(row['out']).outE(row['label'])"
+                    ".where(__.inV().hasId(row['in'])).tryNext()"
+                    ".orElseGet { g.V(row['out']).as('out').V(row['in'])"
+                    ".addE(row['label']).from('out').next() }; "
+                    "row['properties'].each { k, v -> e.property(k, v) }; e }")
+        edge = {'out': 1, 'in': 2, 'label': 'knows',
+                'properties': {'since': 2010}}
+
+        self.assertEqual(expected, string)
+        self.assertEqual({'BULK_EDGES': [edge]}, params)
+
+    def test_uses_the_graph_variable(self):
+        g = Gremlin('graph')
+
+        g.apply_statement(BulkUpsertEdges([(1, 2, 'knows')]))
+
+        string = str(g)
+
+        self.assertIn('def e = graph.V(', string)
+        self.assertIn('orElseGet { graph.V(', string)
+
+    def test_properties_are_optional(self):
+        edges = (e for e in [(1, 2, 'knows'), (2, 3, 'likes', None)])
+        bulk = BulkUpsertEdges(edges)
+
+        self.assertEqual([{}, {}], [row['properties'] for row in bulk.rows])
+        self.assertEqual(['knows', 'likes'],
+                         [row['label'] for row in bulk.rows])
+
+    def test_bad_edge_raises_error(self):
+        with self.assertRaises(StatementError):
+            BulkUpsertEdges([(1, 2)])
+
+        with self.assertRaises(StatementError):
+            BulkUpsertEdges().add((1, 2, 'knows', {}, 'extra'))
+
+    def test_can_chunk_edges(self):
+        edges = [(i, i + 1, 'knows', {'weight': i}) for i in range(10)]
+        bulk = BulkUpsertEdges(edges, max_rows=4)
+        scripts = bulk.scripts()
+        counts = [len(bindings['BULK_EDGES']) for script, bindings in scripts]
+
+        self.assertEqual([4, 4, 2], counts)
+        self.assertEqual(1, len(set([script for script, b in scripts])))
+        self.assertEqual(9, scripts[-1][1]['BULK_EDGES'][-1]['out'])
+
+
+class GetEdgesTests(unittest.TestCase):
+
+    def test_can_check_many_pairs_with_one_param(self):
+        pairs = [(1, 9), (2, 8)]
+        g = Gremlin()
+
+        g.apply_statement(GetEdges(pairs, 'knows'))
+
+        string = str(g)
+        expected = ('EDGE_PAIRS.findAll { pair -> g.V(pair[0])'
+                    '.bothE(EDGE_LABEL_NAME).inV().hasId(pair[1]).hasNext() }')
+
+        self.assertEqual(expected, string)
+        self.assertEqual({'EDGE_PAIRS': [[1, 9], [2, 8]],
+                          'EDGE_LABEL_NAME': 'knows'}, g.bound_params)
+
+    def test_directions_match_get_edge(self):
+        for direction in ('both', 'in', 'out'):
+            edges = GetEdges([(1, 9)], 'knows', direction)
+            edge = GetEdge(1, 9, 'knows', direction)
+            script = edges.scripts()[0][0]
+            step = '.{}(EDGE_LABEL_NAME).{}()'.format(edge.direction,
+                                                     edge.vertex_direction)
+
+            self.assertIn(step, script)
+
+    def test_bad_direction_raises_error(self):
+        with self.assertRaises(ValueError):
+            GetEdges([(1, 9)], 'knows', 'sideways')
+
+    def test_bad_pair_raises_error(self):
+        with self.assertRaises(StatementError):
+            GetEdges([(1, 9, 3)], 'knows')
+
+    def test_label_is_optional(self):
+        script, bindings = GetEdges([(1, 9)]).scripts()[0]
+
+        self.assertIn('g.V(pair[0]).bothE().inV()', script)
+        self.assertEqual({'EDGE_PAIRS': [[1, 9]]}, bindings)
+
+    def test_can_chunk_pairs(self):
+        pairs = [(i, i + 1) for i in range(7)]
+        scripts = GetEdges(pairs, 'knows', max_rows=3).scripts()
+
+        self.assertEqual([3, 3, 1], [len(b['EDGE_PAIRS']) for s, b in scripts])
+
+
 if __name__ == '__main__':
     unittest.main()
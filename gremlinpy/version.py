@@ -1,2 +1,2 @@
-__version_info__ = ('3', '8', '0', '1')
+__version_info__ = ('3', '9', '0')
 __version__ = '.'.join(__version_info__)
@@ -13,6 +13,7 @@ exec(open('gremlinpy/version.py').read())
 setup(
     name = 'gremlinpy',
     packages = find_packages(),
+    package_data = {'gremlinpy': ['benchmark_baseline.json']},
     version = __version__,
     description = 'Python GAL for Gremlin/Groovy syntax',
     url = 'https://github.com/emehrkay/gremlinpy',
@@ -22,6 +23,9 @@ setup(
     install_requires = [
         'six',
     ],
+    extras_require = {
+        'client': ['websockets'],
+    },
     classifiers = [
         'License :: OSI Approved :: MIT License',
         'Development Status :: 3 - Alpha',